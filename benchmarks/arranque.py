@@ -0,0 +1,86 @@
+"""Benchmark del arranque: tiempo hasta el primer pintado de la ventana.
+
+Lanza `main.py` varias veces sin pantalla (QT_QPA_PLATFORM=offscreen) con el
+perfil de arranque activado en modo "salir" (la aplicación se cierra tras el
+primer pintado), lee los hitos de arranque.jsonl y compara la mediana del
+primer pintado con el presupuesto de benchmarks/presupuestos.json.
+
+    python benchmarks/arranque.py [--repeticiones N] [--presupuesto-ms MS]
+
+Termina con código 1 si la mediana supera el presupuesto.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRESUPUESTOS = os.path.join(RAIZ, "benchmarks", "presupuestos.json")
+CLAVE_PRESUPUESTO = "arranque_primer_pintado_ms"
+HITOS = ("pyqt_importado", "qtwidgets_importado", "configuracion_global", "pestana_cripta", "ventana_mostrada", "primer_pintado")
+
+
+def leer_presupuesto(clave):
+    with open(PRESUPUESTOS, "r", encoding="utf-8") as f:
+        return float(json.load(f)[clave])
+
+
+def medir_arranque(tiempo_limite=60):
+    """Arranca la aplicación una vez y devuelve {evento: ms} de esa sesión."""
+    with tempfile.TemporaryDirectory(prefix="vtesproxi-arranque-") as estado:
+        entorno = dict(os.environ)
+        entorno.update({
+            "QT_QPA_PLATFORM": "offscreen",
+            "VTESPROXI_PERFIL_ARRANQUE": "salir",
+            "XDG_STATE_HOME": estado,
+        })
+        subprocess.run(
+            # Siempre un proceso propio, aunque haya una ventana abierta
+            [sys.executable, os.path.join(RAIZ, "main.py"), "--nueva-instancia"],
+            cwd=RAIZ, env=entorno, timeout=tiempo_limite,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True,
+        )
+        hitos = {}
+        with open(os.path.join(estado, "vtesproxi", "arranque.jsonl"), "r", encoding="utf-8") as f:
+            for linea in f:
+                marca = json.loads(linea)
+                # Los eventos que se repiten (p. ej. cada fuente) cuentan la primera vez
+                hitos.setdefault(marca["evento"], marca["ms"])
+        return hitos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo hasta el primer pintado, sin pantalla.")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--presupuesto-ms", type=float, default=None,
+                        help=f"por defecto, '{CLAVE_PRESUPUESTO}' de presupuestos.json")
+    args = parser.parse_args(argv)
+    presupuesto = args.presupuesto_ms if args.presupuesto_ms is not None else leer_presupuesto(CLAVE_PRESUPUESTO)
+
+    sesiones = []
+    for i in range(args.repeticiones):
+        hitos = medir_arranque()
+        if "primer_pintado" not in hitos:
+            print(f"[arranque] La ejecución {i + 1} no llegó a pintar la ventana", file=sys.stderr)
+            return 1
+        sesiones.append(hitos)
+        print(f"[arranque] {i + 1}/{args.repeticiones}: primer pintado a {hitos['primer_pintado']:.1f} ms")
+
+    for hito in HITOS:
+        valores = [s[hito] for s in sesiones if hito in s]
+        if valores:
+            print(f"  {hito:<22} mediana {statistics.median(valores):8.1f} ms")
+    mediana = statistics.median(s["primer_pintado"] for s in sesiones)
+    if mediana > presupuesto:
+        print(f"[arranque] REGRESIÓN: {mediana:.1f} ms > presupuesto {presupuesto:.0f} ms")
+        return 1
+    print(f"[arranque] OK: {mediana:.1f} ms <= presupuesto {presupuesto:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
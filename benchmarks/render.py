@@ -0,0 +1,309 @@
+"""Micro-benchmarks del renderizado, sin pantalla.
+
+Mide los caminos calientes de la aplicación con QT_QPA_PLATFORM=offscreen y
+la configuración por defecto:
+
+- `CartaImageWidget.paintEvent` de una carta de cripta y otra de librería:
+  pintado completo (todas las capas sucias y el arte por reescalar; las
+  cachés de iconos y de texto siguen calientes), con todas las capas en
+  caché y tras cambiar sólo el título.
+- `export_png` a 300 DPI y a tamaño online (sin la caché de renderizado).
+- `recortar_pixmap` y `limitar_resolucion` sobre una imagen grande.
+- La conversión del texto de habilidades a HTML (`habilidad_a_html`).
+- Los resolutores de archivos de disciplinas, clanes y sendas.
+
+    python benchmarks/render.py [--repeticiones N] [--filtro TEXTO]
+                                [--salida R.json] [--referencia R.json]
+                                [--guardar-referencia]
+
+Los resultados (mediana, mínimo y máximo en ms de cada caso) se escriben en
+JSON (por defecto benchmarks/resultados/render.json) y se comparan con la
+referencia guardada con --guardar-referencia. Un caso es una regresión si
+su mediana supera la de la referencia en más de `render_tolerancia` (en
+tanto por uno) y de `render_margen_ms`, ambos de presupuestos.json.
+Termina con código 1 si hay alguna regresión.
+
+Los tiempos dependen de la máquina: la referencia es local y no se sube
+al repositorio. En máquinas compartidas conviene subir --repeticiones.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRESUPUESTOS = os.path.join(RAIZ, "benchmarks", "presupuestos.json")
+DIRECTORIO_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+
+# Cartas representativas, en el formato de `main.py render` (ver lote.py)
+CARTA_CRIPTA = {
+    "tipo": "cripta", "nombre": "Catalina Vega", "clan": "Brujah", "senda": "Ninguno",
+    "disciplinas": ["Potence Superior", "Celerity", "Presence Superior", "Auspex"],
+    "capacidad": 7, "grupo": 4,
+    "habilidad": "Independent. **+1 bleed**. [Superior Potence] Once each combat, "
+                 "this vampire may [Auspex] strike first.",
+    "ilustrador": "Juan R.", "arte": "Catalina_Vega.png",
+}
+CARTA_LIBRERIA = {
+    "tipo": "libreria", "nombre": "Dreams of the Sphinx", "tipos": ["Action", "Reaction"],
+    "clan": "Toreador", "coste": {"tipo": "blood", "valor": "2"},
+    "disciplinas": ["Auspex", "Dominate"],
+    "habilidad": "[Auspex] **+1 stealth** action.\n[Dominate] Tap target minion.",
+    "ilustrador": "Anon", "arte": "Dreams_of_the_Sphinx.png",
+}
+# Texto de habilidades largo, con negritas e iconos en línea
+TEXTO_HABILIDAD = (
+    "**Sabbat.** [Auspex] +1 intercept. [Superior Dominate] Once each turn, "
+    "this vampire may **tap** a ready minion with [Presence] or [Obfuscate]. "
+    "[Celerity] Strike: +1 damage.\n" * 4
+)
+# Lado de la imagen "grande" para el recorte (una foto de ~50 Mpx)
+LADO_IMAGEN_GRANDE = (6000, 8400)
+TAMANO_PREVIEW = (358, 500)
+
+
+def preparar_entorno():
+    """Qt sin pantalla y configuración por defecto (sin la del usuario)."""
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    os.environ["XDG_CONFIG_HOME"] = tempfile.mkdtemp(prefix="vtesproxi-bench-config-")
+    os.environ["VTESPROXI_PERFIL_PINTADO"] = "0"
+    os.chdir(RAIZ)
+    if RAIZ not in sys.path:
+        sys.path.insert(0, RAIZ)
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    from logicas.render.indice_recursos import indice_recursos_global
+    indice_recursos_global.construir()
+    return app
+
+
+def medir(funcion, repeticiones, calentamiento=2):
+    """Ejecuta `funcion` y devuelve la mediana, el mínimo y el máximo en ms."""
+    for _ in range(calentamiento):
+        funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000.0)
+    return {
+        "mediana_ms": round(statistics.median(tiempos), 4),
+        "min_ms": round(min(tiempos), 4),
+        "max_ms": round(max(tiempos), 4),
+        "repeticiones": repeticiones,
+    }
+
+
+def _widget_carta(carta, app):
+    """CartaImageWidget visible con la carta montada como en su pestaña."""
+    from PyQt5.QtGui import QPixmap
+    from ventana.cripta_widget import CartaImageWidget
+    from logicas.exportador.lote import construir_renderizador
+
+    renderizador, ruta_arte = construir_renderizador(carta, RAIZ, cargar_arte=False)
+    widget = CartaImageWidget()
+    widget.renderizador = renderizador
+    widget.set_pixmap(QPixmap(ruta_arte))
+    widget.resize(*TAMANO_PREVIEW)
+    widget.show()
+    app.processEvents()
+    return widget
+
+
+def casos_pintado(nombre, carta, app):
+    widget = _widget_carta(carta, app)
+
+    def completo():
+        # Como tras cambiar de carta: todas las capas y el arte por rehacer
+        widget._capas_sucias.update(widget.CAPAS)
+        widget._pixmap_escalado_clave = None
+        widget.repaint()
+
+    def en_cache():
+        widget.repaint()
+
+    def titulo():
+        widget.title = widget.title
+        widget.repaint()
+
+    return [
+        (f"pintado_{nombre}_completo", completo),
+        (f"pintado_{nombre}_en_cache", en_cache),
+        (f"pintado_{nombre}_titulo", titulo),
+    ]
+
+
+def casos_exportacion(nombre, carta, app, directorio):
+    from logicas.exportador.variantes import VARIANTES
+    widget = _widget_carta(carta, app)
+    casos = []
+    for variante in ("300dpi", "online"):
+        ancho, alto, dpi, _sufijo = VARIANTES[variante]
+        ruta = os.path.join(directorio, f"{nombre}_{variante}.png")
+        casos.append((
+            f"export_png_{nombre}_{variante}",
+            lambda ruta=ruta, ancho=ancho, alto=alto, dpi=dpi: widget.export_png(ruta, ancho, alto, dpi, usar_cache=False),
+        ))
+    return casos
+
+
+def casos_recorte():
+    from PyQt5.QtCore import QPointF, QRect, QRectF
+    from PyQt5.QtGui import QColor, QPixmap
+    from logicas.recorte.constantes import VTES_CARD_ASPECT_RATIO
+    from logicas.recorte.recorte import recortar_pixmap, limitar_resolucion
+
+    ancho, alto = LADO_IMAGEN_GRANDE
+    grande = QPixmap(ancho, alto)
+    grande.fill(QColor(120, 40, 40))
+    # La imagen ocupa la escena a escala 1:10; el recorte es casi toda la
+    # imagen, algo más ancho que una carta para que se ajuste la proporción
+    escena = QRectF(0, 0, ancho / 10.0, alto / 10.0)
+    arriba_izquierda = QPointF(10, 20)
+    abajo_derecha = QPointF(escena.width() - 10, escena.height() - 60)
+    return [
+        ("recortar_pixmap_grande", lambda: recortar_pixmap(
+            grande, QRect(), escena, arriba_izquierda, abajo_derecha, VTES_CARD_ASPECT_RATIO)),
+        ("limitar_resolucion_grande", lambda: limitar_resolucion(grande, 1488, 2076)),
+    ]
+
+
+def casos_texto():
+    from logicas.render.cache_texto import habilidad_a_html
+    from logicas.render.renderizador import obtener_archivo_disciplina_texto
+    return [
+        ("habilidad_a_html", lambda: habilidad_a_html(TEXTO_HABILIDAD, 14, obtener_archivo_disciplina_texto)),
+    ]
+
+
+def casos_resolutores():
+    from resources.listas.clans_list import CLANES
+    from resources.listas.disciplines_list import DISCIPLINAS
+    from resources.listas.sendas_list import SENDAS
+    from logicas.render.renderizador import obtener_archivo_disciplina_texto
+    from ventana.cripta_widget import obtener_archivo_clan, obtener_archivo_senda
+    from ventana.libreria_widget import obtener_archivo_disciplina
+
+    def disciplinas():
+        for nombre in DISCIPLINAS:
+            obtener_archivo_disciplina_texto(nombre)
+            obtener_archivo_disciplina(nombre)
+
+    def clanes_y_sendas():
+        for nombre in CLANES:
+            obtener_archivo_clan(nombre)
+        for nombre in SENDAS:
+            obtener_archivo_senda(nombre)
+
+    return [
+        (f"resolver_disciplinas_x{len(DISCIPLINAS) * 2}", disciplinas),
+        (f"resolver_clanes_sendas_x{len(CLANES) + len(SENDAS)}", clanes_y_sendas),
+    ]
+
+
+def entorno():
+    from PyQt5.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+    return {
+        "python": platform.python_version(),
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "maquina": platform.node(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def leer_presupuestos():
+    with open(PRESUPUESTOS, "r", encoding="utf-8") as f:
+        presupuestos = json.load(f)
+    return float(presupuestos["render_tolerancia"]), float(presupuestos["render_margen_ms"])
+
+
+def comparar(resultados, referencia, tolerancia, margen_ms):
+    """Imprime la comparación con la referencia; devuelve las regresiones."""
+    regresiones = []
+    anteriores = referencia.get("resultados", {})
+    for nombre, actual in resultados.items():
+        anterior = anteriores.get(nombre)
+        if anterior is None:
+            print(f"  {nombre:<36} {actual['mediana_ms']:9.3f} ms   (nuevo)")
+            continue
+        antes, ahora = anterior["mediana_ms"], actual["mediana_ms"]
+        cambio = (ahora - antes) / antes * 100.0 if antes > 0 else 0.0
+        regresion = ahora > antes * (1.0 + tolerancia) and ahora - antes > margen_ms
+        marca = "  REGRESIÓN" if regresion else ""
+        print(f"  {nombre:<36} {ahora:9.3f} ms   ref {antes:9.3f} ms   {cambio:+6.1f}%{marca}")
+        if regresion:
+            regresiones.append(nombre)
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks del renderizado, sin pantalla.")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--filtro", default="", help="sólo los casos cuyo nombre contenga este texto")
+    parser.add_argument("--salida", default=os.path.join(DIRECTORIO_RESULTADOS, "render.json"))
+    parser.add_argument("--referencia", default=os.path.join(DIRECTORIO_RESULTADOS, "render_referencia.json"))
+    parser.add_argument("--guardar-referencia", action="store_true",
+                        help="guarda estos resultados como la nueva referencia")
+    args = parser.parse_args(argv)
+
+    app = preparar_entorno()
+    with tempfile.TemporaryDirectory(prefix="vtesproxi-bench-export-") as directorio:
+        casos = []
+        casos += casos_pintado("cripta", CARTA_CRIPTA, app)
+        casos += casos_pintado("libreria", CARTA_LIBRERIA, app)
+        casos += casos_exportacion("cripta", CARTA_CRIPTA, app, directorio)
+        casos += casos_exportacion("libreria", CARTA_LIBRERIA, app, directorio)
+        casos += casos_recorte()
+        casos += casos_texto()
+        casos += casos_resolutores()
+
+        resultados = {}
+        for nombre, funcion in casos:
+            if args.filtro and args.filtro not in nombre:
+                continue
+            resultados[nombre] = medir(funcion, args.repeticiones)
+            print(f"[render] {nombre:<36} mediana {resultados[nombre]['mediana_ms']:9.3f} ms")
+
+    informe = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "entorno": entorno(),
+        "resultados": resultados,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.salida)), exist_ok=True)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    print(f"[render] Resultados en {args.salida}")
+
+    if args.guardar_referencia:
+        os.makedirs(os.path.dirname(os.path.abspath(args.referencia)), exist_ok=True)
+        with open(args.referencia, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+        print(f"[render] Referencia guardada en {args.referencia}")
+        return 0
+    if not os.path.exists(args.referencia):
+        print("[render] No hay referencia con la que comparar (usa --guardar-referencia)")
+        return 0
+
+    with open(args.referencia, "r", encoding="utf-8") as f:
+        referencia = json.load(f)
+    if referencia.get("entorno") != informe["entorno"]:
+        print("[render] Aviso: la referencia se midió en otro entorno "
+              f"({referencia.get('entorno')}); la comparación es orientativa")
+    tolerancia, margen_ms = leer_presupuestos()
+    print(f"[render] Comparación con {args.referencia} (tolerancia {tolerancia:.0%}, margen {margen_ms} ms):")
+    regresiones = comparar(resultados, referencia, tolerancia, margen_ms)
+    if regresiones:
+        print(f"[render] REGRESIÓN en {len(regresiones)} caso(s): {', '.join(regresiones)}")
+        return 1
+    print("[render] OK: sin regresiones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,25 @@
+import os
 import sys
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFileDialog
 )
-from PyQt5.QtCore import pyqtSlot, Qt
+from PyQt5.QtCore import pyqtSlot, Qt, QTimer
 from PyQt5.QtWidgets import QSizePolicy
 from PyQt5.QtGui import QPixmap
 from logicas.recorte.constantes import VTES_CARD_ASPECT_RATIO
+from logicas.diagnostico.arranque import perfil_arranque
+
+# Posición de las pestañas que se construyen al abrirlas por primera vez
+INDICE_LIBRERIA = 1
+INDICE_CONFIGURACION = 2
+
 
 class CartaApp(QMainWindow):
     def resizeEvent(self, event):
         super().resizeEvent(event)
+        self.ajustar_proporcion_cartas()
+
+    def ajustar_proporcion_cartas(self):
         # Mantener proporción de carta VTES en QLabel o widget personalizado
         vtes_ratio = VTES_CARD_ASPECT_RATIO
         for label_name in ["cripta_label", "libreria_label"]:
@@ -18,22 +28,14 @@ class CartaApp(QMainWindow):
                 height = label.height()
                 width = int(height * vtes_ratio)
                 label.setFixedWidth(width)
-                # Si hay imagen, reescalar para el nuevo tamaño
-                # Compatibilidad con QLabel y CartaImageWidget
-                pixmap = getattr(label, "pixmap", None)
-                if callable(pixmap):
-                    pixmap = pixmap()
-                elif isinstance(pixmap, QPixmap):
-                    pass
-                else:
-                    pixmap = None
-                if pixmap:
-                    KEEP_ASPECT_RATIO = 1  # Qt.KeepAspectRatio
-                    SMOOTH_TRANSFORMATION = 1  # Qt.SmoothTransformation
-                    if hasattr(label, "setPixmap"):
-                        label.setPixmap(pixmap.scaled(width, height, KEEP_ASPECT_RATIO, SMOOTH_TRANSFORMATION))
-                    elif hasattr(label, "set_pixmap"):
-                        label.set_pixmap(pixmap.scaled(width, height, KEEP_ASPECT_RATIO, SMOOTH_TRANSFORMATION))
+                # CartaImageWidget conserva la imagen original y cachea su
+                # propia copia escalada: nunca se le devuelve un pixmap
+                # reducido, o la exportación acabaría ampliando una miniatura.
+                # Sólo un QLabel normal necesita que le reescalemos la imagen.
+                if hasattr(label, "setPixmap"):
+                    pixmap = label.pixmap()
+                    if pixmap:
+                        label.setPixmap(pixmap.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation))
     def __init__(self):
         super().__init__()
         self.setWindowTitle('Creador de Cartas VTES')
@@ -41,30 +43,186 @@ class CartaApp(QMainWindow):
         self.initUI()
 
     def initUI(self):
+        # Índice de iconos de resources/: se construye una vez antes de
+        # crear la pestaña Cripta, que lo consulta al rellenar sus selectores
+        from logicas.render.indice_recursos import indice_recursos_global
+        with perfil_arranque.tramo("indice_recursos"):
+            indice_recursos_global.construir()
         self.tabs = QTabWidget()
-        from ventana.cripta_widget import CriptaWidget
-        self.cripta_tab = CriptaWidget(importar_imagen_callback=self.importar_imagen)
+        with perfil_arranque.tramo("pestana_cripta"):
+            from ventana.cripta_widget import CriptaWidget
+            self.cripta_tab = CriptaWidget(importar_imagen_callback=self.importar_imagen)
         self.cripta_label = self.cripta_tab.cripta_label
         self.cripta_title = self.cripta_tab.cripta_title
-        from ventana.libreria_widget import LibreriaWidget
-        self.libreria_tab = LibreriaWidget(importar_imagen_callback=self.importar_imagen)
-        self.libreria_label = self.libreria_tab.libreria_label
-        # Pestaña Configuración
-        from ventana.configuracion_widget import ConfiguracionWidget
-        self.config_tab = ConfiguracionWidget(
-            carta_title_label=self.cripta_title, 
-            cripta_widget=self.cripta_tab,
-            libreria_widget=self.libreria_tab
-        )
+        # Librería y Configuración se construyen la primera vez que se abren;
+        # hasta entonces la pestaña muestra un aviso provisional
+        self.libreria_tab = None
+        self.libreria_label = None
+        self.config_tab = None
         # Añadir pestañas
         self.tabs.addTab(self.cripta_tab, 'Cripta')
-        self.tabs.addTab(self.libreria_tab, 'Librería')
-        self.tabs.addTab(self.config_tab, 'Configuración')
+        self.tabs.addTab(self._pestana_provisional(), 'Librería')
+        self.tabs.addTab(self._pestana_provisional(), 'Configuración')
+        self.tabs.currentChanged.connect(self._pestana_activada)
         self.tabs.setMinimumSize(400, 400)
         self.setCentralWidget(self.tabs)
+        # Las exportaciones se escriben en segundo plano; su estado se
+        # muestra en la barra inferior, con un botón para cancelarlas
+        from logicas.exportador.trabajos import gestor_exportaciones
+        gestor = gestor_exportaciones()
+        self.btn_cancelar_exportacion = QPushButton('Cancelar exportación')
+        self.btn_cancelar_exportacion.clicked.connect(gestor.cancelar_todo)
+        self.btn_cancelar_exportacion.hide()
+        self.statusBar().addPermanentWidget(self.btn_cancelar_exportacion)
+        gestor.estado.connect(lambda mensaje: self.statusBar().showMessage(mensaje, 5000))
+        gestor.activas_cambiadas.connect(lambda activas: self.btn_cancelar_exportacion.setVisible(activas > 0))
+        # Lo que no hace falta para mostrar la ventana se prepara cuando el
+        # bucle de eventos queda libre tras el primer pintado
+        QTimer.singleShot(0, self._precalentar)
+
+    def _pestana_provisional(self):
+        provisional = QWidget()
+        layout = QVBoxLayout(provisional)
+        aviso = QLabel('Cargando...')
+        aviso.setAlignment(Qt.AlignCenter)
+        layout.addWidget(aviso)
+        return provisional
+
+    def _sustituir_pestana(self, indice, widget, titulo):
+        provisional = self.tabs.widget(indice)
+        actual = self.tabs.currentIndex()
+        # Sin currentChanged mientras se cambia el widget de la pestaña
+        self.tabs.blockSignals(True)
+        self.tabs.removeTab(indice)
+        self.tabs.insertTab(indice, widget, titulo)
+        self.tabs.setCurrentIndex(actual)
+        self.tabs.blockSignals(False)
+        provisional.deleteLater()
+
+    def _pestana_activada(self, indice):
+        if indice == INDICE_LIBRERIA:
+            self.construir_libreria()
+        elif indice == INDICE_CONFIGURACION:
+            self.construir_configuracion()
+
+    def construir_libreria(self):
+        """Crea la pestaña Librería si aún no existe y la devuelve."""
+        if self.libreria_tab is None:
+            with perfil_arranque.tramo("pestana_libreria"):
+                from ventana.libreria_widget import LibreriaWidget
+                self.libreria_tab = LibreriaWidget(importar_imagen_callback=self.importar_imagen)
+            self.libreria_label = self.libreria_tab.libreria_label
+            self._sustituir_pestana(INDICE_LIBRERIA, self.libreria_tab, 'Librería')
+            # La proporción de la carta se calcula con la pestaña ya colocada
+            QTimer.singleShot(0, self.ajustar_proporcion_cartas)
+        return self.libreria_tab
+
+    def construir_configuracion(self):
+        """Crea la pestaña Configuración si aún no existe y la devuelve."""
+        if self.config_tab is None:
+            with perfil_arranque.tramo("pestana_configuracion"):
+                from ventana.configuracion_widget import ConfiguracionWidget
+                self.config_tab = ConfiguracionWidget(
+                    carta_title_label=self.cripta_title,
+                    cripta_widget=self.cripta_tab,
+                    libreria_widget=self.libreria_tab
+                )
+            self._sustituir_pestana(INDICE_CONFIGURACION, self.config_tab, 'Configuración')
+        return self.config_tab
+
+    def _precalentar(self):
+        """Registra el resto de fuentes de fonts/ con la ventana ya visible.
+
+        La pestaña Cripta sólo registra las fuentes que usa; las demás (la
+        negrita, las que ofrece Configuración) se registran aquí, una por
+        vuelta del bucle de eventos para no bloquear la interfaz, y quedan
+        compartidas por todas las pestañas. El índice de iconos ya está
+        construido, así que abrir Librería no recorre resources/.
+        """
+        from logicas.render.fuentes import registro_fuentes_global
+        pasos = [
+            lambda archivo=archivo: registro_fuentes_global.familia(archivo)
+            for _nombre, archivo in registro_fuentes_global.disponibles()
+        ]
+
+        def siguiente():
+            if pasos:
+                pasos.pop(0)()
+                QTimer.singleShot(0, siguiente)
+        siguiente()
+
+    def closeEvent(self, event):
+        # No cerrar con archivos a medio escribir
+        from logicas.exportador.trabajos import gestor_exportaciones
+        gestor_exportaciones().esperar()
+        # Escribir la configuración que aún espera al guardado diferido
+        from configuracion import almacen_configuracion
+        almacen_configuracion().guardar()
+        super().closeEvent(event)
+
+    def traer_al_frente(self):
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+    def _pestana_carta_actual(self):
+        """Pestaña de carta activa (Cripta si está abierta Configuración)."""
+        if self.tabs.currentIndex() == INDICE_LIBRERIA:
+            return self.construir_libreria()
+        self.tabs.setCurrentWidget(self.cripta_tab)
+        return self.cripta_tab
+
+    def abrir_argumentos(self, argumentos):
+        """Abre lo pasado por línea de comandos (o por otro lanzamiento, ver
+        instancia_unica): imágenes, que se importan en la pestaña actual, y
+        archivos de carta (.json).
+        """
+        from logicas.exportador.lote import EXTENSIONES_ARTE
+        self.traer_al_frente()
+        for ruta in argumentos:
+            if not os.path.isfile(ruta):
+                self.statusBar().showMessage(f"No existe {ruta}", 5000)
+            elif ruta.lower().endswith(".json"):
+                self.abrir_archivo_carta(ruta)
+            elif ruta.lower().endswith(EXTENSIONES_ARTE):
+                self.importar_imagen(self._pestana_carta_actual(), ruta=ruta)
+            else:
+                self.statusBar().showMessage(f"No se puede abrir {os.path.basename(ruta)}", 5000)
+
+    def abrir_archivo_carta(self, ruta):
+        """Carga en su pestaña la (primera) carta de un archivo en el formato
+        de `main.py render`; la ilustración se busca junto al archivo."""
+        from logicas.exportador.lote import cargar_mazo, buscar_arte
+        try:
+            cartas = cargar_mazo(ruta)
+        except (OSError, ValueError) as e:
+            self.statusBar().showMessage(f"No se puede abrir {os.path.basename(ruta)}: {e}", 5000)
+            return
+        if not cartas:
+            self.statusBar().showMessage(f"{os.path.basename(ruta)} no contiene cartas", 5000)
+            return
+        carta = cartas[0]
+        if str(carta.get("tipo", "cripta")).lower() == "libreria":
+            widget = self.construir_libreria()
+        else:
+            widget = self.cripta_tab
+        self.tabs.setCurrentWidget(widget)
+        widget.cargar_carta(carta)
+        ruta_arte = buscar_arte(carta, os.path.dirname(ruta))
+        if ruta_arte:
+            from logicas.exportador.variantes import tamano_maximo_arte
+            from logicas.recorte.recorte import limitar_resolucion
+            from configuracion import almacen_configuracion
+            ancho_maximo, alto_maximo = tamano_maximo_arte(almacen_configuracion().datos())
+            pixmap = QPixmap(ruta_arte)
+            if not pixmap.isNull():
+                self.mostrar_imagen_recortada(widget, limitar_resolucion(pixmap, ancho_maximo, alto_maximo))
+        if len(cartas) > 1:
+            self.statusBar().showMessage(f"{os.path.basename(ruta)} tiene {len(cartas)} cartas: se ha abierto la primera", 5000)
 
     @pyqtSlot()
-    def importar_imagen(self, widget, *args, **kwargs):
+    def importar_imagen(self, widget, *args, ruta=None, **kwargs):
         # Delegar el flujo completo al importador modular
         if widget is self.cripta_tab:
             label = self.cripta_label
@@ -75,7 +233,7 @@ class CartaApp(QMainWindow):
         from logicas.seleccion.importador_imagen import importar_imagen
         def on_pixmap_ready(pixmap):
             self.mostrar_imagen_recortada(widget, pixmap)
-        importar_imagen(self, label, on_pixmap_ready)
+        importar_imagen(self, label, on_pixmap_ready, ruta=ruta)
 
     def mostrar_imagen_recortada(self, widget, pixmap):
         # Muestra la imagen recortada ocupando todo el alto, alineada a la izquierda
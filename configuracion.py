@@ -1,9 +1,15 @@
 # Módulo de configuración para la app de cartas VTES
 # Aquí se definen las opciones de configuración globales
 
+import atexit
+import copy
 import json
 import os
+import stat
 import sys
+import tempfile
+
+from PyQt5.QtCore import QCoreApplication, QObject, QTimer, pyqtSignal
 
 def get_resource_path(relative_path):
     meipass = getattr(sys, '_MEIPASS', None)
@@ -15,6 +21,10 @@ def get_resource_path(relative_path):
 
 DEFAULT_CONFIG_RELATIVE_PATH = os.path.join('config', 'textos', 'config_data.json')
 
+# Espera tras el último cambio antes de escribir config_data.json, para que
+# arrastrar un slider o un spinbox no reescriba el archivo en cada paso
+RETARDO_GUARDADO_MS = 500
+
 
 def get_default_config_path() -> str:
     return get_resource_path(DEFAULT_CONFIG_RELATIVE_PATH)
@@ -59,14 +69,202 @@ def load_config_data(fallback: dict | None = None) -> dict:
     return dict(fallback or {})
 
 
+def _permisos_config(ruta: str) -> int:
+    try:
+        return stat.S_IMODE(os.stat(ruta).st_mode)
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
 def save_config_data(data: dict) -> str:
-    """Guarda config_data.json en el path de usuario y devuelve la ruta."""
+    """Guarda config_data.json en el path de usuario y devuelve la ruta.
+
+    Escritura atómica: se escribe un archivo temporal en la misma carpeta y
+    se renombra encima, así que si el proceso muere a mitad queda intacta
+    la configuración anterior.
+    """
     user_path = get_user_config_path()
-    os.makedirs(os.path.dirname(user_path), exist_ok=True)
-    with open(user_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    directorio = os.path.dirname(user_path)
+    os.makedirs(directorio, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=directorio, prefix='.config_data.', suffix='.tmp')
+    try:
+        # mkstemp crea el archivo con permisos 0600: conservar los del
+        # archivo anterior o, si no existe, los que daría open() (umask)
+        os.chmod(temporal, _permisos_config(user_path))
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, user_path)
+    except BaseException:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        raise
     return user_path
 
+def obtener_clave(datos: dict, clave: str, por_defecto=None):
+    """Valor de una clave con puntos ("simbolo_disciplina.tamano") o por_defecto."""
+    valor = datos
+    for parte in clave.split('.'):
+        if not isinstance(valor, dict) or parte not in valor:
+            return por_defecto
+        valor = valor[parte]
+    return valor
+
+
+class AlmacenConfiguracion(QObject):
+    """config_data.json cargado una sola vez y compartido por toda la aplicación.
+
+    Cada cambio se hace con `establecer("seccion.clave", valor)`, que emite
+    `cambiado` con la clave concreta, de modo que cada pestaña actualiza
+    sólo la propiedad afectada de su carta.
+
+    El archivo no se escribe en cada cambio: se guarda RETARDO_GUARDADO_MS
+    después del último y, si queda algo pendiente, al salir de la
+    aplicación (`guardar()`).
+    """
+
+    # Clave con puntos ("simbolo_disciplina.tamano") y nuevo valor
+    cambiado = pyqtSignal(str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._datos = load_config_data({})
+        self._pendiente = False
+        self._temporizador = None
+        # Último recurso si la aplicación termina sin pasar por aboutToQuit
+        atexit.register(self.guardar)
+
+    def datos(self) -> dict:
+        """Copia de toda la configuración (se puede modificar libremente)."""
+        return copy.deepcopy(self._datos)
+
+    def obtener(self, clave: str, por_defecto=None):
+        return copy.deepcopy(obtener_clave(self._datos, clave, por_defecto))
+
+    def establecer(self, clave: str, valor) -> bool:
+        """Cambia una clave, programa el guardado y avisa del cambio.
+
+        Devuelve False (sin guardar ni emitir nada) si el valor no cambia.
+        """
+        partes = clave.split('.')
+        seccion = self._datos
+        for parte in partes[:-1]:
+            if not isinstance(seccion.get(parte), dict):
+                seccion[parte] = {}
+            seccion = seccion[parte]
+        if partes[-1] in seccion and seccion[partes[-1]] == valor:
+            return False
+        seccion[partes[-1]] = copy.deepcopy(valor)
+        self._programar_guardado()
+        self.cambiado.emit(clave, valor)
+        return True
+
+    def _programar_guardado(self):
+        self._pendiente = True
+        app = QCoreApplication.instance()
+        if app is None:
+            # Sin bucle de eventos no hay temporizador: guardar ya
+            self.guardar()
+            return
+        if self._temporizador is None:
+            self._temporizador = QTimer(self)
+            self._temporizador.setSingleShot(True)
+            self._temporizador.setInterval(RETARDO_GUARDADO_MS)
+            self._temporizador.timeout.connect(self.guardar)
+            app.aboutToQuit.connect(self.guardar)
+        # Reinicia la espera con cada cambio
+        self._temporizador.start()
+
+    def hay_cambios_pendientes(self) -> bool:
+        return self._pendiente
+
+    def guardar(self) -> bool:
+        """Escribe ya los cambios pendientes (p. ej. al cerrar la ventana).
+
+        Devuelve False si no se pudo escribir; los cambios siguen pendientes
+        y se reintenta en el siguiente guardado programado o al salir.
+        """
+        if self._temporizador is not None:
+            try:
+                if self._temporizador.isActive():
+                    self._temporizador.stop()
+            except RuntimeError:
+                # QTimer ya destruido (guardado desde atexit)
+                pass
+        if not self._pendiente:
+            return True
+        try:
+            save_config_data(self._datos)
+        except OSError as e:
+            print(f"[configuracion] No se puede guardar config_data.json: {e}")
+            return False
+        self._pendiente = False
+        return True
+
+    def conectar(self, prefijo: str, funcion):
+        """Llama a funcion(clave, valor) cuando cambia `prefijo` o una clave bajo él."""
+        def filtrar(clave, valor):
+            if clave == prefijo or clave.startswith(prefijo + '.'):
+                funcion(clave, valor)
+        self.cambiado.connect(filtrar)
+        return filtrar
+
+    def recargar(self):
+        """Vuelve a leer config_data.json (p. ej. si se ha editado a mano).
+
+        Emite `cambiado` por cada clave cuyo valor haya cambiado (con None
+        si ha desaparecido), como si se hubiera cambiado con `establecer`.
+        No recarga si hay cambios pendientes que no se han podido guardar.
+        """
+        if not self.guardar():
+            return
+        anteriores = self._datos
+        self._datos = load_config_data({})
+        for clave in _claves_distintas(anteriores, self._datos):
+            self.cambiado.emit(clave, self.obtener(clave))
+
+
+def _claves_distintas(antes: dict, despues: dict, prefijo: str = ''):
+    """Claves con puntos (hojas) cuyo valor difiere entre dos configuraciones."""
+    for parte in sorted(set(antes) | set(despues)):
+        clave = prefijo + parte
+        valor_antes = antes.get(parte)
+        valor_despues = despues.get(parte)
+        if isinstance(valor_antes, dict) or isinstance(valor_despues, dict):
+            yield from _claves_distintas(
+                valor_antes if isinstance(valor_antes, dict) else {},
+                valor_despues if isinstance(valor_despues, dict) else {},
+                clave + '.',
+            )
+        elif parte not in antes or parte not in despues or valor_antes != valor_despues:
+            yield clave
+
+
+_almacen_global = None
+
+
+def almacen_configuracion() -> AlmacenConfiguracion:
+    """Almacén compartido (se crea al usarlo por primera vez)."""
+    global _almacen_global
+    if _almacen_global is None:
+        _almacen_global = AlmacenConfiguracion()
+    return _almacen_global
+
+
+def cargar_config(por_defecto: dict) -> dict:
+    """Copia de la configuración del almacén completada con `por_defecto`.
+
+    Las claves que falten en config_data.json (a cualquier nivel) toman el
+    valor de `por_defecto`.
+    """
+    return _deep_merge_dicts(por_defecto, almacen_configuracion().datos())
+
+
 class Configuracion:
     def __init__(self):
         # Tamaño de los iconos en la carta (por defecto 32x32)
@@ -105,10 +303,14 @@ class Configuracion:
             'title_font_size': self.title_font_size,
             'title_color': self.title_color
         }
-        save_config_data(data)
+        # Cada clave pasa por el almacén, que agrupa las escrituras; antes se
+        # reescribía config_data.json entero (y sólo con estas claves)
+        almacen = almacen_configuracion()
+        for clave, valor in data.items():
+            almacen.establecer(clave, valor)
 
     def load(self):
-        data = load_config_data({})
+        data = almacen_configuracion().datos()
         self.icon_size = data.get('icon_size', self.icon_size)
         self.font_main = data.get('font_main', self.font_main)
         self.font_title = data.get('font_title', self.font_title)
@@ -156,4 +358,6 @@ class Configuracion:
         self.save()
 
 # Instancia global de configuración
-configuracion_global = Configuracion()
+from logicas.diagnostico.arranque import perfil_arranque
+with perfil_arranque.tramo("configuracion_global"):
+    configuracion_global = Configuracion()
@@ -65,7 +65,7 @@ Version=1.0
 Type=Application
 Name=VTES Proxi
 Comment=Lanzador de la aplicación VTES Proxi
-Exec=vtesproxi
+Exec=vtesproxi %F
 Path=$SHARE_DIR
 Icon=$ICON_PATH
 Terminal=false
@@ -0,0 +1,157 @@
+"""Perfil del arranque de la aplicación.
+
+Se activa con la variable de entorno VTESPROXI_PERFIL_ARRANQUE=1 o con
+`main.py --perfil-arranque`. Cada hito (arranque del intérprete, importación
+de PyQt, carga de `configuracion_global`, construcción de cada pestaña,
+registro de cada fuente, primer pintado...) se escribe como una línea JSON
+en el directorio de logs de `lanzar.sh`:
+
+    $XDG_STATE_HOME/vtesproxi/arranque.jsonl   (~/.local/state/vtesproxi)
+
+Cada línea lleva la sesión (pid e instante de arranque), el evento y los
+milisegundos desde que arrancó el proceso; los tramos (`tramo()`) añaden
+además su duración.
+
+Con VTESPROXI_PERFIL_ARRANQUE=salir la aplicación se cierra tras el primer
+pintado, para medir el arranque sin interfaz (benchmarks/arranque.py).
+
+Este módulo no importa Qt al cargarse, para poder marcar cuándo se importa.
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+
+VARIABLE_ENTORNO = "VTESPROXI_PERFIL_ARRANQUE"
+OPCION_CLI = "--perfil-arranque"
+NOMBRE_LOG = "arranque.jsonl"
+
+
+def directorio_logs():
+    """Carpeta de logs de la aplicación (la misma que usa lanzar.sh)."""
+    base = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    return os.path.join(base, "vtesproxi")
+
+
+def _inicio_proceso():
+    """Instante (time.time()) en que arrancó el proceso, o None si no se sabe."""
+    try:
+        with open("/proc/self/stat", "r") as f:
+            # Los campos tras el nombre del ejecutable empiezan en el 3;
+            # starttime es el 22, en ticks desde el arranque del sistema
+            campos = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + int(campos[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class PerfilArranque:
+    """Hitos del arranque con su instante desde el inicio del proceso."""
+
+    def __init__(self):
+        self.activo = False
+        self.salir_tras_pintado = False
+        self.ruta = None
+        self.marcas = []
+        self._archivo = None
+        self._sesion = None
+        # perf_counter() equivalente al arranque del proceso
+        self._t0 = time.perf_counter()
+        self._pintado = False
+        self._filtro = None
+
+    def activar(self, ruta=None, salir_tras_pintado=False):
+        """Empieza a registrar hitos en `ruta` (por defecto, arranque.jsonl)."""
+        if self.activo:
+            return
+        inicio = _inicio_proceso()
+        ahora = time.time()
+        if inicio is not None and inicio <= ahora:
+            self._t0 = time.perf_counter() - (ahora - inicio)
+        else:
+            inicio = ahora - (time.perf_counter() - self._t0)
+        self.ruta = ruta or os.path.join(directorio_logs(), NOMBRE_LOG)
+        try:
+            os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+            self._archivo = open(self.ruta, "a", encoding="utf-8")
+        except OSError as e:
+            print(f"[perfil] No se puede escribir {self.ruta}: {e}", file=sys.stderr)
+            return
+        self.activo = True
+        self.salir_tras_pintado = salir_tras_pintado
+        self._sesion = f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(inicio))}-{os.getpid()}"
+        self.marca("inicio_interprete", ms=0.0)
+        self.marca("perfil_activado")
+
+    def ms(self):
+        """Milisegundos desde el arranque del proceso."""
+        return (time.perf_counter() - self._t0) * 1000.0
+
+    def marca(self, evento, ms=None, **datos):
+        """Registra un hito (no hace nada si el perfil no está activo)."""
+        if not self.activo:
+            return
+        linea = {"sesion": self._sesion, "evento": evento, "ms": round(self.ms() if ms is None else ms, 2)}
+        linea.update(datos)
+        self.marcas.append(linea)
+        self._archivo.write(json.dumps(linea, ensure_ascii=False) + "\n")
+        self._archivo.flush()
+
+    @contextmanager
+    def tramo(self, evento, **datos):
+        """Registra `evento` al terminar el bloque, con su duración en ms."""
+        if not self.activo:
+            yield
+            return
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.marca(evento, duracion_ms=round((time.perf_counter() - inicio) * 1000.0, 2), **datos)
+
+    def vigilar_primer_pintado(self, app):
+        """Marca `primer_pintado` con el primer paintEvent de la aplicación."""
+        if not self.activo or self._filtro is not None:
+            return
+        from PyQt5.QtCore import QEvent, QObject, QTimer
+
+        perfil = self
+
+        class _FiltroPintado(QObject):
+            def eventFilter(self, objeto, evento):
+                if evento.type() == QEvent.Paint and not perfil._pintado:
+                    perfil._pintado = True
+                    perfil.marca("primer_pintado", widget=type(objeto).__name__)
+                    app.removeEventFilter(self)
+                    if perfil.salir_tras_pintado:
+                        # Dejar terminar el pintado en curso antes de salir
+                        QTimer.singleShot(0, app.quit)
+                return False
+
+        self._filtro = _FiltroPintado()
+        app.installEventFilter(self._filtro)
+
+
+# Perfil global: los módulos marcan sus hitos aquí (sin coste si está inactivo)
+perfil_arranque = PerfilArranque()
+
+
+def activar_si_se_pide(argv):
+    """Activa el perfil si lo pide la variable de entorno o la opción de línea
+    de comandos; devuelve argv sin la opción.
+    """
+    valor = os.environ.get(VARIABLE_ENTORNO, "").strip().lower()
+    pedido = valor not in ("", "0", "no", "false")
+    resto = []
+    for argumento in argv:
+        if argumento == OPCION_CLI:
+            pedido = True
+        else:
+            resto.append(argumento)
+    if pedido:
+        perfil_arranque.activar(salir_tras_pintado=(valor == "salir"))
+    return resto
@@ -0,0 +1,215 @@
+"""Perfil del pintado de la carta por secciones.
+
+Se activa con la variable de entorno VTESPROXI_PERFIL_PINTADO (o con
+`perfil_pintado.activar()`):
+
+    VTESPROXI_PERFIL_PINTADO=1     mide cada sección y guarda la traza al salir
+    VTESPROXI_PERFIL_PINTADO=hud   además dibuja un resumen sobre la vista previa
+
+Cada sección (`paintEvent`, escalado del arte, cada capa, clan, senda,
+disciplinas, maquetación y dibujo del texto de habilidades, ilustrador,
+coste...) se cronometra con perf_counter_ns. Por sección se guardan las
+últimas VENTANA duraciones para calcular percentiles (p50/p95/máx), y todas
+se añaden a una traza en el formato de Chrome (chrome://tracing o
+https://ui.perfetto.dev) que se escribe al salir en
+
+    $XDG_STATE_HOME/vtesproxi/pintado-<fecha>-<pid>.json
+
+o en la ruta de VTESPROXI_TRAZA_PINTADO. Sin activar, `seccion()` devuelve
+un contexto vacío y no mide nada.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+from logicas.diagnostico.arranque import directorio_logs
+
+
+VARIABLE_ENTORNO = "VTESPROXI_PERFIL_PINTADO"
+VARIABLE_TRAZA = "VTESPROXI_TRAZA_PINTADO"
+# Duraciones recientes por sección para los percentiles
+VENTANA = 200
+# Eventos de la traza que se conservan (los más antiguos se descartan)
+MAX_EVENTOS = 200000
+
+_NULO = nullcontext()
+
+
+def percentil(ordenados, p):
+    """Percentil `p` (0-100) de una lista ya ordenada (rango más cercano)."""
+    if not ordenados:
+        return 0
+    indice = max(0, min(len(ordenados) - 1, int(round(p / 100.0 * len(ordenados))) - 1))
+    return ordenados[indice]
+
+
+class _Seccion:
+    __slots__ = ("perfil", "nombre", "datos", "inicio")
+
+    def __init__(self, perfil, nombre, datos):
+        self.perfil = perfil
+        self.nombre = nombre
+        self.datos = datos
+
+    def __enter__(self):
+        self.inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.perfil.registrar(self.nombre, self.inicio, time.perf_counter_ns() - self.inicio, self.datos)
+        return False
+
+
+class PerfilPintado:
+    """Duraciones por sección del pintado, con percentiles y traza de Chrome."""
+
+    def __init__(self):
+        self.activo = False
+        self.hud = False
+        self._duraciones = {}
+        self._eventos = deque(maxlen=MAX_EVENTOS)
+        self._lock = threading.Lock()
+        self._guardado_al_salir = False
+
+    def activar(self, hud=False):
+        self.activo = True
+        self.hud = self.hud or hud
+        if not self._guardado_al_salir:
+            atexit.register(self._volcar_al_salir)
+            self._guardado_al_salir = True
+
+    def configurar_desde_entorno(self):
+        valor = os.environ.get(VARIABLE_ENTORNO, "").strip().lower()
+        if valor not in ("", "0", "no", "false"):
+            self.activar(hud=(valor == "hud"))
+
+    def seccion(self, nombre, **datos):
+        """Contexto que mide el bloque como la sección `nombre`."""
+        if not self.activo:
+            return _NULO
+        return _Seccion(self, nombre, datos)
+
+    def inicio(self):
+        """Instante de inicio de una sección (None si el perfil está inactivo).
+
+        Para tramos largos de código, sin reindentarlos bajo un `with`:
+
+            t = perfil_pintado.inicio()
+            ...
+            t = perfil_pintado.fin("clan", t)   # y empieza la siguiente
+        """
+        return time.perf_counter_ns() if self.activo else None
+
+    def fin(self, nombre, inicio_ns, **datos):
+        """Registra la sección que empezó en `inicio_ns`; devuelve el inicio de la siguiente."""
+        if inicio_ns is None:
+            return None
+        ahora = time.perf_counter_ns()
+        self.registrar(nombre, inicio_ns, ahora - inicio_ns, datos)
+        return ahora
+
+    def registrar(self, nombre, inicio_ns, duracion_ns, datos=None):
+        evento = {
+            "name": nombre,
+            "cat": "pintado",
+            "ph": "X",
+            "ts": inicio_ns / 1000.0,
+            "dur": duracion_ns / 1000.0,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if datos:
+            evento["args"] = datos
+        with self._lock:
+            duraciones = self._duraciones.get(nombre)
+            if duraciones is None:
+                duraciones = self._duraciones[nombre] = deque(maxlen=VENTANA)
+            duraciones.append(duracion_ns)
+            self._eventos.append(evento)
+
+    def resumen(self):
+        """[(sección, n, p50_ms, p95_ms, max_ms)] de las últimas VENTANA medidas."""
+        with self._lock:
+            copias = {nombre: sorted(d) for nombre, d in self._duraciones.items()}
+        filas = []
+        for nombre, ordenadas in copias.items():
+            filas.append((
+                nombre,
+                len(ordenadas),
+                percentil(ordenadas, 50) / 1e6,
+                percentil(ordenadas, 95) / 1e6,
+                ordenadas[-1] / 1e6,
+            ))
+        # Las secciones más lentas primero
+        filas.sort(key=lambda f: f[3], reverse=True)
+        return filas
+
+    def dibujar_hud(self, painter, rect):
+        """Dibuja el resumen en un recuadro translúcido en la esquina del `rect`."""
+        from PyQt5.QtCore import QRectF, Qt
+        from PyQt5.QtGui import QColor, QFont, QFontMetrics
+
+        filas = self.resumen()
+        if not filas:
+            return
+        lineas = [f"{'sección':<16} {'p50':>6} {'p95':>6} {'máx':>6} ms"]
+        lineas += [f"{nombre[:16]:<16} {p50:6.2f} {p95:6.2f} {maximo:6.2f}" for nombre, _n, p50, p95, maximo in filas]
+        fuente = QFont("Monospace", 7)
+        fuente.setStyleHint(QFont.TypeWriter)
+        fm = QFontMetrics(fuente)
+        alto_linea = fm.height()
+        ancho = max(fm.horizontalAdvance(linea) for linea in lineas) + 8
+        alto = alto_linea * len(lineas) + 6
+        caja = QRectF(rect.left() + 4, rect.top() + 4, min(ancho, rect.width() - 8), alto)
+
+        painter.save()
+        painter.resetTransform()
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 170))
+        painter.drawRoundedRect(caja, 4, 4)
+        painter.setFont(fuente)
+        painter.setPen(QColor(120, 255, 120))
+        y = caja.top() + 3
+        for linea in lineas:
+            painter.drawText(QRectF(caja.left() + 4, y, caja.width() - 8, alto_linea), Qt.AlignLeft | Qt.AlignVCenter, linea)
+            y += alto_linea
+        painter.restore()
+
+    def traza(self):
+        """Traza en el formato de Chrome (dict listo para json.dump)."""
+        with self._lock:
+            eventos = list(self._eventos)
+        metadatos = [{
+            "name": "process_name", "ph": "M", "pid": os.getpid(),
+            "args": {"name": "vtesproxi"},
+        }]
+        return {"traceEvents": metadatos + eventos, "displayTimeUnit": "ms"}
+
+    def volcar_traza(self, ruta=None):
+        """Escribe la traza en `ruta` (por defecto, en la carpeta de logs) y devuelve la ruta."""
+        if ruta is None:
+            ruta = os.environ.get(VARIABLE_TRAZA) or os.path.join(
+                directorio_logs(), f"pintado-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.json"
+            )
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.traza(), f)
+        return ruta
+
+    def _volcar_al_salir(self):
+        if not self._eventos:
+            return
+        try:
+            ruta = self.volcar_traza()
+            print(f"[perfil] Traza de pintado en {ruta}")
+        except OSError as e:
+            print(f"[perfil] No se pudo guardar la traza de pintado: {e}")
+
+
+# Perfil global: el renderizador y la vista previa miden aquí sus secciones
+perfil_pintado = PerfilPintado()
+perfil_pintado.configurar_desde_entorno()
@@ -0,0 +1,172 @@
+"""Vigilante de bloqueos del hilo de la interfaz.
+
+Cuando la aplicación se congela (decodificar una imagen grande al
+importarla, una exportación síncrona, el guardado de la configuración, el
+diálogo de Tk...) no quedaba ninguna pista de por qué. Un QTimer del hilo
+de la interfaz late cada PERIODO_MS; un hilo aparte comprueba los latidos
+y, si el bucle de eventos tarda más del umbral en atender el siguiente,
+toma la pila de Python del hilo de la interfaz con `sys._current_frames()`.
+Al terminar el bloqueo se escribe su duración y esa pila en el log de la
+aplicación (el mismo que usa `lanzar.sh`):
+
+    $XDG_STATE_HOME/vtesproxi/vtesproxi.log
+
+La duración se mide entre latidos, con una precisión de unos PERIODO_MS.
+La vigilancia empieza con el primer latido, cuando el bucle ya ha atendido
+los eventos del arranque (para eso está el perfil de arranque).
+
+Si el bloqueo dura más de BLOQUEO_LARGO_MS se escribe además un aviso
+mientras sigue, por si la aplicación no llega a recuperarse.
+
+El umbral se cambia con VTESPROXI_VIGILANTE_MS (por defecto UMBRAL_MS);
+VTESPROXI_VIGILANTE_MS=0 lo desactiva.
+"""
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from logicas.diagnostico.arranque import directorio_logs
+
+
+VARIABLE_ENTORNO = "VTESPROXI_VIGILANTE_MS"
+NOMBRE_LOG = "vtesproxi.log"
+UMBRAL_MS = 100
+# Intervalo de los latidos (y de las comprobaciones del hilo vigilante)
+PERIODO_MS = 50
+BLOQUEO_LARGO_MS = 5000
+# Informes recientes que se conservan en memoria
+MAX_INFORMES = 50
+
+
+def umbral_desde_entorno():
+    """Umbral en ms de VTESPROXI_VIGILANTE_MS (0 = desactivado)."""
+    valor = os.environ.get(VARIABLE_ENTORNO, "").strip()
+    if not valor:
+        return UMBRAL_MS
+    try:
+        return max(0, int(valor))
+    except ValueError:
+        print(f"[vigilante] {VARIABLE_ENTORNO}={valor!r} no es un número de ms; se usa {UMBRAL_MS}")
+        return UMBRAL_MS
+
+
+class VigilanteInterfaz:
+    """Detecta y registra los bloqueos del bucle de eventos de Qt."""
+
+    def __init__(self):
+        self.umbral_ms = UMBRAL_MS
+        self.ruta = None
+        self.informes = deque(maxlen=MAX_INFORMES)
+        # perf_counter() del último latido (None hasta que corre el bucle)
+        self._latido = None
+        self._id_interfaz = None
+        self._temporizador = None
+        self._hilo = None
+        self._parar = threading.Event()
+
+    @property
+    def activo(self):
+        return self._hilo is not None
+
+    def iniciar(self, app, umbral_ms=None, ruta=None):
+        """Empieza a vigilar el bucle de eventos de `app`.
+
+        Se llama desde el hilo de la interfaz, antes de `app.exec_()`; el
+        arranque no cuenta como bloqueo, la vigilancia empieza con el
+        primer latido. Devuelve False si está desactivado.
+        """
+        if self.activo:
+            return True
+        if umbral_ms is None:
+            umbral_ms = umbral_desde_entorno()
+        if umbral_ms <= 0:
+            return False
+        from PyQt5.QtCore import QTimer
+
+        self.umbral_ms = umbral_ms
+        self.ruta = ruta or os.path.join(directorio_logs(), NOMBRE_LOG)
+        self._id_interfaz = threading.get_ident()
+        self._latido = None
+        self._temporizador = QTimer(app)
+        self._temporizador.setInterval(PERIODO_MS)
+        self._temporizador.timeout.connect(self._latir)
+        self._temporizador.start()
+        self._parar.clear()
+        self._hilo = threading.Thread(target=self._vigilar, name="vigilante-interfaz", daemon=True)
+        self._hilo.start()
+        app.aboutToQuit.connect(self.detener)
+        return True
+
+    def detener(self):
+        if not self.activo:
+            return
+        self._parar.set()
+        self._temporizador.stop()
+        self._hilo.join(1.0)
+        self._hilo = None
+
+    def _latir(self):
+        self._latido = time.perf_counter()
+
+    def _pila_interfaz(self):
+        marco = sys._current_frames().get(self._id_interfaz)
+        if marco is None:
+            return ""
+        return "".join(traceback.format_stack(marco))
+
+    def _vigilar(self):
+        # Latido tras el que empezó el bloqueo en curso y la pila tomada al
+        # superar el umbral
+        latido_bloqueo = None
+        pila = ""
+        avisado = False
+        while not self._parar.wait(PERIODO_MS / 1000.0):
+            latido = self._latido
+            if latido is None:
+                continue
+            if latido_bloqueo is not None and latido != latido_bloqueo:
+                # El bucle ha vuelto a latir: el bloqueo ha terminado
+                duracion_ms = (latido - latido_bloqueo) * 1000.0 - PERIODO_MS
+                self._informar(duracion_ms, pila, terminado=True)
+                latido_bloqueo = None
+            retraso_ms = (time.perf_counter() - latido) * 1000.0 - PERIODO_MS
+            if retraso_ms < self.umbral_ms:
+                continue
+            if latido_bloqueo is None:
+                latido_bloqueo = latido
+                pila = self._pila_interfaz()
+                avisado = False
+            elif not avisado and retraso_ms >= BLOQUEO_LARGO_MS:
+                # Puede que no se recupere: dejar constancia ya, con la pila actual
+                self._informar(retraso_ms, self._pila_interfaz(), terminado=False)
+                avisado = True
+
+    def _informar(self, duracion_ms, pila, terminado):
+        instante = time.strftime("%Y-%m-%d %H:%M:%S")
+        if terminado:
+            cabecera = f"[vigilante] {instante} interfaz bloqueada {duracion_ms:.0f} ms (umbral {self.umbral_ms} ms)"
+            titulo = "Pila del hilo de la interfaz al superar el umbral:"
+        else:
+            cabecera = f"[vigilante] {instante} la interfaz sigue bloqueada tras {duracion_ms:.0f} ms"
+            titulo = "Pila actual del hilo de la interfaz:"
+        texto = f"{cabecera}\n{titulo}\n{pila or '  (no disponible)'}\n"
+        self.informes.append({"duracion_ms": round(duracion_ms, 1), "terminado": terminado, "pila": pila})
+        try:
+            os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+            with open(self.ruta, "a", encoding="utf-8") as f:
+                f.write(texto)
+        except OSError as e:
+            print(f"[vigilante] No se puede escribir {self.ruta}: {e}", file=sys.stderr)
+            print(texto, file=sys.stderr)
+            return
+        # Con lanzar.sh la salida de error ya va a este log; en una terminal
+        # basta con la cabecera
+        if sys.stderr is not None and sys.stderr.isatty():
+            print(f"{cabecera} (detalles en {self.ruta})", file=sys.stderr)
+
+
+# Vigilante global: main.py lo inicia antes de entrar en el bucle de eventos
+vigilante_interfaz = VigilanteInterfaz()
@@ -0,0 +1,343 @@
+"""Caché en disco de cartas ya renderizadas, direccionada por contenido.
+
+Cada archivo exportado se guarda en $XDG_CACHE_HOME/vtesproxi/render (por
+defecto ~/.cache/vtesproxi/render) con el nombre de un hash SHA-256 de:
+la descripción de la carta, los bytes de la ilustración, los archivos de
+recursos que usa (iconos), las fuentes, el código del renderizador y el
+tamaño/formato de salida. Si nada de eso cambia, la carta se copia desde
+la caché en lugar de volver a pintarla y codificarla.
+
+La caché se limita por tamaño total expulsando primero los archivos usados
+hace más tiempo (se toca su mtime en cada acierto). El total se lleva en
+memoria y el directorio sólo se recorre cuando lo supera, o cada
+ESCRITURAS_POR_RECUENTO escrituras para contar también lo que hayan
+guardado otros procesos (los trabajadores de un lote comparten la caché).
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtGui import QColor, QFont, QImage, QPixmap
+
+
+# Subir este número invalida todas las entradas existentes
+VERSION_CACHE = 1
+
+MAX_BYTES_POR_DEFECTO = 512 * 1024 * 1024
+ESCRITURAS_POR_RECUENTO = 256
+# Al expulsar se baja hasta esta fracción de max_bytes, para que las
+# siguientes escrituras no tengan que volver a recorrer el directorio
+FRACCION_TRAS_EXPULSAR = 0.9
+# Huellas de archivos e ilustraciones que se recuerdan en memoria
+MAX_HUELLAS = 256
+
+
+def get_resource_path(relative_path):
+    """Devuelve la ruta absoluta a un recurso, compatible con PyInstaller."""
+    if hasattr(sys, '_MEIPASS'):
+        # PyInstaller extrae los archivos a _MEIPASS
+        base_path = sys._MEIPASS
+    else:
+        base_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(base_path, relative_path)
+
+
+def directorio_cache_por_defecto():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "vtesproxi", "render")
+
+
+# Hashes ya calculados de archivos e ilustraciones (LRU de MAX_HUELLAS)
+_huellas = OrderedDict()
+_huellas_lock = threading.Lock()
+
+
+def _huella_memorizada(clave):
+    with _huellas_lock:
+        digest = _huellas.get(clave)
+        if digest is not None:
+            _huellas.move_to_end(clave)
+        return digest
+
+
+def _memorizar_huella(clave, digest):
+    with _huellas_lock:
+        _huellas[clave] = digest
+        _huellas.move_to_end(clave)
+        while len(_huellas) > MAX_HUELLAS:
+            _huellas.popitem(last=False)
+
+
+def huella_archivo(ruta):
+    """SHA-256 del contenido de un archivo (memoizado por tamaño y mtime)."""
+    try:
+        st = os.stat(ruta)
+    except OSError:
+        return None
+    clave = ("archivo", ruta, st.st_size, st.st_mtime_ns)
+    digest = _huella_memorizada(clave)
+    if digest is not None:
+        return digest
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    digest = h.hexdigest()
+    _memorizar_huella(clave, digest)
+    return digest
+
+
+def huella_arte(arte):
+    """SHA-256 de los píxeles de la ilustración (QImage o QPixmap).
+
+    Se memoiza por cacheKey, que Qt cambia cada vez que la imagen se modifica.
+    """
+    if arte is None or arte.isNull():
+        return None
+    clave = (type(arte).__name__, arte.cacheKey())
+    digest = _huella_memorizada(clave)
+    if digest is not None:
+        return digest
+    imagen = arte.toImage() if isinstance(arte, QPixmap) else arte
+    h = hashlib.sha256()
+    h.update(f"{imagen.width()}x{imagen.height()}:{imagen.format()}".encode())
+    h.update(imagen.constBits().asstring(imagen.sizeInBytes()))
+    digest = h.hexdigest()
+    _memorizar_huella(clave, digest)
+    return digest
+
+
+def _huella_directorio(ruta):
+    """Huella barata (nombre, tamaño, mtime) de todos los archivos de un directorio."""
+    h = hashlib.sha256()
+    for raiz, dirs, archivos in os.walk(ruta):
+        dirs.sort()
+        for nombre in sorted(archivos):
+            completo = os.path.join(raiz, nombre)
+            try:
+                st = os.stat(completo)
+            except OSError:
+                continue
+            h.update(f"{os.path.relpath(completo, ruta)}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+_huella_entorno = None
+
+
+def _calcular_huella_entorno():
+    h = hashlib.sha256()
+    if getattr(sys, "frozen", False) or hasattr(sys, "_MEIPASS"):
+        # Ejecutable de PyInstaller: no hay logicas/*.py en disco y las
+        # fuentes se extraen de nuevo en cada arranque; el propio
+        # ejecutable identifica la versión del código y de las fuentes.
+        st = os.stat(sys.executable)
+        h.update(f"ejecutable:{sys.executable}:{st.st_size}:{st.st_mtime_ns}".encode())
+        return h.hexdigest()
+    h.update(_huella_directorio(get_resource_path("fonts")).encode())
+    logicas_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    render_dir = os.path.join(logicas_dir, "render")
+    for nombre in sorted(os.listdir(render_dir)):
+        if nombre.endswith(".py"):
+            h.update((huella_archivo(os.path.join(render_dir, nombre)) or "").encode())
+    for relativa in (("recorte", "constantes.py"), ("exportador", "variantes.py")):
+        h.update((huella_archivo(os.path.join(logicas_dir, *relativa)) or "").encode())
+    return h.hexdigest()
+
+
+def huella_entorno():
+    """Huella de las fuentes y del código de renderizado (calculada una vez por proceso).
+
+    Incluye logicas/recorte/constantes.py, donde están los tamaños y la
+    proporción de la carta, y logicas/exportador/variantes.py, que reescala
+    las variantes derivadas. Devuelve None si no se puede calcular; en ese
+    caso no se usa la caché.
+    """
+    global _huella_entorno
+    if _huella_entorno is None:
+        try:
+            _huella_entorno = _calcular_huella_entorno()
+        except OSError as e:
+            print(f"[cache_render] Caché desactivada, no se pudo calcular la huella del entorno: {e}")
+            _huella_entorno = ""
+    return _huella_entorno or None
+
+
+def _valor_estable(nombre, valor, huella_arte_externa):
+    """Convierte un atributo de carta en algo serializable y estable para el hash."""
+    if isinstance(valor, QFont):
+        return ["QFont", valor.toString()]
+    if isinstance(valor, QColor):
+        return ["QColor", valor.name(QColor.HexArgb)]
+    if isinstance(valor, (QImage, QPixmap)):
+        return ["arte", huella_arte_externa or huella_arte(valor)]
+    if isinstance(valor, dict):
+        return {k: _valor_estable(k, v, huella_arte_externa) for k, v in sorted(valor.items())}
+    if isinstance(valor, (list, tuple)):
+        return [_valor_estable(nombre, v, huella_arte_externa) for v in valor]
+    if isinstance(valor, str) and nombre.endswith("_path"):
+        # Rutas a iconos: cuenta su contenido, no sólo la ruta
+        return ["archivo", valor, huella_archivo(valor)]
+    return valor
+
+
+class CacheRender:
+    """Caché de archivos renderizados en disco, limitada por bytes."""
+
+    def __init__(self, directorio=None, max_bytes=MAX_BYTES_POR_DEFECTO):
+        self.directorio = directorio or directorio_cache_por_defecto()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Bytes en disco (None hasta el primer recuento) y escrituras desde él
+        self._total = None
+        self._escrituras = 0
+
+    def clave(self, renderizador, ancho, alto, dpi, formato, huella_arte_externa=None, derivada_de=None):
+        """Hash de todo lo que influye en el archivo de salida.
+
+        `huella_arte_externa` permite usar el hash del archivo de la
+        ilustración (p. ej. en el renderizado por lotes) sin decodificarla.
+        `derivada_de` es el tamaño (ancho, alto) del render del que se
+        reescaló la imagen, si no se pintó directamente a su tamaño.
+        Devuelve None si la caché no se puede usar (ver `huella_entorno`).
+        """
+        entorno = huella_entorno()
+        if entorno is None:
+            return None
+        especificacion = renderizador.especificacion()
+        if huella_arte_externa is not None:
+            especificacion["pixmap"] = ["arte", huella_arte_externa]
+        datos = {
+            "version": VERSION_CACHE,
+            "entorno": entorno,
+            "carta": {k: _valor_estable(k, v, huella_arte_externa) for k, v in especificacion.items()},
+            "salida": [int(ancho), int(alto), dpi, str(formato).lower()],
+        }
+        if derivada_de is not None:
+            datos["derivada_de"] = [int(v) for v in derivada_de]
+        serializado = json.dumps(datos, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(serializado.encode("utf-8")).hexdigest()
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave[:2], clave)
+
+    def copiar_a(self, clave, destino):
+        """Copia la entrada a `destino`. Devuelve False si no está en caché."""
+        ruta = self._ruta(clave)
+        try:
+            shutil.copyfile(ruta, destino)
+            # Marcar como usada recientemente para la expulsión LRU
+            os.utime(ruta, None)
+            return True
+        except OSError:
+            return False
+
+    def guardar_desde(self, clave, origen):
+        """Guarda en caché una copia del archivo `origen` ya escrito."""
+        ruta = self._ruta(clave)
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            # Escritura atómica: otro proceso nunca ve un archivo a medias
+            fd, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix=".tmp")
+            os.close(fd)
+            shutil.copyfile(origen, temporal)
+            nuevos = os.path.getsize(temporal)
+            try:
+                # Otro proceso pudo guardar ya la misma entrada
+                nuevos -= os.path.getsize(ruta)
+            except OSError:
+                pass
+            os.replace(temporal, ruta)
+        except OSError:
+            return False
+        self._sumar(nuevos)
+        return True
+
+    def _sumar(self, nuevos):
+        """Actualiza el total y expulsa si pasa de max_bytes (o toca recontar)."""
+        with self._lock:
+            self._escrituras += 1
+            if self._total is not None and self._escrituras < ESCRITURAS_POR_RECUENTO:
+                self._total += nuevos
+                if self._total <= self.max_bytes:
+                    return
+        self.expulsar()
+
+    def tamano_total(self):
+        return sum(st.st_size for _ruta, st in self._entradas())
+
+    def _entradas(self):
+        if not os.path.isdir(self.directorio):
+            return []
+        entradas = []
+        for raiz, _dirs, archivos in os.walk(self.directorio):
+            for nombre in archivos:
+                ruta = os.path.join(raiz, nombre)
+                try:
+                    entradas.append((ruta, os.stat(ruta)))
+                except OSError:
+                    continue
+        return entradas
+
+    def expulsar(self):
+        """Si se pasa de max_bytes, borra las entradas menos usadas hasta
+        quedar en FRACCION_TRAS_EXPULSAR de max_bytes."""
+        with self._lock:
+            entradas = self._entradas()
+            total = sum(st.st_size for _ruta, st in entradas)
+            if total > self.max_bytes:
+                objetivo = self.max_bytes * FRACCION_TRAS_EXPULSAR
+                entradas.sort(key=lambda e: e[1].st_mtime)
+                for ruta, st in entradas:
+                    if total <= objetivo:
+                        break
+                    try:
+                        os.remove(ruta)
+                        total -= st.st_size
+                    except OSError:
+                        continue
+            self._total = total
+            self._escrituras = 0
+
+    def vaciar(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+        with self._lock:
+            self._total = 0
+            self._escrituras = 0
+
+
+# Instancia global compartida por la exportación de la GUI y por lotes
+cache_render_global = CacheRender()
+
+
+def formato_para(filename):
+    """Formato de imagen según la extensión del archivo ("PNG" o "JPEG")."""
+    ext = os.path.splitext(filename)[1].lower()
+    return "JPEG" if ext in (".jpg", ".jpeg") else "PNG"
+
+
+def exportar_carta(renderizador, filename, width, height, dpi, usar_cache=True, huella_arte_externa=None, cargar_arte=None):
+    """Escribe la carta en `filename`, copiándola de la caché si ya existe.
+
+    `cargar_arte()` se llama antes de renderizar si la ilustración aún no se
+    ha cargado (renderizado por lotes). Devuelve (ok, desde_cache).
+    """
+    fmt = formato_para(filename)
+    clave = None
+    if usar_cache:
+        clave = cache_render_global.clave(renderizador, width, height, dpi, fmt, huella_arte_externa)
+        if clave is not None and cache_render_global.copiar_a(clave, filename):
+            return True, True
+
+    if cargar_arte is not None:
+        cargar_arte()
+    image = renderizador.renderizar(width, height, dpi)
+    ok = image.save(filename, fmt)
+    if ok and clave is not None:
+        cache_render_global.guardar_desde(clave, filename)
+    return ok, False
@@ -0,0 +1,413 @@
+"""Renderizado de mazos completos sin interfaz (`main.py render`).
+
+Lee un archivo de mazo (JSON) con la descripción de cada carta y una
+carpeta con las ilustraciones, y renderiza todas las cartas a PNG/JPEG con
+`RenderizadorCarta`, repartiendo el trabajo entre varios procesos. Cada
+proceso arranca su propia QGuiApplication con la plataforma "offscreen",
+por lo que funciona en servidores sin pantalla.
+
+Formato del mazo:
+
+    {
+        "cartas": [
+            {"tipo": "cripta", "nombre": "Catalina Vega", "clan": "Brujah",
+             "senda": "Ninguno", "disciplinas": ["Potence Superior", "Auspex"],
+             "capacidad": 7, "grupo": 4, "habilidad": "Independent. ...",
+             "ilustrador": "Juan R.", "arte": "Catalina_Vega.png"},
+            {"tipo": "libreria", "nombre": "Dreams of the Sphinx",
+             "tipos": ["Action", "Reaction"], "clan": "Toreador",
+             "coste": {"tipo": "blood", "valor": "2"},
+             "disciplinas": ["Auspex"], "habilidad": "...", "arte": "dreams.jpg"}
+        ]
+    }
+
+También se acepta directamente la lista de cartas, o una sola carta (que
+también se puede abrir en la interfaz con `main.py carta.json`). Si una
+carta no indica "arte", se busca en la carpeta de arte un archivo con su
+nombre.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from logicas.exportador.variantes import VARIANTES
+
+
+# Tamaños de salida disponibles: nombre -> (ancho, alto, dpi, sufijo)
+# Los sufijos coinciden con los de la exportación desde la interfaz.
+TAMANOS = VARIANTES
+
+EXTENSIONES_ARTE = (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif")
+
+# Estado de cada proceso de trabajo (QGuiApplication y config)
+_app = None
+_configs = {}
+
+
+def _inicializar_trabajador():
+    """Arranca Qt sin pantalla en el proceso actual (una vez por proceso)."""
+    global _app
+    if _app is not None:
+        return
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtGui import QGuiApplication
+    _app = QGuiApplication.instance() or QGuiApplication([sys.argv[0]])
+    # Las mismas fuentes que la aplicación (incluidas las variantes negrita)
+    from logicas.render.fuentes import registro_fuentes_global
+    registro_fuentes_global.registrar_todas()
+
+
+def cargar_mazo(ruta):
+    """Devuelve la lista de cartas (dicts) del archivo de mazo."""
+    with open(ruta, "r", encoding="utf-8") as f:
+        datos = json.load(f)
+    if isinstance(datos, dict) and "cartas" not in datos and "nombre" in datos:
+        # Una carta suelta
+        datos = [datos]
+    cartas = datos.get("cartas", []) if isinstance(datos, dict) else datos
+    if not isinstance(cartas, list):
+        raise ValueError("El mazo debe ser una lista de cartas o un objeto con la clave 'cartas'")
+    return cartas
+
+
+def nombre_archivo_seguro(nombre, por_defecto="carta"):
+    """Nombre de archivo a partir del nombre de la carta (mismo criterio que la GUI)."""
+    safe_name = "".join(c for c in (nombre or "") if c.isalnum() or c in (" ", "-", "_")).strip()
+    if not safe_name:
+        safe_name = por_defecto
+    return safe_name.replace(" ", "_")
+
+
+def buscar_arte(carta, carpeta_arte):
+    arte = carta.get("arte")
+    if arte:
+        ruta = arte if os.path.isabs(arte) else os.path.join(carpeta_arte, arte)
+        return ruta if os.path.isfile(ruta) else None
+    # Sin "arte" explícito: probar con el nombre de la carta
+    stems = {carta.get("nombre", ""), nombre_archivo_seguro(carta.get("nombre"))}
+    for stem in stems:
+        if not stem:
+            continue
+        for ext in EXTENSIONES_ARTE:
+            ruta = os.path.join(carpeta_arte, stem + ext)
+            if os.path.isfile(ruta):
+                return ruta
+    return None
+
+
+def _config(tipo):
+    """Configuración de la pestaña correspondiente (cacheada por proceso)."""
+    if tipo not in _configs:
+        from configuracion import cargar_config
+        if tipo == "cripta":
+            from ventana.cripta_widget import CONFIG_POR_DEFECTO
+        else:
+            from ventana.libreria_widget import CONFIG_POR_DEFECTO
+        _configs[tipo] = cargar_config(CONFIG_POR_DEFECTO)
+    return _configs[tipo]
+
+
+def _fuente(archivo, tamano):
+    """QFont de un archivo de fuente de la configuración (registrado una vez)."""
+    from logicas.render.fuentes import registro_fuentes_global
+    return registro_fuentes_global.fuente(archivo, tamano)
+
+
+def _aplicar_textos(r, carta, config):
+    """Título, texto de habilidades e ilustrador comunes a cripta y librería."""
+    from PyQt5.QtGui import QFont
+
+    nombre_config = config["nombre_carta"]
+    r.title = carta.get("nombre", "")
+    r.title_font = _fuente(nombre_config["fuente"], nombre_config["tamano"])
+    r.title_color = nombre_config["color"]
+    r.title_alignment = nombre_config.get("alineacion", "centro")
+
+    texto_hab_config = config.get("texto_habilidad", {})
+    hab_size = texto_hab_config.get("tamano", 12)
+    hab_color = texto_hab_config.get("color", "#ffffff")
+    try:
+        hab_opacidad_pct = int(texto_hab_config.get("opacidad_fondo", 50))
+    except Exception:
+        hab_opacidad_pct = 50
+    hab_opacidad_pct = max(0, min(100, hab_opacidad_pct))
+    r.ability_text = carta.get("habilidad", "") or ""
+    r.ability_font = _fuente(texto_hab_config.get("fuente", "fonts/Gill Sans.otf"), hab_size)
+    r.ability_color = hab_color
+    r.ability_bg_opacity = int(hab_opacidad_pct * 2.55)
+
+    # Fuente fija para el ilustrador, como en las pestañas
+    r.illustrator_text = carta.get("ilustrador", "") or ""
+    r.illustrator_font = QFont("Arial", 8)
+    r.illustrator_color = hab_color
+    return hab_size, hab_color
+
+
+def cargar_ilustracion(r, ruta_arte):
+    """Decodifica la ilustración y la asigna al renderizador."""
+    from PyQt5.QtGui import QImage
+    arte = QImage(ruta_arte)
+    if not arte.isNull():
+        r.pixmap = arte
+
+
+def construir_renderizador(carta, carpeta_arte, cargar_arte=True):
+    """Crea un RenderizadorCarta configurado igual que la pestaña de su tipo.
+
+    Con cargar_arte=False la ilustración no se decodifica (sólo se devuelve
+    su ruta), para poder consultar la caché de renderizado antes.
+    """
+    from PyQt5.QtGui import QFont
+    from logicas.render.renderizador import RenderizadorCarta, obtener_archivo_disciplina_texto
+    from ventana.cripta_widget import obtener_archivo_clan, obtener_archivo_senda, obtener_archivo_coste_cripta
+
+    tipo = str(carta.get("tipo", "cripta")).lower()
+    if tipo not in ("cripta", "libreria"):
+        raise ValueError(f"Tipo de carta desconocido: {tipo}")
+    config = _config(tipo)
+    r = RenderizadorCarta()
+
+    ruta_arte = buscar_arte(carta, carpeta_arte)
+    if ruta_arte and cargar_arte:
+        cargar_ilustracion(r, ruta_arte)
+
+    hab_size, hab_color = _aplicar_textos(r, carta, config)
+
+    simbolo_senda_config = config.get("simbolo_senda", {})
+    r.senda_size = simbolo_senda_config.get("tamano", 24)
+    r.senda_alignment = simbolo_senda_config.get("alineacion", "izquierda")
+    r.discipline_size = config.get("simbolo_disciplina", {}).get("tamano", 24)
+    r.discipline_draw_border = True
+
+    if tipo == "cripta":
+        simbolo_config = config.get("simbolo_clan", {})
+        r.clan_size = simbolo_config.get("tamano", 40)
+        r.clan_alignment = simbolo_config.get("alineacion", "izquierda")
+        r.clan = carta.get("clan")
+        r.clan_svg_path = obtener_archivo_clan(r.clan)
+        senda = carta.get("senda")
+        if senda and senda != "Ninguno":
+            r.senda = senda
+            r.senda_svg_path = obtener_archivo_senda(senda)
+
+        r.discipline_anchor_mode = "inferior"
+        r.disciplines = [
+            {"nombre": nombre, "svg_path": ruta}
+            for nombre, ruta in ((n, obtener_archivo_disciplina_texto(n)) for n in carta.get("disciplinas", []))
+            if ruta
+        ]
+
+        r.cost_size = config.get("simbolo_coste", {}).get("tamano", 40)
+        capacidad = carta.get("capacidad")
+        cost_path = obtener_archivo_coste_cripta(capacidad) if capacidad is not None else None
+        if cost_path:
+            r.cost_type = "capacity"
+            r.cost_svg_path = cost_path
+            r.cost_value = str(capacidad)
+            r.cost_alignment = "derecha"
+
+        grupo = carta.get("grupo")
+        if grupo is not None and str(grupo).strip() and str(grupo).strip().lower() != "ninguno":
+            r.crypt_group = str(grupo).strip()
+        group_font = QFont(r.ability_font)
+        group_font.setPointSize(max(6, hab_size - 2))
+        r.crypt_group_font = group_font
+        r.crypt_group_color = hab_color
+        r.ability_layout_mode = "cripta"
+    else:
+        from ventana.libreria_widget import (
+            obtener_archivo_tipo_libreria,
+            obtener_archivo_disciplina,
+            obtener_archivo_coste_libreria,
+            obtener_archivo_clan as obtener_archivo_clan_libreria,
+        )
+        r.clan2_stack = True
+        r.clan_draw_border = True
+        simbolo_config = config.get("simbolo_libreria", {})
+        r.clan_size = simbolo_config.get("tamano", 40)
+        r.clan_alignment = simbolo_config.get("alineacion", "izquierda")
+        tipos = [t for t in carta.get("tipos", []) if t and t != "Ninguno"]
+        if tipos:
+            r.clan = tipos[0]
+            r.clan_svg_path = obtener_archivo_tipo_libreria(tipos[0])
+        if len(tipos) > 1:
+            r.clan2 = tipos[1]
+            r.clan2_svg_path = obtener_archivo_tipo_libreria(tipos[1])
+
+        # En librería el clan ocupa el lugar de la senda (son excluyentes)
+        clan = carta.get("clan")
+        senda = carta.get("senda")
+        if clan and clan != "Ninguno":
+            r.senda = clan
+            r.senda_svg_path = obtener_archivo_clan_libreria(clan)
+        elif senda and senda != "Ninguno":
+            r.senda = senda
+            r.senda_svg_path = obtener_archivo_senda(senda)
+
+        r.disciplines = [
+            {"nombre": nombre, "svg_path": ruta}
+            for nombre, ruta in ((n, obtener_archivo_disciplina(n)) for n in carta.get("disciplinas", []))
+            if ruta
+        ]
+
+        r.cost_size = config.get("simbolo_coste", {}).get("tamano", 80)
+        coste = carta.get("coste") or {}
+        cost_path = obtener_archivo_coste_libreria(coste.get("tipo"), coste.get("valor"))
+        if cost_path:
+            r.cost_type = str(coste["tipo"]).lower()
+            r.cost_svg_path = cost_path
+            r.cost_value = str(coste.get("valor"))
+    return r, ruta_arte
+
+
+def renderizar_carta(tarea):
+    """Renderiza una carta a todos los tamaños pedidos (se ejecuta en un trabajador).
+
+    Devuelve un dict con el nombre, los archivos escritos, el tiempo en
+    segundos y, si algo falla, el mensaje de error.
+    """
+    _inicializar_trabajador()
+    from logicas.exportador.cache_render import huella_archivo
+    from logicas.exportador.variantes import exportar_variantes
+
+    inicio = time.perf_counter()
+    carta = tarea["carta"]
+    resultado = {"indice": tarea["indice"], "nombre": carta.get("nombre", ""), "archivos": [], "desde_cache": 0, "aviso": None, "error": None}
+    try:
+        r, ruta_arte = construir_renderizador(carta, tarea["carpeta_arte"], cargar_arte=False)
+        if not ruta_arte:
+            resultado["aviso"] = "sin ilustración"
+        # La clave de caché usa el hash del archivo de la ilustración, así
+        # que sólo se decodifica si hay que pintar la carta.
+        huella = huella_archivo(ruta_arte) if ruta_arte else None
+
+        def _cargar_arte():
+            if ruta_arte and r.pixmap is None:
+                cargar_ilustracion(r, ruta_arte)
+
+        # Una sola pasada: se pinta al mayor tamaño y el resto se deriva
+        ruta_base = os.path.join(tarea["salida"], f"{tarea['base']}.{tarea['formato']}")
+        variantes = exportar_variantes(
+            r,
+            ruta_base,
+            tarea["tamanos"],
+            usar_cache=tarea["usar_cache"],
+            huella_arte_externa=huella,
+            cargar_arte=_cargar_arte,
+        )
+        for _variante, destino, ok, desde_cache in variantes:
+            if not ok:
+                raise IOError(f"No se pudo guardar {destino}")
+            resultado["archivos"].append(destino)
+            resultado["desde_cache"] += int(desde_cache)
+    except Exception as e:
+        resultado["error"] = str(e)
+    resultado["segundos"] = time.perf_counter() - inicio
+    return resultado
+
+
+def preparar_tareas(cartas, carpeta_arte, salida, tamanos, formato, usar_cache=True):
+    """Una tarea por carta, con nombres de archivo únicos dentro de la salida."""
+    tareas = []
+    usados = {}
+    for indice, carta in enumerate(cartas):
+        por_defecto = "carta_cripta" if str(carta.get("tipo", "cripta")).lower() == "cripta" else "carta_libreria"
+        base = nombre_archivo_seguro(carta.get("nombre"), por_defecto)
+        usados[base] = usados.get(base, 0) + 1
+        if usados[base] > 1:
+            base = f"{base}_{usados[base]}"
+        tareas.append({
+            "indice": indice,
+            "carta": carta,
+            "carpeta_arte": carpeta_arte,
+            "salida": salida,
+            "base": base,
+            "tamanos": list(tamanos),
+            "formato": formato,
+            "usar_cache": usar_cache,
+        })
+    return tareas
+
+
+def renderizar_mazo(cartas, carpeta_arte, salida, tamanos=("300dpi",), formato="png", procesos=None, progreso=None, usar_cache=True):
+    """Renderiza todas las cartas y devuelve (resultados, segundos_totales).
+
+    Con procesos=1 se renderiza en el proceso actual; en otro caso se usa un
+    pool de procesos (arranque "spawn", seguro con Qt y con PyInstaller).
+    `progreso(resultado)` se llama cada vez que termina una carta.
+    """
+    os.makedirs(salida, exist_ok=True)
+    tareas = preparar_tareas(cartas, carpeta_arte, salida, tamanos, formato, usar_cache)
+    procesos = procesos or os.cpu_count() or 1
+    procesos = max(1, min(procesos, len(tareas) or 1))
+
+    inicio = time.perf_counter()
+    resultados = []
+    if procesos == 1:
+        for tarea in tareas:
+            resultado = renderizar_carta(tarea)
+            resultados.append(resultado)
+            if progreso:
+                progreso(resultado)
+    else:
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto, initializer=_inicializar_trabajador) as pool:
+            futuros = [pool.submit(renderizar_carta, tarea) for tarea in tareas]
+            for futuro in as_completed(futuros):
+                resultado = futuro.result()
+                resultados.append(resultado)
+                if progreso:
+                    progreso(resultado)
+    total = time.perf_counter() - inicio
+    resultados.sort(key=lambda res: res["indice"])
+    return resultados, total
+
+
+def main_render(argv=None):
+    """Punto de entrada del subcomando `main.py render`."""
+    parser = argparse.ArgumentParser(
+        prog="main.py render",
+        description="Renderiza todas las cartas de un mazo a PNG/JPEG sin abrir la interfaz.",
+    )
+    parser.add_argument("mazo", help="Archivo JSON con las cartas del mazo")
+    parser.add_argument("--arte", help="Carpeta con las ilustraciones (por defecto, la del mazo)")
+    parser.add_argument("--salida", default="render", help="Carpeta de salida (por defecto ./render)")
+    parser.add_argument(
+        "--tamano",
+        dest="tamanos",
+        action="append",
+        choices=sorted(TAMANOS),
+        help="Tamaño de salida; se puede repetir (por defecto 300dpi)",
+    )
+    parser.add_argument("--formato", choices=("png", "jpg"), default="png", help="Formato de imagen")
+    parser.add_argument("--procesos", type=int, default=None, help="Número de procesos (por defecto, uno por CPU)")
+    parser.add_argument("--no-cache", dest="usar_cache", action="store_false", help="Renderizar todas las cartas sin usar la caché en disco")
+    args = parser.parse_args(argv)
+
+    try:
+        cartas = cargar_mazo(args.mazo)
+    except (OSError, ValueError) as e:
+        print(f"Error al leer el mazo: {e}", file=sys.stderr)
+        return 2
+    carpeta_arte = args.arte or os.path.dirname(os.path.abspath(args.mazo))
+    tamanos = args.tamanos or ["300dpi"]
+
+    def _informar(res):
+        estado = "ERROR " + res["error"] if res["error"] else ", ".join(os.path.basename(a) for a in res["archivos"])
+        if res["desde_cache"]:
+            estado += " (caché)"
+        if res["aviso"]:
+            estado += f" ({res['aviso']})"
+        print(f"[{res['segundos'] * 1000:8.1f} ms] {res['nombre'] or '(sin nombre)'}: {estado}", flush=True)
+
+    resultados, total = renderizar_mazo(
+        cartas, carpeta_arte, args.salida, tamanos, args.formato, args.procesos, _informar, args.usar_cache
+    )
+    correctas = sum(1 for res in resultados if not res["error"])
+    por_segundo = correctas / total if total > 0 else 0.0
+    print(f"{correctas}/{len(resultados)} cartas en {total:.2f} s ({por_segundo:.1f} cartas/s)")
+    return 0 if correctas == len(resultados) else 1
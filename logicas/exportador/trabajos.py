@@ -0,0 +1,131 @@
+"""Exportación de cartas en segundo plano.
+
+Guardar una carta (pintar a 300 DPI y codificar varios PNG) bloqueaba la
+interfaz. Aquí cada exportación es un `TrabajoExportacion` (QRunnable) que
+pinta sobre una copia de la carta en un QThreadPool, de modo que se puede
+seguir editando la siguiente carta mientras se escribe la anterior.
+
+El avance, el final, los errores y las cancelaciones se notifican con
+señales, que Qt entrega en el hilo de la interfaz.
+"""
+import os
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from logicas.exportador.variantes import ExportacionCancelada, exportar_variantes
+
+
+# Exportaciones simultáneas (cada una ya codifica sus variantes en paralelo)
+HILOS_POR_DEFECTO = 2
+
+
+class SenalesExportacion(QObject):
+    # QRunnable no es un QObject, así que sus señales viven aquí
+    progreso = pyqtSignal(int, int)  # variantes escritas, total
+    terminado = pyqtSignal(list)  # [(variante, ruta, ok, desde_cache)]
+    error = pyqtSignal(str)
+    cancelado = pyqtSignal()
+
+
+class TrabajoExportacion(QRunnable):
+    """Escribe las variantes de una carta desde un hilo del pool."""
+
+    def __init__(self, renderizador, ruta_base, variantes, usar_cache=True):
+        super().__init__()
+        # El pool no debe borrar el objeto: Python mantiene la referencia
+        self.setAutoDelete(False)
+        # Copia propia: la carta original puede cambiar mientras tanto
+        self.renderizador = renderizador.copia()
+        self.ruta_base = ruta_base
+        self.variantes = list(variantes)
+        self.usar_cache = usar_cache
+        self.senales = SenalesExportacion()
+        self._cancelado = threading.Event()
+
+    def cancelar(self):
+        """Pide que no se escriban las variantes pendientes."""
+        self._cancelado.set()
+
+    def esta_cancelado(self):
+        return self._cancelado.is_set()
+
+    def run(self):
+        try:
+            resultados = exportar_variantes(
+                self.renderizador,
+                self.ruta_base,
+                self.variantes,
+                usar_cache=self.usar_cache,
+                progreso=self.senales.progreso.emit,
+                cancelado=self._cancelado.is_set,
+            )
+        except ExportacionCancelada:
+            self.senales.cancelado.emit()
+            return
+        except Exception as e:
+            self.senales.error.emit(str(e))
+            return
+        fallidos = [ruta for _variante, ruta, ok, _desde_cache in resultados if not ok]
+        if fallidos:
+            self.senales.error.emit("No se pudo guardar " + ", ".join(os.path.basename(r) for r in fallidos))
+            return
+        self.senales.terminado.emit(resultados)
+
+
+class GestorExportaciones(QObject):
+    """Pool de exportaciones de la aplicación y los trabajos en curso."""
+
+    # Mensaje para la barra de estado
+    estado = pyqtSignal(str)
+    # Número de exportaciones pendientes o en curso
+    activas_cambiadas = pyqtSignal(int)
+
+    def __init__(self, hilos=HILOS_POR_DEFECTO, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(hilos)
+        self._trabajos = set()
+
+    def exportar(self, renderizador, ruta_base, variantes, usar_cache=True):
+        """Encola la exportación de la carta y devuelve su TrabajoExportacion."""
+        trabajo = TrabajoExportacion(renderizador, ruta_base, variantes, usar_cache)
+        nombre = os.path.basename(ruta_base)
+        trabajo.senales.progreso.connect(
+            lambda hechas, total: self.estado.emit(f"Guardando {nombre} ({hechas}/{total})...")
+        )
+        trabajo.senales.terminado.connect(lambda resultados: self._terminar(trabajo, f"Guardado {nombre} ({len(resultados)} archivos)"))
+        trabajo.senales.error.connect(lambda mensaje: self._terminar(trabajo, f"Error al guardar {nombre}: {mensaje}"))
+        trabajo.senales.cancelado.connect(lambda: self._terminar(trabajo, f"Exportación de {nombre} cancelada"))
+        self._trabajos.add(trabajo)
+        self.activas_cambiadas.emit(len(self._trabajos))
+        self.estado.emit(f"Guardando {nombre}...")
+        self.pool.start(trabajo)
+        return trabajo
+
+    def _terminar(self, trabajo, mensaje):
+        self._trabajos.discard(trabajo)
+        self.estado.emit(mensaje)
+        self.activas_cambiadas.emit(len(self._trabajos))
+
+    def activas(self):
+        return len(self._trabajos)
+
+    def cancelar_todo(self):
+        for trabajo in list(self._trabajos):
+            trabajo.cancelar()
+
+    def esperar(self, msecs=-1):
+        """Bloquea hasta que terminen todas las exportaciones (p. ej. al cerrar)."""
+        return self.pool.waitForDone(msecs)
+
+
+_gestor_global = None
+
+
+def gestor_exportaciones():
+    """Gestor compartido por las pestañas (se crea al usarlo por primera vez)."""
+    global _gestor_global
+    if _gestor_global is None:
+        _gestor_global = GestorExportaciones()
+    return _gestor_global
@@ -0,0 +1,162 @@
+"""Exportación de una carta a varios tamaños en una sola pasada.
+
+La carta se pinta una única vez, al mayor de los tamaños pedidos, y el
+resto de variantes (online, miniatura...) se obtienen reescalando esa
+imagen. La codificación de cada archivo (lo más lento de exportar) se
+reparte entre hilos: QImage.save libera el GIL, así que los codificadores
+PNG/JPEG trabajan en paralelo.
+
+Los archivos se nombran a partir de una única ruta base, añadiendo el
+sufijo de cada variante antes de la extensión: carta.png, carta_online.png,
+carta_mini.png, carta_600dpi.png.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import Qt
+
+from logicas.exportador.cache_render import cache_render_global, formato_para
+from logicas.recorte.constantes import (
+    VTES_CARD_WIDTH_300DPI,
+    VTES_CARD_HEIGHT_300DPI,
+    VTES_CARD_WIDTH_ONLINE,
+    VTES_CARD_HEIGHT_ONLINE,
+)
+
+
+# Variantes disponibles: nombre -> (ancho, alto, dpi, sufijo)
+VARIANTES = {
+    "600dpi": (VTES_CARD_WIDTH_300DPI * 2, VTES_CARD_HEIGHT_300DPI * 2, 600, "_600dpi"),
+    "300dpi": (VTES_CARD_WIDTH_300DPI, VTES_CARD_HEIGHT_300DPI, 300, ""),
+    "online": (VTES_CARD_WIDTH_ONLINE, VTES_CARD_HEIGHT_ONLINE, 300, "_online"),
+    "miniatura": (VTES_CARD_WIDTH_ONLINE // 2, VTES_CARD_HEIGHT_ONLINE // 2, 300, "_mini"),
+}
+
+class ExportacionCancelada(Exception):
+    """La exportación se canceló antes de escribir todas las variantes."""
+
+
+# Lo que hacían los antiguos botones "Guardar" y "Guardar para Online"
+VARIANTES_POR_DEFECTO = ("300dpi", "online")
+
+
+def variantes_configuradas(config):
+    """Variantes elegidas en la configuración ("exportacion" -> "variantes")."""
+    elegidas = config.get("exportacion", {}).get("variantes", VARIANTES_POR_DEFECTO)
+    variantes = [v for v in VARIANTES if v in elegidas]
+    return variantes or list(VARIANTES_POR_DEFECTO)
+
+
+def dpi_maximo_arte(config):
+    """Resolución (DPI) a la que se guarda la ilustración recortada.
+
+    Por defecto la de la variante de mayor resolución: más detalle no se
+    llegaría a usar en ninguna exportación.
+    """
+    por_defecto = max(dpi for _ancho, _alto, dpi, _sufijo in VARIANTES.values())
+    try:
+        return max(1, int(config.get("exportacion", {}).get("dpi_maximo_arte", por_defecto)))
+    except (TypeError, ValueError):
+        return por_defecto
+
+
+def tamano_maximo_arte(config):
+    """(ancho, alto) máximos en píxeles de la ilustración guardada en la carta."""
+    dpi = dpi_maximo_arte(config)
+    return (
+        int(round(VTES_CARD_WIDTH_300DPI * dpi / 300)),
+        int(round(VTES_CARD_HEIGHT_300DPI * dpi / 300)),
+    )
+
+
+def ruta_variante(ruta_base, variante):
+    """Ruta del archivo de una variante a partir de la ruta elegida por el usuario."""
+    raiz, ext = os.path.splitext(ruta_base)
+    return f"{raiz}{VARIANTES[variante][3]}{ext or '.png'}"
+
+
+def _escribir(imagen, ancho, alto, dpi, destino, cancelado=None):
+    """Reescala (si hace falta) y codifica una variante. Se ejecuta en un hilo."""
+    if cancelado is not None and cancelado():
+        return None
+    if imagen.width() != ancho or imagen.height() != alto:
+        imagen = imagen.scaled(ancho, alto, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        dpm = int(dpi / 0.0254)
+        imagen.setDotsPerMeterX(dpm)
+        imagen.setDotsPerMeterY(dpm)
+    return imagen.save(destino, formato_para(destino))
+
+
+def exportar_variantes(
+    renderizador,
+    ruta_base,
+    variantes=VARIANTES_POR_DEFECTO,
+    usar_cache=True,
+    huella_arte_externa=None,
+    cargar_arte=None,
+    progreso=None,
+    cancelado=None,
+):
+    """Escribe todas las variantes pedidas de la carta.
+
+    Devuelve una lista de (variante, ruta, ok, desde_cache) en el orden de
+    `variantes`. `huella_arte_externa` y `cargar_arte` funcionan como en
+    `exportar_carta`.
+
+    `progreso(hechas, total)` se llama cada vez que se escribe una variante.
+    Si `cancelado()` devuelve True antes de pintar o de codificar, las
+    variantes pendientes no se escriben y se lanza ExportacionCancelada
+    (las ya escritas se quedan en disco).
+    """
+    variantes = [v for v in variantes if v in VARIANTES]
+    if not variantes:
+        return []
+    # Todas las variantes se derivan del mayor tamaño pedido
+    mayor = max(variantes, key=lambda v: VARIANTES[v][0] * VARIANTES[v][1])
+    base_ancho, base_alto, base_dpi, _sufijo = VARIANTES[mayor]
+
+    resultados = {}
+    pendientes = []
+
+    def _avisar():
+        if progreso is not None:
+            progreso(len(resultados), len(variantes))
+
+    for variante in variantes:
+        ancho, alto, dpi, _sufijo = VARIANTES[variante]
+        destino = ruta_variante(ruta_base, variante)
+        clave = None
+        if usar_cache:
+            derivada_de = None if variante == mayor else (base_ancho, base_alto)
+            clave = cache_render_global.clave(
+                renderizador, ancho, alto, dpi, formato_para(destino), huella_arte_externa, derivada_de
+            )
+            if clave is not None and cache_render_global.copiar_a(clave, destino):
+                resultados[variante] = (variante, destino, True, True)
+                _avisar()
+                continue
+        pendientes.append((variante, ancho, alto, dpi, destino, clave))
+
+    if pendientes:
+        if cancelado is not None and cancelado():
+            raise ExportacionCancelada()
+        if cargar_arte is not None:
+            cargar_arte()
+        imagen = renderizador.renderizar(base_ancho, base_alto, base_dpi)
+        with ThreadPoolExecutor(max_workers=len(pendientes)) as pool:
+            futuros = [
+                (p, pool.submit(_escribir, imagen, p[1], p[2], p[3], p[4], cancelado))
+                for p in pendientes
+            ]
+            for (variante, _ancho, _alto, _dpi, destino, clave), futuro in futuros:
+                ok = futuro.result()
+                if ok is None:
+                    continue
+                if ok and clave is not None:
+                    cache_render_global.guardar_desde(clave, destino)
+                resultados[variante] = (variante, destino, ok, False)
+                _avisar()
+        if len(resultados) < len(variantes):
+            raise ExportacionCancelada()
+
+    return [resultados[v] for v in variantes]
@@ -0,0 +1,128 @@
+"""Una sola instancia de la aplicación por usuario.
+
+Cada doble clic en el lanzador arrancaba un proceso nuevo: Qt, las fuentes,
+los iconos y la ventana completa. La primera instancia escucha en un
+QLocalServer; las siguientes se conectan, le pasan sus argumentos (rutas de
+imágenes o de archivos de carta, ya absolutas) y terminan sin crear la
+QApplication. La ventana existente se trae al frente y abre lo recibido.
+
+Protocolo: una línea JSON `{"argumentos": [...]}`; el servidor responde
+`ok`. Si no hay respuesta (no hay instancia o está colgada) el proceso
+arranca de forma normal.
+
+`main.py --nueva-instancia` arranca siempre un proceso independiente (que no
+escucha), p. ej. para los benchmarks.
+"""
+import getpass
+import json
+import os
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtNetwork import QAbstractSocket, QLocalServer, QLocalSocket
+
+
+OPCION_NUEVA_INSTANCIA = "--nueva-instancia"
+ESPERA_CONEXION_MS = 200
+ESPERA_RESPUESTA_MS = 2000
+
+
+def nombre_servidor():
+    """Nombre del socket local, distinto para cada usuario."""
+    try:
+        usuario = getpass.getuser()
+    except (KeyError, OSError, ImportError):
+        usuario = str(os.getuid()) if hasattr(os, "getuid") else "usuario"
+    return f"vtesproxi-{usuario}"
+
+
+def preparar_argumentos(argumentos):
+    """Rutas absolutas de los argumentos (sin opciones), para otro proceso
+    con otro directorio de trabajo."""
+    return [os.path.abspath(a) for a in argumentos if a and not a.startswith("-")]
+
+
+def enviar_a_instancia(argumentos, nombre=None):
+    """Pasa los argumentos a la instancia en marcha.
+
+    Devuelve True si la instancia los ha recibido (y este proceso puede
+    terminar) y False si no hay ninguna que responda.
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(nombre or nombre_servidor())
+    if not socket.waitForConnected(ESPERA_CONEXION_MS):
+        return False
+    mensaje = json.dumps({"argumentos": preparar_argumentos(argumentos)}, ensure_ascii=False)
+    socket.write((mensaje + "\n").encode("utf-8"))
+    if not socket.waitForBytesWritten(ESPERA_RESPUESTA_MS):
+        return False
+    respuesta = b""
+    while b"\n" not in respuesta and socket.waitForReadyRead(ESPERA_RESPUESTA_MS):
+        respuesta += bytes(socket.readAll())
+    socket.disconnectFromServer()
+    return respuesta.strip() == b"ok"
+
+
+class ServidorInstancia(QObject):
+    """Recibe los argumentos de los lanzamientos posteriores."""
+
+    # Rutas absolutas recibidas (puede ser una lista vacía: sólo traer al frente)
+    peticion = pyqtSignal(list)
+
+    def __init__(self, nombre=None, parent=None):
+        super().__init__(parent)
+        self.nombre = nombre or nombre_servidor()
+        self._servidor = QLocalServer(self)
+        self._servidor.newConnection.connect(self._nueva_conexion)
+        self._buffers = {}
+
+    def escuchar(self):
+        """Empieza a escuchar; devuelve False si ya hay otra instancia."""
+        # Sólo el usuario actual puede conectarse: el nombre es predecible y
+        # cualquiera que conecte puede abrir archivos en la ventana
+        self._servidor.setSocketOptions(QLocalServer.UserAccessOption)
+        if self._servidor.listen(self.nombre):
+            return True
+        if self._servidor.serverError() != QAbstractSocket.AddressInUseError:
+            print(f"[instancia] No se puede escuchar en {self.nombre}: {self._servidor.errorString()}")
+            return False
+        # El socket existe: o hay otra instancia viva (arrancada a la vez
+        # que ésta) o es el resto de una que terminó de forma abrupta
+        socket = QLocalSocket()
+        socket.connectToServer(self.nombre)
+        if socket.waitForConnected(ESPERA_CONEXION_MS):
+            socket.disconnectFromServer()
+            return False
+        QLocalServer.removeServer(self.nombre)
+        return self._servidor.listen(self.nombre)
+
+    def cerrar(self):
+        self._servidor.close()
+
+    def _nueva_conexion(self):
+        while self._servidor.hasPendingConnections():
+            socket = self._servidor.nextPendingConnection()
+            self._buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self._leer(s))
+            socket.disconnected.connect(lambda s=socket: self._desconectado(s))
+
+    def _leer(self, socket):
+        datos = self._buffers.get(socket, b"") + bytes(socket.readAll())
+        if b"\n" not in datos:
+            self._buffers[socket] = datos
+            return
+        self._buffers[socket] = b""
+        linea = datos.split(b"\n", 1)[0]
+        try:
+            argumentos = json.loads(linea.decode("utf-8")).get("argumentos", [])
+        except (ValueError, AttributeError):
+            socket.write(b"error\n")
+            socket.disconnectFromServer()
+            return
+        socket.write(b"ok\n")
+        socket.flush()
+        socket.disconnectFromServer()
+        self.peticion.emit([str(a) for a in argumentos])
+
+    def _desconectado(self, socket):
+        self._buffers.pop(socket, None)
+        socket.deleteLater()
@@ -3,7 +3,7 @@ from PyQt5.QtCore import QRect, QPoint, QSize, pyqtSignal
 from PyQt5.QtGui import QPixmap
 
 # Importar la función de recorte modularizada y constantes
-from logicas.recorte.recorte import recortar_pixmap
+from logicas.recorte.recorte import recortar_pixmap, rectangulo_recorte, leer_region
 from logicas.recorte.constantes import VTES_CARD_ASPECT_RATIO
 
 class CropGraphicsView(QGraphicsView):
@@ -75,9 +75,14 @@ class CropGraphicsView(QGraphicsView):
 class ImageCropView(QWidget):
     cropConfirmed = pyqtSignal(QPixmap)
 
-    def __init__(self, pixmap, aspect_ratio=None, parent=None):
+    def __init__(self, pixmap, aspect_ratio=None, parent=None, ruta=None, tamano_original=None):
         super().__init__(parent)
+        # `pixmap` puede ser una vista previa reducida de la imagen de `ruta`
+        # (de tamaño `tamano_original`); al confirmar se decodifica sólo la
+        # región elegida a resolución completa.
         self.pixmap = pixmap
+        self.ruta = ruta
+        self.tamano_original = tamano_original
         self.view = CropGraphicsView(pixmap, aspect_ratio=aspect_ratio)
         self.btn_confirm = QPushButton('Confirmar recorte')
         self.btn_confirm.clicked.connect(self.confirm_crop)
@@ -96,13 +101,24 @@ class ImageCropView(QWidget):
             crop_bottom_right = self.view.mapToScene(crop_rect.bottomRight())
             # Usar el aspect ratio pasado como parámetro, o el estándar de VTES
             aspect_ratio = self.view.aspect_ratio if (hasattr(self.view, 'aspect_ratio') and self.view.aspect_ratio is not None) else VTES_CARD_ASPECT_RATIO
-            cropped = recortar_pixmap(
-                self.pixmap,
-                crop_rect,
-                pixmap_rect_scene,
-                crop_top_left,
-                crop_bottom_right,
-                aspect_ratio=None  # No forzar aspect ratio ni recorte extra
-            )
+            cropped = None
+            if self.ruta and self.tamano_original is not None and self.tamano_original.isValid():
+                region = rectangulo_recorte(
+                    self.tamano_original.width(),
+                    self.tamano_original.height(),
+                    pixmap_rect_scene,
+                    crop_top_left,
+                    crop_bottom_right,
+                )
+                cropped = leer_region(self.ruta, region)
+            if cropped is None or cropped.isNull():
+                cropped = recortar_pixmap(
+                    self.pixmap,
+                    crop_rect,
+                    pixmap_rect_scene,
+                    crop_top_left,
+                    crop_bottom_right,
+                    aspect_ratio=None  # No forzar aspect ratio ni recorte extra
+                )
             self.cropConfirmed.emit(cropped)
         self.view.clear_selection()
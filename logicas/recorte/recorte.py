@@ -1,34 +1,75 @@
-from PyQt5.QtGui import QPixmap
-from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QPixmap, QImageReader
+from PyQt5.QtCore import QRect, QRectF, QSize, Qt
 
-def recortar_pixmap(pixmap, crop_rect, pixmap_rect_scene, crop_top_left, crop_bottom_right, aspect_ratio=None):
+
+def leer_vista_previa(ruta, lado_maximo):
     """
-    Recorta un QPixmap según las coordenadas de recorte y el aspect ratio deseado.
-    Garantiza que el resultado final tenga exactamente las proporciones correctas de cartas VTES.
-    
-    - pixmap: QPixmap original
-    - crop_rect: QRect de selección en la vista
-    - pixmap_rect_scene: QRectF del pixmap en la escena
-    - crop_top_left, crop_bottom_right: QPointF en la escena
-    - aspect_ratio: float (opcional, si es None se mantiene la proporción del recorte)
+    Decodifica la imagen reducida para que su lado mayor no pase de `lado_maximo`.
+    Devuelve (QPixmap de vista previa, QSize de la imagen original).
+
+    Con QImageReader.setScaledSize los formatos que lo soportan (JPEG) se
+    decodifican directamente a tamaño reducido, sin cargar nunca los
+    millones de píxeles del escaneo original.
+    """
+    reader = QImageReader(ruta)
+    original = reader.size()
+    if original.isValid() and max(original.width(), original.height()) > lado_maximo:
+        reader.setScaledSize(original.scaled(lado_maximo, lado_maximo, Qt.KeepAspectRatio))
+    imagen = reader.read()
+    if imagen.isNull():
+        return QPixmap(), QSize()
+    if not original.isValid():
+        original = imagen.size()
+    return QPixmap.fromImage(imagen), original
+
+
+def leer_region(ruta, rect):
+    """
+    Decodifica a resolución completa sólo la región `rect` (QRect en píxeles de
+    la imagen original). Devuelve un QPixmap nulo si no se puede leer.
+    """
+    reader = QImageReader(ruta)
+    reader.setClipRect(rect)
+    imagen = reader.read()
+    if imagen.isNull():
+        return QPixmap()
+    return QPixmap.fromImage(imagen)
+
+
+def rectangulo_recorte(pixmap_width, pixmap_height, pixmap_rect_scene, crop_top_left, crop_bottom_right):
+    """
+    Convierte la selección (en coordenadas de la escena) a un QRect en píxeles
+    de una imagen de pixmap_width x pixmap_height.
     """
-    pixmap_width = pixmap.width()
-    pixmap_height = pixmap.height()
-    
     # Convertir coordenadas de la escena a coordenadas del pixmap original
     x1 = (crop_top_left.x() - pixmap_rect_scene.x()) / pixmap_rect_scene.width() * pixmap_width
     y1 = (crop_top_left.y() - pixmap_rect_scene.y()) / pixmap_rect_scene.height() * pixmap_height
     x2 = (crop_bottom_right.x() - pixmap_rect_scene.x()) / pixmap_rect_scene.width() * pixmap_width
     y2 = (crop_bottom_right.y() - pixmap_rect_scene.y()) / pixmap_rect_scene.height() * pixmap_height
-    
+
     # Calcular el rectángulo de recorte en coordenadas del pixmap
     x = int(max(0, min(x1, x2, pixmap_width-1)))
     y = int(max(0, min(y1, y2, pixmap_height-1)))
     w = int(max(1, min(abs(x2 - x1), pixmap_width - x)))
     h = int(max(1, min(abs(y2 - y1), pixmap_height - y)))
+    return QRect(x, y, w, h)
+
+
+def recortar_pixmap(pixmap, crop_rect, pixmap_rect_scene, crop_top_left, crop_bottom_right, aspect_ratio=None):
+    """
+    Recorta un QPixmap según las coordenadas de recorte y el aspect ratio deseado.
+    Garantiza que el resultado final tenga exactamente las proporciones correctas de cartas VTES.
     
+    - pixmap: QPixmap original
+    - crop_rect: QRect de selección en la vista
+    - pixmap_rect_scene: QRectF del pixmap en la escena
+    - crop_top_left, crop_bottom_right: QPointF en la escena
+    - aspect_ratio: float (opcional, si es None se mantiene la proporción del recorte)
+    """
     # Recortar la imagen
-    cropped = pixmap.copy(x, y, w, h)
+    cropped = pixmap.copy(
+        rectangulo_recorte(pixmap.width(), pixmap.height(), pixmap_rect_scene, crop_top_left, crop_bottom_right)
+    )
     
     # Aplicar el aspect ratio exacto si se especifica
     if aspect_ratio is not None:
@@ -51,3 +92,13 @@ def recortar_pixmap(pixmap, crop_rect, pixmap_rect_scene, crop_top_left, crop_bo
                     cropped = cropped.copy(0, offset, crop_w, new_h)
     
     return cropped
+
+
+def limitar_resolucion(pixmap, ancho_maximo, alto_maximo):
+    """
+    Reduce el pixmap (manteniendo la proporción) para que quepa en
+    ancho_maximo x alto_maximo. Si ya cabe se devuelve tal cual.
+    """
+    if pixmap.isNull() or (pixmap.width() <= ancho_maximo and pixmap.height() <= alto_maximo):
+        return pixmap
+    return pixmap.scaled(ancho_maximo, alto_maximo, Qt.KeepAspectRatio, Qt.SmoothTransformation)
@@ -0,0 +1,283 @@
+"""Caché global de iconos rasterizados para el pintado de cartas.
+
+Los símbolos de clan, senda, disciplinas y coste se dibujaban creando un
+QSvgRenderer nuevo (y re-rasterizando el SVG) en cada repintado. Aquí se
+guardan ya rasterizados como QImage ARGB, con el reborde/halo incluido,
+para que el preview y la exportación sólo tengan que copiarlos.
+
+La clave de cada entrada es (ruta, tamaño objetivo, estilo de reborde,
+escala de rasterizado, fase) y la caché se limita por bytes con política
+LRU. La escala de rasterizado es el devicePixelRatio redondeado hacia arriba
+a múltiplos de PASO_ESCALA: el preview pinta con un factor distinto para
+cada tamaño de ventana, y sin redondear cada redimensionado rasterizaba de
+nuevo todos los iconos. El icono se dibuja luego (suavizado) a su tamaño
+lógico.
+
+Cuando la escala coincide con la del destino el icono se copia píxel a
+píxel, y entonces se rasteriza con la parte fraccionaria de su posición en
+el dispositivo (la fase): los iconos de la columna izquierda caen en medios
+píxeles y, rasterizados en la rejilla entera y desplazados después, salían
+borrosos.
+"""
+import math
+import os
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QRectF, QPointF
+from PyQt5.QtGui import QImage, QPainter, QColor, QPen, QBrush, QPolygonF, QTransform
+from PyQt5.QtSvg import QSvgRenderer
+
+
+# Estilos de reborde disponibles (None = sin reborde)
+ESTILO_CONTORNO = "contorno"  # Contorno blanco redondeado (tipos/clan, disciplinas)
+ESTILO_ROMBO = "rombo"  # Contorno en rombo (disciplinas superiores)
+ESTILO_RELLENO = "relleno"  # Fondo blanco redondeado que sobresale (senda, coste)
+
+# 32 MB dan para varios cientos de iconos a resolución de exportación
+PRESUPUESTO_BYTES_POR_DEFECTO = 32 * 1024 * 1024
+# Granularidad de la escala de rasterizado: como mucho un 12,5 % de más
+# resolución por icono a cambio de no rasterizar en cada redimensionado
+PASO_ESCALA = 0.125
+
+
+def _es_svg(ruta):
+    return os.path.splitext(ruta)[1].lower() == ".svg"
+
+
+def _margen(estilo, grosor):
+    """Margen lógico para que el reborde (y su antialiasing) no quede
+    recortado por los bordes de la imagen."""
+    return (grosor + 1) if estilo else 0
+
+
+def _fase_dispositivo(painter, punto, dpr):
+    """Parte fraccionaria (x, y) de `punto` en píxeles del dispositivo.
+
+    None si el icono no se va a copiar píxel a píxel (giros, u otra escala
+    que la de rasterizado): entonces se dibuja suavizado y la fase no importa.
+    """
+    if escala_rasterizado(dpr) != dpr:
+        return None
+    transformacion = painter.deviceTransform()
+    if transformacion.type() > QTransform.TxScale:
+        return None
+    if abs(transformacion.m11() - dpr) > 1e-6 or abs(transformacion.m22() - dpr) > 1e-6:
+        return None
+    destino = transformacion.map(punto)
+    return (
+        round(destino.x() - math.floor(destino.x()), 4) % 1.0,
+        round(destino.y() - math.floor(destino.y()), 4) % 1.0,
+    )
+
+
+def escala_rasterizado(dpr):
+    """devicePixelRatio redondeado hacia arriba a múltiplos de PASO_ESCALA.
+
+    Hacia arriba para no ampliar nunca el icono al dibujarlo; el margen
+    absorbe el error de coma flotante de dpr * escala (1.0000001 -> 1.0).
+    """
+    pasos = math.ceil(dpr / PASO_ESCALA - 1e-6)
+    return max(1, pasos) * PASO_ESCALA
+
+
+class CacheIconos:
+    """Caché LRU de iconos pre-renderizados, segura entre hilos."""
+
+    def __init__(self, presupuesto_bytes=PRESUPUESTO_BYTES_POR_DEFECTO):
+        self.presupuesto_bytes = presupuesto_bytes
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        # Tamaño nativo por ruta (None si el archivo no es un icono válido)
+        self._tamanos_nativos = {}
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def tamano_nativo(self, ruta):
+        """Devuelve (ancho, alto) nativos del icono o None si no se puede cargar."""
+        if not ruta:
+            return None
+        with self._lock:
+            if ruta in self._tamanos_nativos:
+                return self._tamanos_nativos[ruta]
+
+        tamano = None
+        if _es_svg(ruta):
+            renderer = QSvgRenderer(ruta)
+            if renderer.isValid():
+                default_size = renderer.defaultSize()
+                tamano = (
+                    default_size.width() if default_size.width() > 0 else 1,
+                    default_size.height() if default_size.height() > 0 else 1,
+                )
+        else:
+            imagen = QImage(ruta)
+            if not imagen.isNull():
+                tamano = (
+                    imagen.width() if imagen.width() > 0 else 1,
+                    imagen.height() if imagen.height() > 0 else 1,
+                )
+
+        with self._lock:
+            self._tamanos_nativos[ruta] = tamano
+        return tamano
+
+    def obtener(self, ruta, ancho, alto, estilo=None, grosor=1, dpr=1.0, fase=None):
+        """Devuelve (QImage, margen) del icono rasterizado o None.
+
+        `ancho` y `alto` son el tamaño lógico del icono; la imagen incluye
+        un margen lógico alrededor para el reborde, de modo que debe
+        dibujarse en el rectángulo del icono expandido por `margen`.
+
+        Con `fase` (x, y) en píxeles el icono se rasteriza desplazado esa
+        fracción de píxel, a escala exacta `dpr` y sin estirarlo: la imagen
+        se copia píxel a píxel con su esquina en la posición entera.
+        """
+        if not ruta or ancho <= 0 or alto <= 0:
+            return None
+        dpr = escala_rasterizado(dpr)
+        clave = (ruta, round(ancho, 2), round(alto, 2), estilo, grosor, dpr, fase)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return entrada
+            self.fallos += 1
+
+        entrada = self._rasterizar(ruta, ancho, alto, estilo, grosor, dpr, fase)
+        if entrada is None:
+            return None
+
+        with self._lock:
+            if clave not in self._entradas:
+                self._entradas[clave] = entrada
+                self._bytes += entrada[0].sizeInBytes()
+                self._expulsar()
+        return entrada
+
+    def dibujar(self, painter, ruta, rect, estilo=None, grosor=1, dpr=1.0):
+        """Dibuja el icono en `rect` (QRectF lógico). Devuelve False si no hay icono."""
+        margen = _margen(estilo, grosor)
+        esquina = QPointF(rect.left() - margen, rect.top() - margen)
+        fase = _fase_dispositivo(painter, esquina, dpr)
+        entrada = self.obtener(ruta, rect.width(), rect.height(), estilo, grosor, dpr, fase)
+        if entrada is None:
+            return False
+        imagen, margen = entrada
+        painter.save()
+        if fase is None:
+            destino = rect.adjusted(-margen, -margen, margen, margen)
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        else:
+            # Copia píxel a píxel desde la posición entera del dispositivo
+            destino = QRectF(
+                esquina.x() - fase[0] / dpr,
+                esquina.y() - fase[1] / dpr,
+                imagen.width() / dpr,
+                imagen.height() / dpr,
+            )
+            painter.setRenderHint(QPainter.SmoothPixmapTransform, False)
+        painter.drawImage(destino, imagen)
+        painter.restore()
+        return True
+
+    def estadisticas(self):
+        """Contadores de uso de la caché (para depuración y benchmarks)."""
+        with self._lock:
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+                "presupuesto_bytes": self.presupuesto_bytes,
+            }
+
+    def vaciar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._tamanos_nativos.clear()
+            self._bytes = 0
+            self.aciertos = 0
+            self.fallos = 0
+
+    def _expulsar(self):
+        # Se llama con el lock tomado
+        while self._bytes > self.presupuesto_bytes and len(self._entradas) > 1:
+            _, (imagen, _margen) = self._entradas.popitem(last=False)
+            self._bytes -= imagen.sizeInBytes()
+
+    def _rasterizar(self, ruta, ancho, alto, estilo, grosor, dpr, fase=None):
+        if self.tamano_nativo(ruta) is None:
+            return None
+
+        margen = _margen(estilo, grosor)
+        ancho_total = ancho + 2 * margen
+        alto_total = alto + 2 * margen
+        fase_x, fase_y = fase if fase is not None else (0.0, 0.0)
+        px_w = max(1, int(math.ceil(fase_x + ancho_total * dpr)))
+        px_h = max(1, int(math.ceil(fase_y + alto_total * dpr)))
+
+        escalada = None
+        if not _es_svg(ruta):
+            # Los iconos raster se escalan a píxeles enteros
+            escalada = QImage(ruta).scaled(
+                max(1, int(round(ancho * dpr))),
+                max(1, int(round(alto * dpr))),
+                Qt.IgnoreAspectRatio if fase is None else Qt.KeepAspectRatio,
+                Qt.SmoothTransformation,
+            )
+            if fase is not None:
+                # Copia píxel a píxel: en la posición redondeada, sin estirar
+                origen = (int(round(fase_x + margen * dpr)), int(round(fase_y + margen * dpr)))
+                px_w = max(px_w, origen[0] + escalada.width())
+                px_h = max(px_h, origen[1] + escalada.height())
+
+        imagen = QImage(px_w, px_h, QImage.Format_ARGB32_Premultiplied)
+        imagen.fill(Qt.transparent)
+        p = QPainter(imagen)
+        p.setRenderHint(QPainter.Antialiasing)
+        p.setRenderHint(QPainter.SmoothPixmapTransform)
+        if fase is None:
+            p.scale(px_w / ancho_total, px_h / alto_total)
+        else:
+            p.translate(fase_x, fase_y)
+            p.scale(dpr, dpr)
+
+        rect = QRectF(margen, margen, ancho, alto)
+        if estilo == ESTILO_CONTORNO:
+            p.setBrush(Qt.NoBrush)
+            p.setPen(QPen(QColor(255, 255, 255, 255), grosor))
+            p.drawRoundedRect(rect, 3, 3)
+        elif estilo == ESTILO_ROMBO:
+            p.setBrush(Qt.NoBrush)
+            p.setPen(QPen(QColor(255, 255, 255, 255), grosor))
+            cx = rect.center().x()
+            cy = rect.center().y()
+            rx = ancho / 2.0
+            ry = alto / 2.0
+            p.drawPolygon(QPolygonF([
+                QPointF(cx, cy - ry),
+                QPointF(cx + rx, cy),
+                QPointF(cx, cy + ry),
+                QPointF(cx - rx, cy),
+            ]))
+        elif estilo == ESTILO_RELLENO:
+            p.setBrush(QBrush(QColor(255, 255, 255, 255)))
+            p.setPen(Qt.NoPen)
+            p.drawRoundedRect(rect.adjusted(-grosor, -grosor, grosor, grosor), 3, 3)
+
+        if escalada is None:
+            QSvgRenderer(ruta).render(p, rect)
+        elif fase is None:
+            p.drawImage(rect, escalada)
+        else:
+            p.resetTransform()
+            p.drawImage(origen[0], origen[1], escalada)
+        p.end()
+        return imagen, margen
+
+
+# Instancia global compartida por el preview y la exportación
+cache_iconos_global = CacheIconos()
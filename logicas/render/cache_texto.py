@@ -0,0 +1,231 @@
+"""Caché de maquetación del texto de habilidades.
+
+Convertir el texto a HTML, rasterizar los iconos de disciplina en línea y
+maquetar un QTextDocument es lo más caro del pintado de una carta. Los
+documentos ya maquetados se guardan aquí (LRU por número de entradas) con
+clave (texto, fuente, color, ancho de texto, modo de maquetación, alto de
+icono): todo en el espacio de referencia, de modo que un repintado con el
+mismo texto sólo dibuja, aunque la ventana cambie de tamaño.
+
+La escala del destino sólo afecta a la resolución de los iconos en línea.
+Cada <img> lleva su tamaño lógico, así que la maquetación no depende de
+ella; si cambia la escala de rasterizado (ver cache_iconos) se sustituyen
+las imágenes del documento sin volver a maquetarlo.
+
+QTextDocument no es seguro entre hilos: sólo se cachean los documentos del
+hilo principal. Las exportaciones en segundo plano maquetan el suyo cada
+vez (cada trabajo pinta la carta una sola vez).
+
+Las imágenes de los iconos en línea salen de `cache_iconos_global`, por
+lo que se comparten entre documentos.
+"""
+import html
+import os
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QUrl
+from PyQt5.QtGui import QColor, QImage, QTextDocument, QTextOption
+
+from logicas.render.cache_iconos import cache_iconos_global, escala_rasterizado
+
+
+MAX_DOCUMENTOS_POR_DEFECTO = 64
+
+
+def _tamano_icono_en_linea(icon_path, icon_h):
+    """(ancho, alto) lógicos del icono SVG a `icon_h` de alto, o None."""
+    nativo = cache_iconos_global.tamano_nativo(icon_path)
+    if nativo is None:
+        return None
+    native_w, native_h = nativo
+    scale = icon_h / max(native_w, native_h)
+    return max(1, int(native_w * scale)), max(1, int(native_h * scale))
+
+
+def _imagen_icono_en_linea(icon_path, icon_h, dpr):
+    """QImage del icono SVG escalado a `icon_h` píxeles lógicos de alto."""
+    tamano = _tamano_icono_en_linea(icon_path, icon_h)
+    if tamano is None:
+        return None
+    target_w, target_h = tamano
+    dpr = escala_rasterizado(dpr)
+    entrada = cache_iconos_global.obtener(icon_path, target_w, target_h, dpr=dpr)
+    if entrada is None:
+        return None
+    imagen = QImage(entrada[0])
+    # Con devicePixelRatio el documento maqueta el icono a su tamaño lógico
+    imagen.setDevicePixelRatio(dpr)
+    return imagen
+
+
+def habilidad_a_html(source, icon_h, resolver_icono, dpr=1.0):
+    """Convierte el texto de habilidades a HTML para QTextDocument.
+
+    Soporta **negrita** y [Disciplina] (icono en línea). Devuelve
+    (html, recursos) donde recursos es un dict {url: QImage} con los iconos
+    SVG que hay que registrar en el documento.
+    """
+    ability_html, iconos = _habilidad_a_html(source, icon_h, resolver_icono)
+    return ability_html, _imagenes_iconos(iconos, icon_h, dpr)
+
+
+def _imagenes_iconos(iconos, icon_h, dpr):
+    """{url: QImage} de los iconos en línea ({url: ruta}) a la escala `dpr`."""
+    recursos = {}
+    for url_str, icon_path in iconos.items():
+        imagen = _imagen_icono_en_linea(icon_path, icon_h, dpr)
+        if imagen is not None:
+            recursos[url_str] = imagen
+    return recursos
+
+
+def _habilidad_a_html(source, icon_h, resolver_icono):
+    """HTML del texto de habilidades y {url: ruta} de sus iconos SVG en línea."""
+    iconos = {}
+    res = []
+    bold = False
+    i = 0
+    while i < len(source):
+        if source[i:i+2] == "**":
+            res.append("</b>" if bold else "<b>")
+            bold = not bold
+            i += 2
+            continue
+        if source[i] == "[":
+            end = source.find("]", i + 1)
+            if end != -1:
+                tag = source[i+1:end].strip()
+                icon_path = resolver_icono(tag)
+                if icon_path:
+                    # Si el recurso es SVG, se registra como QImage en el
+                    # QTextDocument para que pueda renderizarlo dentro del texto.
+                    ext = os.path.splitext(icon_path)[1].lower()
+                    if ext == ".svg":
+                        # Usamos una URL lógica para el recurso, independiente de la ruta física
+                        url_str = f"disciplina:{os.path.basename(icon_path)}"
+                        iconos[url_str] = icon_path
+                        # Con el tamaño lógico explícito la maquetación no
+                        # depende de la resolución a la que se rasterice
+                        tamano = _tamano_icono_en_linea(icon_path, icon_h)
+                        if tamano is not None:
+                            res.append(f'<img src="{url_str}" width="{tamano[0]}" height="{tamano[1]}" />')
+                        else:
+                            res.append(f'<img src="{url_str}" />')
+                    else:
+                        # Formatos raster se pueden usar directamente
+                        res.append(f'<img src="{icon_path}" height="{icon_h}" />')
+                    i = end + 1
+                    continue
+                # Si no se encuentra icono, dejar el texto tal cual
+                res.append(html.escape(source[i:end+1]))
+                i = end + 1
+                continue
+        ch = source[i]
+        if ch == "\n":
+            res.append("<br/>")
+        else:
+            res.append(html.escape(ch))
+        i += 1
+    if bold:
+        res.append("</b>")
+    return "".join(res), iconos
+
+
+class CacheTexto:
+    """Caché LRU de QTextDocument ya maquetados."""
+
+    def __init__(self, max_documentos=MAX_DOCUMENTOS_POR_DEFECTO):
+        self.max_documentos = max_documentos
+        self._documentos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def documento(self, texto, fuente, color, ancho_texto, modo, icon_h, resolver_icono, dpr=1.0, dispositivo=None):
+        """Devuelve un QTextDocument maquetado para el texto de habilidades.
+
+        Si se indica `dispositivo`, las fuentes se miden con su resolución
+        en lugar de la de la pantalla. `dpr` sólo decide la resolución de
+        los iconos en línea.
+        """
+        html_color = color if isinstance(color, str) else QColor(color).name()
+        escala = escala_rasterizado(dpr)
+        if threading.current_thread() is not threading.main_thread():
+            doc, _iconos = self._maquetar(texto, fuente, html_color, ancho_texto, modo, icon_h, resolver_icono, escala, dispositivo)
+            return doc
+
+        dpi = dispositivo.logicalDpiY() if dispositivo is not None else None
+        clave = (texto, fuente.toString(), html_color, round(ancho_texto, 2), modo, icon_h, dpi)
+        with self._lock:
+            entrada = self._documentos.get(clave)
+            if entrada is not None:
+                self._documentos.move_to_end(clave)
+                self.aciertos += 1
+            else:
+                self.fallos += 1
+
+        if entrada is None:
+            doc, iconos = self._maquetar(texto, fuente, html_color, ancho_texto, modo, icon_h, resolver_icono, escala, dispositivo)
+            with self._lock:
+                self._documentos[clave] = [doc, iconos, escala]
+                while len(self._documentos) > self.max_documentos:
+                    self._documentos.popitem(last=False)
+            return doc
+
+        doc, iconos, escala_iconos = entrada
+        if escala_iconos != escala:
+            # Otra resolución de destino: sólo cambian las imágenes
+            self._registrar_iconos(doc, _imagenes_iconos(iconos, icon_h, escala))
+            entrada[2] = escala
+        return doc
+
+    def _registrar_iconos(self, doc, recursos):
+        for url_str, imagen in recursos.items():
+            doc.addResource(QTextDocument.ImageResource, QUrl(url_str), imagen)
+
+    def _maquetar(self, texto, fuente, html_color, ancho_texto, modo, icon_h, resolver_icono, escala, dispositivo):
+        ability_html, iconos = _habilidad_a_html(texto, icon_h, resolver_icono)
+
+        doc = QTextDocument()
+        if dispositivo is not None:
+            doc.documentLayout().setPaintDevice(dispositivo)
+        doc.setDefaultFont(fuente)
+        # Reducir ligeramente el interlineado. En cripta lo hacemos
+        # todavía un poco más compacto que en librería.
+        if modo == 'cripta':
+            line_height = "90%"
+        else:
+            line_height = "95%"
+        # Registrar los recursos antes del HTML para que QTextDocument pueda
+        # resolver las URLs usadas en los <img src="..."> al maquetar.
+        self._registrar_iconos(doc, _imagenes_iconos(iconos, icon_h, escala))
+        doc.setHtml(f'<div style="color:{html_color}; line-height: {line_height};">{ability_html}</div>')
+        opt = QTextOption()
+        opt.setWrapMode(QTextOption.WordWrap)
+        # Texto centrado horizontalmente; el centrado vertical real
+        # lo controla quien dibuja según la altura real del documento.
+        opt.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
+        doc.setDefaultTextOption(opt)
+        doc.setTextWidth(ancho_texto)
+        # Forzar la maquetación ahora para que los aciertos sólo dibujen
+        doc.size()
+        return doc, iconos
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "documentos": len(self._documentos),
+            }
+
+    def vaciar(self):
+        with self._lock:
+            self._documentos.clear()
+            self.aciertos = 0
+            self.fallos = 0
+
+
+# Instancia global compartida por el preview y la exportación
+cache_texto_global = CacheTexto()
@@ -0,0 +1,137 @@
+"""Registro de las fuentes de la carpeta fonts/.
+
+Cada pestaña (y la configuración, en cada cambio de un spinbox) llamaba a
+QFontDatabase.addApplicationFont con el archivo de la fuente, que se
+volvía a leer del disco y se registraba con un id nuevo cada vez. Aquí cada
+archivo se registra una sola vez y se guardan su familia, los QFont por
+(familia, tamaño) y sus QFontMetrics, de modo que aplicar la configuración
+es una consulta a un dict.
+
+Las rutas de la configuración pueden venir como "MatrixExtraBold.otf",
+"fonts/MatrixExtraBold.otf" o absolutas; todas se resuelven al mismo
+archivo.
+"""
+import os
+import sys
+import threading
+
+from PyQt5.QtGui import QFont, QFontDatabase, QFontMetrics
+
+from logicas.diagnostico.arranque import perfil_arranque
+
+
+EXTENSIONES_FUENTE = ('.otf', '.ttf', '.ttc')
+
+
+def get_resource_path(relative_path):
+    """Devuelve la ruta absoluta a un recurso, compatible con PyInstaller."""
+    if hasattr(sys, '_MEIPASS'):
+        # PyInstaller extrae los archivos a _MEIPASS
+        base_path = sys._MEIPASS
+    else:
+        base_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(base_path, relative_path)
+
+
+FONTS_DIR = get_resource_path("fonts")
+
+
+class RegistroFuentes:
+    """Fuentes registradas en QFontDatabase, una vez por archivo."""
+
+    def __init__(self, directorio=FONTS_DIR):
+        self.directorio = directorio
+        # archivo de la config -> ruta absoluta
+        self._rutas = {}
+        # ruta absoluta -> familia (o None si no se pudo registrar)
+        self._familias = {}
+        self._fuentes = {}
+        self._metricas = {}
+        self._disponibles = None
+        self._lock = threading.Lock()
+
+    def ruta(self, archivo):
+        """Ruta absoluta del archivo de fuente indicado en la configuración."""
+        if archivo in self._rutas:
+            return self._rutas[archivo]
+        if os.path.isabs(archivo):
+            ruta = archivo
+        else:
+            # "fonts/X.otf" (relativa al proyecto) o "X.otf" (dentro de fonts/)
+            ruta = get_resource_path(archivo)
+            if not os.path.exists(ruta):
+                ruta = os.path.join(self.directorio, os.path.basename(archivo))
+        self._rutas[archivo] = ruta
+        return ruta
+
+    def familia(self, archivo):
+        """Familia de la fuente del archivo, registrándolo la primera vez.
+
+        Si el archivo no se puede cargar se devuelve el propio nombre de
+        archivo, como hacía la aplicación antes (Qt usará una fuente por
+        defecto).
+        """
+        ruta = self.ruta(archivo)
+        with self._lock:
+            if ruta not in self._familias:
+                familias = []
+                with perfil_arranque.tramo("fuente_registrada", archivo=os.path.basename(ruta)):
+                    font_id = QFontDatabase.addApplicationFont(ruta)
+                    if font_id != -1:
+                        familias = QFontDatabase.applicationFontFamilies(font_id)
+                self._familias[ruta] = familias[0] if familias else None
+            familia = self._familias[ruta]
+        return familia or archivo
+
+    def fuente(self, archivo, tamano):
+        """QFont del archivo al tamaño indicado (en puntos).
+
+        Devuelve una copia, así que se puede modificar sin afectar a la caché.
+        """
+        familia = self.familia(archivo)
+        clave = (familia, tamano)
+        with self._lock:
+            fuente = self._fuentes.get(clave)
+            if fuente is None:
+                fuente = QFont(familia, tamano)
+                self._fuentes[clave] = fuente
+        return QFont(fuente)
+
+    def metricas(self, fuente, dispositivo):
+        """QFontMetrics de la fuente medidas sobre `dispositivo`.
+
+        Sólo se guardan las del hilo principal: QFontMetrics no se comparte
+        entre hilos, así que las exportaciones en segundo plano reciben unas
+        nuevas en cada llamada.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return QFontMetrics(fuente, dispositivo)
+        clave = (fuente.toString(), dispositivo.logicalDpiY())
+        with self._lock:
+            metricas = self._metricas.get(clave)
+        if metricas is None:
+            metricas = QFontMetrics(fuente, dispositivo)
+            with self._lock:
+                self._metricas[clave] = metricas
+        return metricas
+
+    def disponibles(self):
+        """Lista de (nombre para mostrar, archivo) de las fuentes de fonts/."""
+        if self._disponibles is None:
+            fuentes = []
+            if os.path.exists(self.directorio):
+                for archivo in os.listdir(self.directorio):
+                    if archivo.endswith(EXTENSIONES_FUENTE):
+                        nombre_display = os.path.splitext(archivo)[0]
+                        fuentes.append((nombre_display, archivo))
+            self._disponibles = fuentes
+        return list(self._disponibles)
+
+    def registrar_todas(self):
+        """Registra todas las fuentes de fonts/ (p. ej. al arrancar)."""
+        for _nombre, archivo in self.disponibles():
+            self.familia(archivo)
+
+
+# Registro global compartido por las pestañas, la configuración y los lotes
+registro_fuentes_global = RegistroFuentes()
@@ -0,0 +1,195 @@
+"""Índice de los iconos de resources/, construido una sola vez.
+
+Resolver un icono (disciplina, clan, senda, coste, tipo de librería)
+consultaba el disco con os.path.exists y, si el nombre no coincidía, hacía
+un os.listdir de la carpeta entera; el pintado además comprobaba con
+os.path.exists cada icono en cada repintado. Aquí se recorren las carpetas
+una vez (en el ejecutable de PyInstaller se lee el manifiesto
+resources/indice_recursos.json que genera main.spec) y todas las consultas
+son búsquedas en dicts.
+
+Las rutas que no pertenecen al índice (p. ej. iconos elegidos a mano) se
+comprueban en disco una sola vez y se recuerda el resultado.
+
+Para generar el manifiesto a mano:
+
+    python -m logicas.render.indice_recursos
+"""
+import json
+import os
+import sys
+import threading
+
+
+# Categoría -> carpeta dentro de resources/
+CATEGORIAS = {
+    "disciplinas": "disciplines",
+    "clanes": "clans",
+    "sendas": "sendas",
+    "blood": "blood",
+    "pool": "pool",
+    "costes": "costes",
+    "libreria": "libreria",
+}
+
+EXTENSIONES_ICONO = (".svg", ".png", ".gif", ".jpg", ".jpeg", ".webp")
+
+NOMBRE_MANIFIESTO = "indice_recursos.json"
+
+
+def get_resource_path(relative_path):
+    """Devuelve la ruta absoluta a un recurso, compatible con PyInstaller."""
+    if hasattr(sys, '_MEIPASS'):
+        # PyInstaller extrae los archivos a _MEIPASS
+        base_path = sys._MEIPASS
+    else:
+        base_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(base_path, relative_path)
+
+
+def normalizar(nombre):
+    """Forma comparable de un nombre de archivo sin extensión."""
+    return nombre.lower().replace(" ", "").replace("_", "").replace("-", "")
+
+
+def _clave_ruta(ruta):
+    return os.path.normcase(os.path.normpath(os.path.abspath(ruta)))
+
+
+def _escanear(base_dir):
+    """{categoría: [archivos]} recorriendo las carpetas de resources/."""
+    archivos = {}
+    for categoria, carpeta in CATEGORIAS.items():
+        try:
+            entradas = os.scandir(os.path.join(base_dir, carpeta))
+        except OSError:
+            archivos[categoria] = []
+            continue
+        with entradas:
+            archivos[categoria] = [
+                e.name for e in entradas
+                if e.is_file() and os.path.splitext(e.name)[1].lower() in EXTENSIONES_ICONO
+            ]
+    return archivos
+
+
+def generar_manifiesto(base_dir=None, destino=None):
+    """Escribe el manifiesto con los archivos actuales y devuelve su ruta."""
+    base_dir = base_dir or get_resource_path("resources")
+    destino = destino or os.path.join(base_dir, NOMBRE_MANIFIESTO)
+    archivos = _escanear(base_dir)
+    with open(destino, "w", encoding="utf-8") as f:
+        json.dump({c: sorted(a) for c, a in archivos.items()}, f, indent=2, ensure_ascii=False)
+    return destino
+
+
+class IndiceRecursos:
+    """Nombre normalizado -> ruta de cada icono de resources/."""
+
+    def __init__(self, base_dir=None):
+        self.base_dir = base_dir or get_resource_path("resources")
+        self._archivos = None
+        self._lock = threading.Lock()
+        # Resultados de búsquedas aproximadas y de rutas fuera del índice
+        self._busquedas = {}
+        self._existe_fuera = {}
+
+    def _cargar(self):
+        """Construye el índice la primera vez que se usa."""
+        if self._archivos is not None:
+            return self._archivos
+        with self._lock:
+            if self._archivos is not None:
+                return self._archivos
+            manifiesto = os.path.join(self.base_dir, NOMBRE_MANIFIESTO)
+            listados = None
+            # En desarrollo siempre se escanea, para no usar un manifiesto
+            # desactualizado al añadir iconos
+            if hasattr(sys, '_MEIPASS') and os.path.exists(manifiesto):
+                try:
+                    with open(manifiesto, "r", encoding="utf-8") as f:
+                        listados = json.load(f)
+                except (OSError, ValueError):
+                    listados = None
+            if listados is None:
+                listados = _escanear(self.base_dir)
+
+            archivos = {}
+            rutas = set()
+            for categoria, carpeta in CATEGORIAS.items():
+                base = os.path.join(self.base_dir, carpeta)
+                por_nombre = {}
+                for nombre in listados.get(categoria, []):
+                    ruta = os.path.join(base, nombre)
+                    por_nombre[nombre.lower()] = ruta
+                    rutas.add(_clave_ruta(ruta))
+                archivos[categoria] = por_nombre
+            self._rutas = rutas
+            self._archivos = archivos
+            return archivos
+
+    def construir(self):
+        """Fuerza la construcción del índice (p. ej. al arrancar)."""
+        self._cargar()
+
+    def archivos(self, categoria):
+        """Nombres de los archivos de la categoría, ordenados."""
+        return sorted(os.path.basename(r) for r in self._cargar().get(categoria, {}).values())
+
+    def ruta(self, categoria, nombre_archivo):
+        """Ruta del archivo exacto `nombre_archivo` en la categoría, o None."""
+        if not nombre_archivo:
+            return None
+        return self._cargar().get(categoria, {}).get(nombre_archivo.lower())
+
+    def primera(self, categoria, *nombres_archivo):
+        """Ruta del primero de los archivos que exista, o None."""
+        for nombre in nombres_archivo:
+            ruta = self.ruta(categoria, nombre)
+            if ruta:
+                return ruta
+        return None
+
+    def buscar(self, categoria, nombre):
+        """Busca un icono por nombre normalizado.
+
+        Devuelve el archivo cuyo nombre (sin extensión) coincide exactamente
+        y, si no hay ninguno, el primero (por orden alfabético) que empieza
+        por `nombre`.
+        """
+        nombre_norm = normalizar(nombre or "")
+        if not nombre_norm:
+            return None
+        clave = (categoria, nombre_norm)
+        if clave in self._busquedas:
+            return self._busquedas[clave]
+        mejor_match = None
+        for archivo, ruta in sorted(self._cargar().get(categoria, {}).items()):
+            stem_norm = normalizar(os.path.splitext(archivo)[0])
+            if stem_norm == nombre_norm:
+                mejor_match = ruta
+                break
+            if stem_norm.startswith(nombre_norm) and mejor_match is None:
+                mejor_match = ruta
+        self._busquedas[clave] = mejor_match
+        return mejor_match
+
+    def existe(self, ruta):
+        """Equivalente a os.path.exists sin tocar el disco en el pintado."""
+        if not ruta:
+            return False
+        self._cargar()
+        clave = _clave_ruta(ruta)
+        if clave in self._rutas:
+            return True
+        if clave not in self._existe_fuera:
+            self._existe_fuera[clave] = os.path.exists(ruta)
+        return self._existe_fuera[clave]
+
+
+# Índice global compartido por las pestañas, el renderizador y los lotes
+indice_recursos_global = IndiceRecursos()
+
+
+if __name__ == "__main__":
+    print(generar_manifiesto())
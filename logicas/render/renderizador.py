@@ -0,0 +1,806 @@
+"""Renderizador de cartas independiente de QWidget.
+
+`RenderizadorCarta` contiene la descripción de una carta (título, clan,
+senda, disciplinas, coste, texto de habilidades, ilustrador, grupo de
+cripta e ilustración) y sabe pintarla sobre cualquier QPaintDevice
+(QImage, QPixmap, QWidget...) y a cualquier resolución. No necesita
+widgets, por lo que funciona con QT_QPA_PLATFORM=offscreen.
+
+La carta se maqueta siempre en un espacio lógico de referencia
+(ANCHO_REFERENCIA x ALTO_REFERENCIA, con las fuentes medidas a
+DPI_REFERENCIA) que luego se escala al destino. Así la exportación se
+rasteriza directamente al tamaño de salida (ilustración original e iconos
+vectoriales a esa resolución) y no depende del tamaño de la ventana.
+
+El pintado se divide en capas (ver `CAPAS`) para que el preview pueda
+cachearlas por separado; `pintar` las dibuja todas seguidas.
+"""
+import copy
+
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtGui import QFont, QPainter, QColor, QImage, QPixmap
+
+from logicas.render.cache_iconos import (
+    cache_iconos_global,
+    ESTILO_CONTORNO,
+    ESTILO_ROMBO,
+    ESTILO_RELLENO,
+    escala_rasterizado,
+)
+from logicas.render.cache_texto import cache_texto_global
+from logicas.render.fuentes import registro_fuentes_global
+from logicas.render.indice_recursos import indice_recursos_global
+from logicas.recorte.constantes import VTES_CARD_WIDTH_ONLINE, VTES_CARD_HEIGHT_ONLINE
+from logicas.diagnostico.perfil_pintado import perfil_pintado
+
+
+# Espacio lógico de referencia en el que se maqueta la carta (márgenes,
+# tamaños de icono y fuentes de la configuración se expresan en él)
+ANCHO_REFERENCIA = VTES_CARD_WIDTH_ONLINE
+ALTO_REFERENCIA = VTES_CARD_HEIGHT_ONLINE
+# Resolución con la que se convierten a píxeles lógicos las fuentes en puntos
+DPI_REFERENCIA = 96
+
+_dispositivo_referencia = None
+
+
+def obtener_archivo_disciplina_texto(nombre_disciplina):
+    """Resuelve el archivo de icono para una disciplina usada en el texto de habilidades.
+
+    Se intenta primero con el nombre completo tal cual aparece entre corchetes
+    (p. ej. "Superior Oblivion") y, si no se encuentra, con la versión
+    sin "Superior" para reutilizar el mismo icono.
+    """
+    if not nombre_disciplina:
+        return None
+
+    nombre_raw = nombre_disciplina.strip()
+    if not nombre_raw:
+        return None
+
+    lower = nombre_raw.lower()
+    es_superior = False
+
+    # Aceptar tanto "Oblivion Superior" como "Superior Oblivion"
+    if lower.startswith("superior "):
+        es_superior = True
+        base = nombre_raw[len("Superior "):].strip()
+    elif lower.endswith(" superior"):
+        es_superior = True
+        base = nombre_raw[:-len(" superior")].strip()
+    else:
+        base = nombre_raw
+
+    stem = base.replace(" ", "").lower()
+    if not stem:
+        return None
+
+    if es_superior:
+        fname = f"{stem}sup.svg"
+    else:
+        fname = f"{stem}.svg"
+
+    # Búsqueda directa y, si no, coincidencia aproximada en el índice
+    return indice_recursos_global.ruta("disciplinas", fname) or indice_recursos_global.buscar("disciplinas", stem)
+
+
+def dispositivo_referencia():
+    """QPaintDevice con DPI_REFERENCIA para medir fuentes y maquetar texto."""
+    global _dispositivo_referencia
+    if _dispositivo_referencia is None:
+        _dispositivo_referencia = imagen_lienzo(1, 1)
+    return _dispositivo_referencia
+
+
+def imagen_lienzo(ancho, alto, dpr=1.0):
+    """QImage transparente de ancho x alto píxeles lista para pintar una carta.
+
+    Usa DPI_REFERENCIA mientras se pinta para que las fuentes midan lo mismo
+    en cualquier destino; quien guarde la imagen puede fijar después los
+    metadatos de DPI de salida.
+    """
+    imagen = QImage(max(1, int(ancho)), max(1, int(alto)), QImage.Format_ARGB32_Premultiplied)
+    dots_per_meter = int(round(DPI_REFERENCIA / 0.0254))
+    imagen.setDotsPerMeterX(dots_per_meter)
+    imagen.setDotsPerMeterY(dots_per_meter)
+    imagen.setDevicePixelRatio(dpr)
+    imagen.fill(Qt.transparent)
+    return imagen
+
+
+def _metricas(fuente):
+    return registro_fuentes_global.metricas(fuente, dispositivo_referencia())
+
+
+# Capa a la que afecta cada atributo de la carta. El preview usa este mapa
+# para marcar sucia sólo la capa afectada al cambiar un atributo; las
+# dependencias de posición entre capas se resuelven con
+# RenderizadorCarta.clave_geometria.
+CAPAS_POR_ATRIBUTO = {
+    "pixmap": ("arte",),
+    "title": ("titulo",),
+    "title_font": ("titulo",),
+    "title_color": ("titulo",),
+    "title_alignment": ("titulo",),
+    "clan": ("simbolos",),
+    "clan_svg_path": ("simbolos",),
+    "clan_size": ("simbolos",),
+    "clan_alignment": ("simbolos",),
+    "clan2": ("simbolos",),
+    "clan2_svg_path": ("simbolos",),
+    "clan2_stack": ("simbolos",),
+    "clan_draw_border": ("simbolos",),
+    "senda": ("simbolos",),
+    "senda_svg_path": ("simbolos",),
+    "senda_size": ("simbolos",),
+    "senda_alignment": ("simbolos",),
+    "senda_draw_border": ("simbolos",),
+    "disciplines": ("simbolos",),
+    "discipline_size": ("simbolos",),
+    "discipline_draw_border": ("simbolos",),
+    "discipline_anchor_mode": ("simbolos",),
+    "ability_text": ("habilidad",),
+    "ability_font": ("habilidad",),
+    "ability_color": ("habilidad",),
+    "ability_bg_opacity": ("habilidad",),
+    "ability_layout_mode": ("habilidad",),
+    "illustrator_text": ("habilidad",),
+    "illustrator_font": ("habilidad",),
+    "illustrator_color": ("habilidad",),
+    "crypt_group": ("habilidad",),
+    "crypt_group_font": ("habilidad",),
+    "crypt_group_color": ("habilidad",),
+    "cost_type": ("coste",),
+    "cost_svg_path": ("coste",),
+    "cost_size": ("coste",),
+    "cost_draw_border": ("coste",),
+    "cost_alignment": ("coste",),
+    "cost_value": ("coste",),
+}
+
+
+# Atributos que describen una carta (claves de `especificacion`)
+ATRIBUTOS_CARTA = tuple(CAPAS_POR_ATRIBUTO)
+
+
+def _tamano_ajustado(ancho_arte, alto_arte, ancho, alto):
+    """Tamaño entero del arte ajustado a (ancho, alto) sin recortar.
+
+    Reproduce el redondeo de QSize.scaled(..., Qt.KeepAspectRatio) para que
+    el rectángulo de carta coincida con el de la ilustración escalada.
+    """
+    if ancho_arte <= 0 or alto_arte <= 0:
+        return ancho, alto
+    rw = alto * ancho_arte // alto_arte
+    if rw <= ancho:
+        return rw, alto
+    return ancho, ancho * alto_arte // ancho_arte
+
+
+class RenderizadorCarta:
+    """Descripción de una carta y su pintado sobre cualquier QPaintDevice."""
+
+    # Capas de la carta, en orden de composición
+    CAPAS = ("arte", "titulo", "simbolos", "habilidad", "coste")
+
+    def __init__(self, **atributos):
+        # Ilustración original a resolución completa (QImage o QPixmap)
+        self.pixmap = None
+        self.title = ""
+        self.title_font = QFont()
+        self.title_color = "#ffffff"
+        self.title_alignment = "centro"  # "centro" o "izquierda"
+        self.clan = None  # Nombre del clan
+        self.clan_svg_path = None  # Ruta al SVG del clan
+        self.clan_size = 40  # Tamaño del símbolo del clan en píxeles
+        self.clan_alignment = "izquierda"  # "izquierda", "centro", "derecha"
+        # Segundo símbolo (solo para tipos de librería con dos tipos)
+        self.clan2 = None
+        self.clan2_svg_path = None
+        # Controla si el segundo símbolo se dibuja apilado (debajo) o en línea (lado a lado)
+        self.clan2_stack = False
+        # Controla si se dibuja un reborde blanco detrás del símbolo (por defecto False)
+        # Se activará desde `LibreriaWidget` para mantener Cripta sin recuadro
+        self.clan_draw_border = False
+        # Senda (símbolo que va debajo del clan)
+        self.senda = None
+        self.senda_svg_path = None
+        self.senda_size = 24
+        self.senda_alignment = "izquierda"  # "izquierda" o "derecha"
+        self.senda_draw_border = False
+        # Texto de habilidades (recuadro inferior semitransparente)
+        self.ability_text = ""
+        self.ability_font = QFont()
+        self.ability_color = "#ffffff"
+        # Opacidad del fondo (0-255)
+        self.ability_bg_opacity = 128
+        # Modo de maquetación del texto de habilidades: "default" o "cripta"
+        self.ability_layout_mode = "default"
+        # Disciplinas (columna de iconos en el borde izquierdo)
+        # Lista de elementos de disciplina: cada uno es un dict con claves
+        # {"nombre": str, "svg_path": str}
+        self.disciplines = []
+        self.discipline_size = 24
+        # Halo/borde blanco semitransparente alrededor del icono de disciplina
+        self.discipline_draw_border = False
+        # Modo de anclaje vertical de las disciplinas:
+        #   "centro" (por defecto, usado en librería)
+        #   "inferior" (anclar el primer icono en el tercio inferior y apilar hacia arriba)
+        self.discipline_anchor_mode = "centro"
+        # Ilustrador (texto en la parte inferior, debajo del cuadro de habilidades)
+        self.illustrator_text = ""
+        self.illustrator_font = QFont()
+        self.illustrator_color = "#ffffff"
+        # Grupo de cripta (número pequeño 1-9 sobre el cuadro de texto)
+        self.crypt_group = None
+        self.crypt_group_font = QFont()
+        self.crypt_group_color = "#ffffff"
+        # Coste (usado por Librería y Cripta)
+        self.cost_type = None  # 'blood', 'pool', 'capacity' o None
+        self.cost_svg_path = None
+        self.cost_size = 20
+        self.cost_draw_border = False
+        self.cost_alignment = "izquierda"  # "izquierda" o "derecha"
+        # Valor del coste: '1'..'6' o 'X' o None
+        self.cost_value = None
+
+        # Última ilustración convertida a QImage por `copia` (cacheKey, QImage)
+        self._arte_como_imagen = None
+
+        self.aplicar(atributos)
+
+    def aplicar(self, atributos):
+        """Actualiza la descripción de la carta desde un dict {atributo: valor}."""
+        for nombre, valor in (atributos or {}).items():
+            if nombre not in CAPAS_POR_ATRIBUTO:
+                raise AttributeError(f"Atributo de carta desconocido: {nombre}")
+            setattr(self, nombre, valor)
+
+    def especificacion(self):
+        """Devuelve la descripción actual de la carta como dict."""
+        return {nombre: getattr(self, nombre) for nombre in ATRIBUTOS_CARTA}
+
+    def copia(self):
+        """Copia independiente de la carta para pintarla en otro hilo.
+
+        QPixmap sólo puede usarse en el hilo de la interfaz, así que la
+        ilustración se pasa a QImage (la conversión se reutiliza mientras
+        no cambie). Fuentes y listas se copian para que seguir editando la
+        carta no afecte a la copia.
+        """
+        atributos = {}
+        for nombre, valor in self.especificacion().items():
+            if isinstance(valor, QPixmap):
+                clave = valor.cacheKey()
+                if self._arte_como_imagen is None or self._arte_como_imagen[0] != clave:
+                    self._arte_como_imagen = (clave, valor.toImage())
+                valor = self._arte_como_imagen[1]
+            elif isinstance(valor, QFont):
+                valor = QFont(valor)
+            elif isinstance(valor, (list, dict)):
+                valor = copy.deepcopy(valor)
+            atributos[nombre] = valor
+        return RenderizadorCarta(**atributos)
+
+    def calcular_geometria(self, ancho=ANCHO_REFERENCIA, alto=ALTO_REFERENCIA):
+        """Calcula el rectángulo de carta y las posiciones que comparten varias capas.
+
+        (ancho, alto) es el área lógica de maquetación (por defecto la de
+        referencia); la ilustración se ajusta dentro de ella manteniendo
+        SIEMPRE la proporción (sin recortar).
+        """
+        if self.pixmap:
+            card_w, card_h = _tamano_ajustado(self.pixmap.width(), self.pixmap.height(), ancho, alto)
+            card_x = int((ancho - card_w) / 2)
+            card_y = int((alto - card_h) / 2)
+        else:
+            card_x = 0
+            card_y = 0
+            card_w = ancho
+            card_h = alto
+
+        margin = 16
+
+        # Centro común de la columna izquierda (clan/senda/disciplinas)
+        # Nota: NO usamos cost_size aquí para que al agrandar el icono de coste
+        # no se desplace hacia la derecha toda la columna de símbolos.
+        max_icon_col = max(
+            getattr(self, 'clan_size', 0),
+            getattr(self, 'senda_size', 0),
+            getattr(self, 'discipline_size', 0),
+        )
+        left_col_center_x = card_x + (margin + (max_icon_col / 2.0) if max_icon_col > 0 else margin)
+
+        overlay_rect = self._calcular_recuadro_habilidad(card_x, card_y, card_w, card_h, margin)
+        return {
+            "card": (card_x, card_y, card_w, card_h),
+            "margin": margin,
+            "left_col_center_x": left_col_center_x,
+            "title_height": _metricas(self.title_font).height(),
+            "overlay_rect": overlay_rect,
+            "overlay_bottom": overlay_rect.bottom() if overlay_rect is not None else None,
+        }
+
+    def _calcular_recuadro_habilidad(self, card_x, card_y, card_w, card_h, margin):
+        """Rectángulo del recuadro de habilidades, o None si no hay texto."""
+        if not getattr(self, 'ability_text', "").strip():
+            return None
+        illustrator_text_str = getattr(self, 'illustrator_text', "").strip()
+
+        # Configuración del recuadro de habilidades: tamaño y posición
+        layout_mode = getattr(self, 'ability_layout_mode', 'default')
+
+        if layout_mode == 'cripta':
+            # En cripta queremos un recuadro algo más pequeño y más bajo
+            # para dejar más aire al resto de elementos.
+            overlay_height = max(60, int(card_h * 0.22))
+            overlay_height = min(overlay_height, max(60, card_h - margin * 3))
+        else:
+            overlay_height = max(80, int(card_h * 0.28))
+            overlay_height = min(overlay_height, max(80, card_h - margin * 3))
+
+        # Reservar espacio para el texto del ilustrador debajo del recuadro.
+        # En cripta lo reservamos siempre (haya texto o no) para que la
+        # posición vertical del cuadro de habilidades no cambie.
+        extra_for_illustrator = 0
+        ill_font = self.illustrator_font if self.illustrator_font is not None else self.ability_font
+        if layout_mode == 'cripta' or illustrator_text_str:
+            fm_ill = _metricas(ill_font)
+            extra_for_illustrator = fm_ill.height() + 4
+
+        if layout_mode == 'cripta':
+            # Bajar ligeramente el recuadro en cripta para que quede
+            # algo más cerca del borde inferior.
+            offset = margin * 0.5
+            overlay_y = card_y + card_h - margin - overlay_height - extra_for_illustrator + offset
+        else:
+            overlay_y = card_y + card_h - margin - overlay_height - extra_for_illustrator
+
+        # Dejar una columna libre a la izquierda para coste/disciplinas.
+        # En cripta ampliamos un poco más esa columna para que haya
+        # más aire entre los iconos de disciplina y el cuadro de texto.
+        icon_col = max(getattr(self, 'discipline_size', 0), getattr(self, 'cost_size', 0))
+        extra_icon_space = 0
+        if layout_mode == 'cripta':
+            # En cripta dejamos una separación clara respecto a la columna
+            # de disciplinas/coste: usamos todo el ancho de icon_col más
+            # un pequeño extra para que el fondo no toque los iconos.
+            base_icon_offset = icon_col
+            extra_icon_space = int(icon_col * 0.5)
+            left_free = card_x + margin + base_icon_offset + extra_icon_space + 2
+        else:
+            # En librería queremos ganar algo de ancho de texto, así que
+            # reducimos la reserva horizontal para la columna de iconos.
+            base_icon_offset = int(icon_col * 0.6)
+            left_free = card_x + margin + base_icon_offset + extra_icon_space + 2
+        return QRectF(left_free, overlay_y, card_x + card_w - margin - left_free, overlay_height)
+
+    def clave_geometria(self, capa, geo):
+        """Parte de la geometría de la que depende cada capa.
+
+        Si cambia (p. ej. el recuadro de habilidades crece al aparecer el
+        ilustrador) la capa se repinta aunque nadie la haya marcado sucia.
+        """
+        if capa == "simbolos":
+            return (geo["card"], geo["left_col_center_x"], geo["title_height"], geo["overlay_bottom"])
+        if capa == "habilidad":
+            overlay = geo["overlay_rect"]
+            return (geo["card"], overlay.getRect() if overlay is not None else None)
+        if capa == "coste":
+            return (geo["card"], geo["left_col_center_x"])
+        return (geo["card"],)
+
+    def pintar_capa(self, capa, painter, geo, dpr=1.0):
+        """Pinta una capa; devuelve False si la capa no tiene nada que dibujar.
+
+        `dpr` es la densidad de píxeles del destino respecto a las
+        coordenadas lógicas, para rasterizar los iconos sin ampliarlos.
+        """
+        t = perfil_pintado.inicio()
+        dibujado = getattr(self, f"_pintar_capa_{capa}")(painter, geo, dpr)
+        perfil_pintado.fin(f"capa_{capa}", t)
+        return dibujado
+
+    def transformar(self, painter, geo, destino):
+        """Lleva el rectángulo de carta de `geo` al rectángulo `destino` del painter.
+
+        Devuelve el factor de escala aplicado (la proporción se mantiene, así
+        que basta con uno).
+        """
+        card_x, card_y, card_w, card_h = geo["card"]
+        escala = destino.width() / card_w if card_w > 0 else 1.0
+        painter.translate(destino.left(), destino.top())
+        painter.scale(escala, escala)
+        painter.translate(-card_x, -card_y)
+        return escala
+
+    def pintar(self, painter, destino, dpr=1.0):
+        """Pinta la carta completa ocupando el rectángulo `destino` del painter.
+
+        `dpr` es la densidad de píxeles del dispositivo; los iconos y el
+        texto se rasterizan ya a la escala final.
+        """
+        geo = self.calcular_geometria()
+        painter.save()
+        escala = self.transformar(painter, geo, destino)
+        for capa in self.CAPAS:
+            self.pintar_capa(capa, painter, geo, dpr * escala)
+        painter.restore()
+        return geo
+
+    def renderizar(self, ancho, alto, dpi=None):
+        """Renderiza la carta en una QImage nueva de ancho x alto píxeles.
+
+        La carta se maqueta en el espacio de referencia y se rasteriza
+        directamente a ese tamaño; `dpi` sólo fija los metadatos de
+        resolución de la imagen.
+        """
+        image = imagen_lienzo(ancho, alto)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        self.pintar(painter, QRectF(0, 0, ancho, alto))
+        painter.end()
+        if dpi:
+            dots_per_meter = int(dpi / 0.0254)
+            image.setDotsPerMeterX(dots_per_meter)
+            image.setDotsPerMeterY(dots_per_meter)
+        return image
+
+    def _pintar_capa_arte(self, painter, geo, dpr):
+        if not self.pixmap:
+            return False
+        card_x, card_y, card_w, card_h = geo["card"]
+        # Dibujar desde la ilustración original a resolución completa
+        painter.save()
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        destino = QRectF(card_x, card_y, card_w, card_h)
+        if isinstance(self.pixmap, QImage):
+            painter.drawImage(destino, self.pixmap, QRectF(self.pixmap.rect()))
+        else:
+            painter.drawPixmap(destino, self.pixmap, QRectF(self.pixmap.rect()))
+        painter.restore()
+        return True
+
+    def _pintar_capa_titulo(self, painter, geo, dpr):
+        if not self.title:
+            return False
+        card_x, card_y, card_w, card_h = geo["card"]
+        margin = geo["margin"]
+        painter.save()
+        painter.setFont(self.title_font)
+        color = QColor(self.title_color) if isinstance(self.title_color, str) else self.title_color
+        painter.setPen(color)
+        
+        # Calcular posición del título dentro del rectángulo de la carta
+        title_rect = QRectF(
+            card_x + margin,
+            card_y + margin,
+            max(1, card_w - 2 * margin),
+            40,
+        )
+        if self.title_alignment == "izquierda":
+            alignment_flags = Qt.AlignLeft | Qt.AlignTop
+        else:  # centro por defecto
+            alignment_flags = Qt.AlignCenter | Qt.AlignTop
+        painter.drawText(title_rect, alignment_flags, self.title)
+        painter.restore()
+        return True
+
+    def _pintar_capa_simbolos(self, painter, geo, dpr):
+        """Clan/tipo, segundo tipo, senda y columna de disciplinas."""
+        card_x, card_y, card_w, card_h = geo["card"]
+        margin = geo["margin"]
+        left_col_center_x = geo["left_col_center_x"]
+        dibujado = False
+
+        t = perfil_pintado.inicio()
+        # Dibujar símbolo del clan (o tipo en Librería) debajo del nombre
+        clan_nativo = cache_iconos_global.tamano_nativo(self.clan_svg_path) if self.clan_svg_path and indice_recursos_global.existe(self.clan_svg_path) else None
+        if clan_nativo:
+            # Calcular posición Y del símbolo (debajo del título)
+            title_height = geo["title_height"]
+            clan_y = card_y + margin + title_height + 8  # 8 píxeles de separación
+            
+            # Calcular posición X según la alineación configurada
+            if self.clan_alignment == "derecha":
+                clan_x = card_x + card_w - margin - self.clan_size
+            elif self.clan_alignment == "centro":
+                clan_x = card_x + (card_w - self.clan_size) // 2
+            else:  # "izquierda" por defecto: centrar en la columna izquierda
+                clan_x = left_col_center_x - (self.clan_size / 2.0)
+
+            # Reborde blanco fino (sólo contorno) si la bandera está activada
+            clan_estilo = ESTILO_CONTORNO if getattr(self, 'clan_draw_border', False) else None
+            clan_grosor = max(1, int(self.clan_size * 0.04))
+            clan_rect = QRectF(clan_x, clan_y, self.clan_size, self.clan_size)
+            dibujado |= cache_iconos_global.dibujar(painter, self.clan_svg_path, clan_rect, clan_estilo, clan_grosor, dpr)
+
+            # Dibujar segundo símbolo si existe (para tipos de librería con dos tipos)
+            if self.clan2_svg_path and indice_recursos_global.existe(self.clan2_svg_path):
+                # Separación entre símbolos
+                spacing = 4
+
+                # Si clan2_stack es True, dibujar el segundo símbolo debajo del primero
+                if getattr(self, 'clan2_stack', False):
+                    clan2_x = clan_x
+                    clan2_y = clan_y + self.clan_size + spacing
+                else:
+                    # Comportamiento por defecto: lado a lado
+                    clan2_x = clan_x + self.clan_size + spacing
+                    clan2_y = clan_y
+
+                clan2_rect = QRectF(clan2_x, clan2_y, self.clan_size, self.clan_size)
+                dibujado |= cache_iconos_global.dibujar(painter, self.clan2_svg_path, clan2_rect, clan_estilo, clan_grosor, dpr)
+
+        t = perfil_pintado.fin("clan", t)
+        # Dibujar senda si existe (se dibuja incluso si no hay clan)
+        senda_nativo = None
+        if getattr(self, 'senda_svg_path', None) and indice_recursos_global.existe(self.senda_svg_path):
+            senda_nativo = cache_iconos_global.tamano_nativo(self.senda_svg_path)
+        if senda_nativo:
+            title_height = geo["title_height"]
+            base_y = card_y + margin + title_height + 8
+
+            # Determinar la Y inferior según si hay clan/clan2 dibujados
+            bottom_y = base_y
+            if self.clan_svg_path and indice_recursos_global.existe(self.clan_svg_path):
+                bottom_y += self.clan_size
+            # Si existe clan2 y está apilado, añadir espacio adicional
+            spacing = 6
+            if self.clan2_svg_path and indice_recursos_global.existe(self.clan2_svg_path) and getattr(self, 'clan2_stack', False):
+                bottom_y += self.clan_size + spacing
+
+            senda_y = bottom_y + spacing
+
+            # Mantener la proporción original del SVG al escalar,
+            # usando self.senda_size como tamaño máximo (lado mayor)
+            svg_w, svg_h = senda_nativo
+            scale = min(self.senda_size / svg_w, self.senda_size / svg_h)
+            target_w = svg_w * scale
+            target_h = svg_h * scale
+
+            # Ajustar X según alineación usando el ancho real objetivo
+            if self.senda_alignment == 'derecha':
+                senda_x = card_x + card_w - margin - target_w
+            else:
+                # izquierda por defecto: centrar en la columna izquierda
+                senda_x = left_col_center_x - (target_w / 2.0)
+
+            # Reborde (fondo blanco de 1 px alrededor) y senda respetando su proporción
+            senda_estilo = ESTILO_RELLENO if getattr(self, 'senda_draw_border', False) else None
+            senda_rect = QRectF(senda_x, senda_y, target_w, target_h)
+            dibujado |= cache_iconos_global.dibujar(painter, self.senda_svg_path, senda_rect, senda_estilo, 1, dpr)
+
+        t = perfil_pintado.fin("senda", t)
+        # Dibujar disciplinas (columna de iconos en el borde izquierdo)
+        if getattr(self, 'disciplines', None):
+            # Filtrar entradas con ruta válida existente
+            valid_items = [d for d in self.disciplines if d.get("svg_path") and indice_recursos_global.existe(d["svg_path"])]
+            # Espaciado vertical entre iconos (mismo para todas las disciplinas)
+            base_size = max(8, self.discipline_size)
+            spacing = max(6, int(base_size * 0.35))
+
+            # Preparar lista de iconos con sus tamaños reales ya calculados
+            prepared = []
+            for item in valid_items:
+                path = item["svg_path"]
+                nativo = cache_iconos_global.tamano_nativo(path)
+                if nativo is None:
+                    continue
+
+                # Determinar si esta disciplina es "Superior" según su nombre
+                nombre_disc = str(item.get("nombre", ""))
+                lower_name = nombre_disc.lower()
+                es_superior = lower_name.startswith("superior ") or lower_name.endswith(" superior")
+
+                # Hacer que las disciplinas superiores sean más grandes
+                # que las inferiores.
+                native_w, native_h = nativo
+                icon_size = base_size * (1.3 if es_superior else 1.0)
+                scale = min(icon_size / native_w, icon_size / native_h)
+
+                prepared.append({
+                    "path": path,
+                    "es_superior": es_superior,
+                    "target_w": native_w * scale,
+                    "target_h": native_h * scale,
+                })
+
+            if prepared:
+                # Altura total de la columna: suma de alturas reales + huecos iguales
+                total_h = sum(p["target_h"] for p in prepared) + spacing * (len(prepared) - 1)
+
+                mode = getattr(self, 'discipline_anchor_mode', 'centro')
+                if mode == 'inferior':
+                    # En cripta, anclar la columna al borde inferior del cuadro
+                    # de texto de habilidades (si existe); en caso contrario,
+                    # usar el borde inferior de la carta.
+                    bottom_limit = card_y + card_h - margin
+                    if getattr(self, 'ability_layout_mode', 'default') == 'cripta':
+                        overlay_bottom = geo["overlay_bottom"]
+                        if overlay_bottom is not None:
+                            bottom_limit = overlay_bottom
+
+                    start_y = max(card_y + margin, bottom_limit - total_h)
+                else:
+                    # Centrar aproximadamente la columna en la altura disponible
+                    start_y = max(card_y + margin, (card_y + card_h - total_h) / 2.0)
+
+                # Opcionalmente halo/borde blanco (igual estilo que tipos/clan).
+                # Para disciplinas superiores, usamos borde en forma de rombo
+                # para diferenciarlas visualmente. Grosor proporcional al
+                # tamaño del icono, como en clan/tipo.
+                draw_border = getattr(self, 'discipline_draw_border', False)
+                border_width = max(1, int(base_size * 0.04))
+
+                y = start_y
+                for data in prepared:
+                    target_w = data["target_w"]
+                    target_h = data["target_h"]
+
+                    # Centrar cada icono en la misma columna vertical
+                    x = left_col_center_x - (target_w / 2.0)
+
+                    if draw_border:
+                        estilo = ESTILO_ROMBO if data["es_superior"] else ESTILO_CONTORNO
+                    else:
+                        estilo = None
+                    d_rect = QRectF(x, y, target_w, target_h)
+                    dibujado |= cache_iconos_global.dibujar(painter, data["path"], d_rect, estilo, border_width, dpr)
+
+                    # Avanzar Y para el siguiente icono manteniendo siempre
+                    # la misma distancia entre bordes inferiores y superiores.
+                    y += target_h + spacing
+        perfil_pintado.fin("disciplinas", t)
+
+        return dibujado
+
+    def _pintar_capa_habilidad(self, painter, geo, dpr):
+        """Recuadro de habilidades, grupo de cripta y texto del ilustrador."""
+        overlay_rect = geo["overlay_rect"]
+        if overlay_rect is None:
+            return False
+        layout_mode = getattr(self, 'ability_layout_mode', 'default')
+        illustrator_text_str = getattr(self, 'illustrator_text', "").strip()
+        ill_font = self.illustrator_font if self.illustrator_font is not None else self.ability_font
+
+        # Dibujar, si existe, el número de grupo de cripta justo encima del
+        # cuadro de texto, pequeñito y alineado a la izquierda de dicho cuadro.
+        t = perfil_pintado.inicio()
+        group_value = getattr(self, 'crypt_group', None)
+        if group_value:
+            painter.save()
+            group_font = self.crypt_group_font if self.crypt_group_font is not None else self.ability_font
+            painter.setFont(group_font)
+            group_color = self.crypt_group_color if not isinstance(self.crypt_group_color, str) else QColor(self.crypt_group_color)
+            painter.setPen(group_color)
+
+            fm_group = _metricas(group_font)
+            text = str(group_value)
+            text_w = fm_group.horizontalAdvance(text)
+            text_h = fm_group.height()
+
+            # Pequeño margen desde la izquierda del cuadro de texto
+            # (lo movemos un poco más a la derecha junto con el cuadro).
+            margin_x = 6
+            # Colocar el número justo por encima del recuadro
+            group_rect = QRectF(
+                overlay_rect.left() + margin_x,
+                overlay_rect.top() - text_h - 2,
+                text_w,
+                text_h,
+            )
+            painter.drawText(group_rect, Qt.AlignLeft | Qt.AlignBottom, text)
+            painter.restore()
+
+        perfil_pintado.fin("grupo_cripta", t)
+
+        # Fondo semitransparente
+        bg_opacity = getattr(self, 'ability_bg_opacity', 128)
+        bg_opacity = max(0, min(255, int(bg_opacity)))
+        painter.save()
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(0, 0, 0, bg_opacity))
+        painter.drawRoundedRect(overlay_rect, 6, 6)
+
+        # Preparar texto con soporte básico de **negrita** y [Disciplina]
+        # Altura del icono de disciplina ~ altura de la fuente de habilidades
+        fm = _metricas(self.ability_font)
+        icon_h = max(8, fm.height() - 2)
+
+        # El documento maquetado sale de la caché de texto: sólo se vuelve
+        # a maquetar si cambia el texto, la fuente, el color o el ancho;
+        # la escala del destino sólo cambia la resolución de los iconos.
+        t = perfil_pintado.inicio()
+        doc = cache_texto_global.documento(
+            self.ability_text,
+            self.ability_font,
+            self.ability_color,
+            overlay_rect.width() - 16,
+            layout_mode,
+            icon_h,
+            obtener_archivo_disciplina_texto,
+            dpr,
+            dispositivo_referencia(),
+        )
+        perfil_pintado.fin("maquetacion_texto", t)
+
+        # Dibujar el texto dentro del recuadro con padding; en cripta
+        # centramos verticalmente calculando el alto real del contenido.
+        avail_h = overlay_rect.height() - 16
+        content_h = doc.size().height()
+        if layout_mode == 'cripta':
+            extra_top = max(0.0, (avail_h - content_h) / 2.0)
+        else:
+            extra_top = 0.0
+
+        painter.translate(
+            overlay_rect.left() + 8,
+            overlay_rect.top() + 8 + extra_top,
+        )
+        clip_rect = QRectF(0, 0, overlay_rect.width() - 16, avail_h)
+        painter.setClipRect(clip_rect)
+        # Los iconos en línea están rasterizados a una escala redondeada;
+        # si no coincide con la del destino hay que reducirlos suavizando
+        if escala_rasterizado(dpr) != dpr:
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        t = perfil_pintado.inicio()
+        doc.drawContents(painter, clip_rect)
+        perfil_pintado.fin("dibujo_texto", t)
+        painter.restore()
+
+        # Texto de ilustrador bajo el recuadro de habilidades
+        t = perfil_pintado.inicio()
+        if illustrator_text_str:
+            painter.save()
+            painter.setFont(ill_font)
+            ill_color = self.illustrator_color if isinstance(self.illustrator_color, str) else QColor(self.illustrator_color).name()
+            painter.setPen(QColor(ill_color) if isinstance(ill_color, str) else ill_color)
+
+            fm_ill = _metricas(ill_font)
+            ill_h = fm_ill.height()
+            ill_rect = QRectF(
+                overlay_rect.left(),
+                overlay_rect.bottom() + 2,
+                overlay_rect.width(),
+                ill_h + 2,
+            )
+            painter.drawText(ill_rect, Qt.AlignHCenter | Qt.AlignTop, illustrator_text_str)
+            painter.restore()
+        perfil_pintado.fin("ilustrador", t)
+
+        return True
+
+    def _pintar_capa_coste(self, painter, geo, dpr):
+        card_x, card_y, card_w, card_h = geo["card"]
+        margin = geo["margin"]
+        left_col_center_x = geo["left_col_center_x"]
+
+        # Coste (se dibuja en la esquina inferior izquierda/derecha según configuración)
+        cost_nativo = None
+        if getattr(self, 'cost_svg_path', None) and indice_recursos_global.existe(self.cost_svg_path):
+            cost_nativo = cache_iconos_global.tamano_nativo(self.cost_svg_path)
+        if not cost_nativo:
+            return False
+
+        native_w, native_h = cost_nativo
+        scale = min(self.cost_size / native_w, self.cost_size / native_h)
+        target_w = native_w * scale
+        target_h = native_h * scale
+
+        # Posición horizontal: izquierda (columna de iconos) o derecha
+        if getattr(self, 'cost_alignment', 'izquierda') == 'derecha':
+            # Esquina inferior derecha de la carta
+            cost_x = card_x + card_w - margin - target_w
+        else:
+            # Esquina inferior izquierda, centrado en la columna de iconos
+            cost_x = left_col_center_x - (target_w / 2.0)
+        # Elevar ligeramente el icono para que no quede pegado al borde inferior
+        extra_offset = max(4, int(target_h * 0.25))
+        cost_y = max(card_y + margin, card_y + card_h - margin - target_h - extra_offset)
+
+        # Independientemente del valor (1..6 o X), dibujar siempre un único icono
+        cost_estilo = ESTILO_RELLENO if getattr(self, 'cost_draw_border', False) else None
+        cost_rect = QRectF(cost_x, cost_y, target_w, target_h)
+        cache_iconos_global.dibujar(painter, self.cost_svg_path, cost_rect, cost_estilo, 1, dpr)
+        return True
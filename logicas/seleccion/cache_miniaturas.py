@@ -0,0 +1,95 @@
+"""Caché en disco de miniaturas para el explorador de ilustraciones.
+
+Cada miniatura se guarda en $XDG_CACHE_HOME/vtesproxi/miniaturas con un
+nombre que incluye el hash de la ruta, el mtime y el tamaño del archivo
+original: si el archivo cambia, el nombre deja de coincidir y la miniatura
+se regenera (y se borra la antigua).
+
+Las miniaturas se decodifican con QImageReader.setScaledSize, así que
+generar una a partir de un escaneo JPEG grande no carga la imagen completa.
+Todo el módulo usa QImage, por lo que puede ejecutarse fuera del hilo de
+la interfaz.
+"""
+import glob
+import hashlib
+import os
+import tempfile
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QImageReader
+
+
+# Lado mayor de las miniaturas, en píxeles
+LADO_MINIATURA = 160
+
+
+def directorio_cache_por_defecto():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "vtesproxi", "miniaturas")
+
+
+class CacheMiniaturas:
+    """Miniaturas en disco invalidadas por mtime y tamaño del original."""
+
+    def __init__(self, directorio=None, lado=LADO_MINIATURA):
+        self.directorio = directorio or directorio_cache_por_defecto()
+        self.lado = lado
+
+    def _prefijo(self, ruta):
+        h = hashlib.sha1(os.path.abspath(ruta).encode("utf-8")).hexdigest()
+        return os.path.join(self.directorio, h[:2], h)
+
+    def _ruta(self, ruta, st):
+        return f"{self._prefijo(ruta)}_{st.st_mtime_ns}_{st.st_size}_{self.lado}.png"
+
+    def obtener(self, ruta):
+        """Devuelve la miniatura (QImage) de `ruta`, generándola si hace falta.
+
+        Devuelve una QImage nula si el archivo no es una imagen legible.
+        """
+        try:
+            st = os.stat(ruta)
+        except OSError:
+            return QImage()
+        en_cache = self._ruta(ruta, st)
+        if os.path.exists(en_cache):
+            imagen = QImage(en_cache)
+            if not imagen.isNull():
+                return imagen
+
+        imagen = self.generar(ruta)
+        if not imagen.isNull():
+            self._guardar(ruta, en_cache, imagen)
+        return imagen
+
+    def generar(self, ruta):
+        reader = QImageReader(ruta)
+        tamano = reader.size()
+        if tamano.isValid() and max(tamano.width(), tamano.height()) > self.lado:
+            reader.setScaledSize(tamano.scaled(self.lado, self.lado, Qt.KeepAspectRatio))
+        imagen = reader.read()
+        if not imagen.isNull() and max(imagen.width(), imagen.height()) > self.lado:
+            # Formatos cuyo lector no sabe escalar al decodificar
+            imagen = imagen.scaled(self.lado, self.lado, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        return imagen
+
+    def _guardar(self, ruta, en_cache, imagen):
+        try:
+            os.makedirs(os.path.dirname(en_cache), exist_ok=True)
+            # Borrar miniaturas de versiones anteriores del mismo archivo
+            for antigua in glob.glob(glob.escape(self._prefijo(ruta)) + "_*.png"):
+                if antigua != en_cache:
+                    os.remove(antigua)
+            # Escritura atómica: otro hilo nunca lee un archivo a medias
+            fd, temporal = tempfile.mkstemp(dir=os.path.dirname(en_cache), suffix=".tmp")
+            os.close(fd)
+            if imagen.save(temporal, "PNG"):
+                os.replace(temporal, en_cache)
+            else:
+                os.remove(temporal)
+        except OSError:
+            pass
+
+
+# Instancia global compartida por todos los exploradores
+cache_miniaturas_global = CacheMiniaturas()
@@ -1,20 +1,36 @@
-from logicas.seleccion.selector_archivo import seleccionar_imagen_tkinter
-from PyQt5.QtGui import QPixmap
-from PyQt5.QtWidgets import QDialog, QVBoxLayout
+from logicas.seleccion.selector_archivo import seleccionar_imagen
+from PyQt5.QtWidgets import QApplication, QDialog, QVBoxLayout
 from logicas.recorte.image_crop_view import ImageCropView
+from logicas.recorte.recorte import leer_vista_previa, limitar_resolucion
+from logicas.exportador.variantes import tamano_maximo_arte
+from configuracion import almacen_configuracion
 from logicas.recorte.constantes import VTES_CARD_ASPECT_RATIO
 
-def importar_imagen(parent, label_widget, on_pixmap_ready):
+def _lado_maximo_vista_previa(parent):
+    """Lado mayor de la pantalla en píxeles físicos (tope para la vista previa)."""
+    screen = parent.screen() if parent is not None and hasattr(parent, "screen") else None
+    if screen is None:
+        screen = QApplication.primaryScreen()
+    if screen is None:
+        return 2048
+    size = screen.size()
+    return int(max(size.width(), size.height()) * screen.devicePixelRatio())
+
+def importar_imagen(parent, label_widget, on_pixmap_ready, ruta=None):
     """
-    Flujo completo: selector de archivo (tkinter), recorte (ImageCropView), callback con QPixmap recortado.
+    Flujo completo: explorador de ilustraciones, recorte (ImageCropView), callback con QPixmap recortado.
     parent: QWidget padre (para el QDialog)
     label_widget: QLabel destino (para aspect ratio)
     on_pixmap_ready: función callback(QPixmap)
+    ruta: imagen ya elegida (p. ej. pasada por línea de comandos); sin ella se abre el explorador
     """
-    selected_file = seleccionar_imagen_tkinter()
+    selected_file = ruta or seleccionar_imagen(parent)
     if not selected_file:
         return
-    pixmap = QPixmap(selected_file)
+    # Los escaneos pueden tener 6000-9000 px: el diálogo sólo necesita una
+    # vista previa a resolución de pantalla. El recorte confirmado se
+    # decodifica después a resolución completa (ver ImageCropView).
+    pixmap, tamano_original = leer_vista_previa(selected_file, _lado_maximo_vista_previa(parent))
     # Usar SIEMPRE la proporción oficial de carta VTES (63x88mm)
     # para que el recorte resultante tenga exactamente esa relación.
     aspect_ratio = VTES_CARD_ASPECT_RATIO
@@ -23,10 +39,16 @@ def importar_imagen(parent, label_widget, on_pixmap_ready):
     dialog.setWindowTitle("Recortar imagen")
     dialog.setModal(True)
     dialog_layout = QVBoxLayout(dialog)
-    image_crop_view = ImageCropView(pixmap, aspect_ratio=aspect_ratio)
+    image_crop_view = ImageCropView(
+        pixmap, aspect_ratio=aspect_ratio, ruta=selected_file, tamano_original=tamano_original
+    )
     dialog_layout.addWidget(image_crop_view)
     def on_crop_confirmed(cropped):
         dialog.accept()
-        on_pixmap_ready(cropped)
+        # La carta conserva la ilustración toda la sesión: guardarla sólo
+        # a la mayor resolución de exportación ahorra memoria y abarata
+        # cada reescalado posterior.
+        ancho_maximo, alto_maximo = tamano_maximo_arte(almacen_configuracion().datos())
+        on_pixmap_ready(limitar_resolucion(cropped, ancho_maximo, alto_maximo))
     image_crop_view.cropConfirmed.connect(on_crop_confirmed)
     dialog.exec_()
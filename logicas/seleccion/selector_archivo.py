@@ -1,16 +1,188 @@
-import tkinter as tk
-from tkinter import filedialog
+"""Explorador de ilustraciones integrado en la aplicación.
 
-def seleccionar_imagen_tkinter():
+Sustituye al diálogo de tkinter, que arrancaba y destruía un intérprete Tk
+completo dentro de la aplicación Qt en cada importación. Muestra la
+carpeta como una cuadrícula de miniaturas (QListView); las miniaturas se
+generan en hilos de trabajo y se guardan en `cache_miniaturas_global`, así
+que una carpeta ya visitada se muestra al instante.
+"""
+import os
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QSize, Qt, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QIcon, QImage, QPixmap, QStandardItem, QStandardItemModel
+from PyQt5.QtWidgets import (
+    QDialog, QDialogButtonBox, QFileDialog, QHBoxLayout, QLineEdit, QListView, QPushButton, QVBoxLayout
+)
+
+from logicas.seleccion.cache_miniaturas import cache_miniaturas_global
+
+
+EXTENSIONES_IMAGEN = (".png", ".jpg", ".jpeg", ".bmp")
+
+# Hilos que generan miniaturas a la vez
+HILOS_MINIATURAS = 2
+
+RUTA_ROLE = Qt.UserRole + 1
+
+
+def listar_imagenes(carpeta):
+    """Rutas de las imágenes de la carpeta, ordenadas por nombre."""
+    try:
+        entradas = list(os.scandir(carpeta))
+    except OSError:
+        return []
+    rutas = [
+        e.path for e in entradas
+        if e.is_file() and os.path.splitext(e.name)[1].lower() in EXTENSIONES_IMAGEN
+    ]
+    return sorted(rutas, key=lambda r: os.path.basename(r).lower())
+
+
+class _SenalesMiniatura(QObject):
+    lista = pyqtSignal(int, str, QImage)  # generación, ruta, miniatura
+
+
+class _TrabajoMiniatura(QRunnable):
+    def __init__(self, generacion, ruta, senales, cancelado):
+        super().__init__()
+        self.generacion = generacion
+        self.ruta = ruta
+        self.senales = senales
+        self.cancelado = cancelado
+
+    def run(self):
+        if self.cancelado.is_set():
+            return
+        imagen = cache_miniaturas_global.obtener(self.ruta)
+        if not self.cancelado.is_set():
+            self.senales.lista.emit(self.generacion, self.ruta, imagen)
+
+
+class ExploradorArte(QDialog):
+    """Diálogo con la cuadrícula de ilustraciones de una carpeta."""
+
+    def __init__(self, carpeta=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Seleccionar imagen")
+        self.resize(820, 600)
+        self._ruta_seleccionada = None
+        self._items = {}
+        # Cada carpeta abierta es una "generación"; las miniaturas que
+        # lleguen de una carpeta anterior se descartan
+        self._generacion = 0
+        self._cancelado = threading.Event()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(HILOS_MINIATURAS)
+        self._senales = _SenalesMiniatura(self)
+        self._senales.lista.connect(self._miniatura_lista)
+
+        lado = cache_miniaturas_global.lado
+        vacia = QPixmap(lado, lado)
+        vacia.fill(Qt.transparent)
+        self._icono_vacio = QIcon(vacia)
+
+        self.carpeta_edit = QLineEdit()
+        self.carpeta_edit.setReadOnly(True)
+        btn_carpeta = QPushButton("Carpeta...")
+        btn_carpeta.clicked.connect(self.elegir_carpeta)
+        carpeta_layout = QHBoxLayout()
+        carpeta_layout.addWidget(self.carpeta_edit, stretch=1)
+        carpeta_layout.addWidget(btn_carpeta)
+
+        self.modelo = QStandardItemModel(self)
+        self.vista = QListView()
+        self.vista.setViewMode(QListView.IconMode)
+        self.vista.setIconSize(QSize(lado, lado))
+        self.vista.setGridSize(QSize(lado + 24, lado + 40))
+        self.vista.setResizeMode(QListView.Adjust)
+        self.vista.setMovement(QListView.Static)
+        self.vista.setUniformItemSizes(True)
+        self.vista.setWordWrap(True)
+        self.vista.setModel(self.modelo)
+        self.vista.doubleClicked.connect(lambda _index: self.accept())
+
+        botones = QDialogButtonBox(QDialogButtonBox.Open | QDialogButtonBox.Cancel)
+        botones.accepted.connect(self.accept)
+        botones.rejected.connect(self.reject)
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(carpeta_layout)
+        layout.addWidget(self.vista, stretch=1)
+        layout.addWidget(botones)
+
+        self.abrir_carpeta(carpeta or os.getcwd())
+
+    def elegir_carpeta(self):
+        carpeta = QFileDialog.getExistingDirectory(
+            self, "Carpeta de ilustraciones", self.carpeta_edit.text(), QFileDialog.DontUseNativeDialog
+        )
+        if carpeta:
+            self.abrir_carpeta(carpeta)
+
+    def abrir_carpeta(self, carpeta):
+        """Muestra las imágenes de `carpeta` y encola la carga de sus miniaturas."""
+        self._detener_trabajos()
+        self._generacion += 1
+        self.carpeta_edit.setText(carpeta)
+        self.modelo.clear()
+        self._items = {}
+        for ruta in listar_imagenes(carpeta):
+            item = QStandardItem(self._icono_vacio, os.path.basename(ruta))
+            item.setData(ruta, RUTA_ROLE)
+            item.setToolTip(ruta)
+            item.setEditable(False)
+            self.modelo.appendRow(item)
+            self._items[ruta] = item
+            self._pool.start(_TrabajoMiniatura(self._generacion, ruta, self._senales, self._cancelado))
+        if self.modelo.rowCount():
+            self.vista.setCurrentIndex(self.modelo.index(0, 0))
+
+    def _miniatura_lista(self, generacion, ruta, imagen):
+        if generacion != self._generacion or imagen.isNull():
+            return
+        item = self._items.get(ruta)
+        if item is not None:
+            item.setIcon(QIcon(QPixmap.fromImage(imagen)))
+
+    def _detener_trabajos(self):
+        # Descartar lo pendiente y esperar sólo a las miniaturas en curso
+        self._cancelado.set()
+        self._pool.clear()
+        self._pool.waitForDone()
+        self._cancelado = threading.Event()
+
+    def carpeta(self):
+        return self.carpeta_edit.text()
+
+    def ruta_seleccionada(self):
+        return self._ruta_seleccionada
+
+    def accept(self):
+        index = self.vista.currentIndex()
+        if not index.isValid():
+            return
+        self._ruta_seleccionada = index.data(RUTA_ROLE)
+        super().accept()
+
+    def done(self, resultado):
+        self._detener_trabajos()
+        super().done(resultado)
+
+
+def seleccionar_imagen(parent=None):
     """
-    Abre un diálogo de selección de archivos usando tkinter y devuelve la ruta seleccionada o None.
+    Abre el explorador de ilustraciones y devuelve la ruta seleccionada o None.
+    Recuerda la última carpeta usada en la configuración.
     """
-    root = tk.Tk()
-    root.withdraw()  # Oculta la ventana principal
-    root.attributes('-topmost', True)  # Asegura que el diálogo esté al frente
-    file_path = filedialog.askopenfilename(
-        filetypes=[('Imágenes', '*.png *.jpg *.jpeg *.bmp')],
-        title='Seleccionar imagen'
-    )
-    root.destroy()
-    return file_path if file_path else None
+    from configuracion import almacen_configuracion
+
+    almacen = almacen_configuracion()
+    carpeta = almacen.obtener("explorador_arte.carpeta")
+    if not carpeta or not os.path.isdir(carpeta):
+        carpeta = os.getcwd()
+    dialogo = ExploradorArte(carpeta, parent)
+    aceptado = dialogo.exec_() == QDialog.Accepted
+    if dialogo.carpeta() != carpeta:
+        almacen.establecer("explorador_arte.carpeta", dialogo.carpeta())
+    return dialogo.ruta_seleccionada() if aceptado else None
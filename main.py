@@ -1,11 +1,44 @@
 #!/usr/bin/env python3
+import multiprocessing
 import sys
-from carta_app import CartaApp
-from PyQt5.QtWidgets import QApplication
 
 
 def main():
+    # Necesario para el pool de procesos de `render` en ejecutables PyInstaller
+    multiprocessing.freeze_support()
+    if len(sys.argv) > 1 and sys.argv[1] == "render":
+        # Renderizado de mazos sin interfaz: main.py render mazo.json ...
+        from logicas.exportador.lote import main_render
+        sys.exit(main_render(sys.argv[2:]))
+
+    # Perfil de arranque opcional (VTESPROXI_PERFIL_ARRANQUE=1 o --perfil-arranque)
+    from logicas.diagnostico.arranque import activar_si_se_pide, perfil_arranque
+    sys.argv = activar_si_se_pide(sys.argv)
+
+    # Si ya hay una ventana abierta, pasarle los argumentos y terminar
+    # (--nueva-instancia arranca un proceso independiente)
+    # instancia_unica importa PyQt5.QtCore y QtNetwork
+    with perfil_arranque.tramo("pyqt_importado"):
+        from logicas.instancia.instancia_unica import (
+            OPCION_NUEVA_INSTANCIA, ServidorInstancia, enviar_a_instancia, preparar_argumentos
+        )
+    nueva_instancia = OPCION_NUEVA_INSTANCIA in sys.argv
+    sys.argv = [a for a in sys.argv if a != OPCION_NUEVA_INSTANCIA]
+    if not nueva_instancia:
+        with perfil_arranque.tramo("instancia_unica"):
+            reenviado = enviar_a_instancia(sys.argv[1:])
+        if reenviado:
+            perfil_arranque.marca("reenviado_a_instancia")
+            sys.exit(0)
+
+    from PyQt5.QtWidgets import QApplication
+    perfil_arranque.marca("qtwidgets_importado")
+    from carta_app import CartaApp
+    perfil_arranque.marca("carta_app_importado")
+
     app = QApplication(sys.argv)
+    perfil_arranque.marca("qapplication_creada")
+    perfil_arranque.vigilar_primer_pintado(app)
     # Tema oscuro
     dark_stylesheet = """
         QWidget {
@@ -30,7 +63,23 @@ def main():
     """
     app.setStyleSheet(dark_stylesheet)
     window = CartaApp()
+    perfil_arranque.marca("ventana_construida")
     window.show()
+    perfil_arranque.marca("ventana_mostrada")
+    if not nueva_instancia:
+        from PyQt5.QtCore import Qt
+        servidor = ServidorInstancia(parent=window)
+        # En diferido: abrir una imagen muestra un diálogo modal
+        servidor.peticion.connect(window.abrir_argumentos, Qt.QueuedConnection)
+        servidor.escuchar()
+        app.aboutToQuit.connect(servidor.cerrar)
+    argumentos = preparar_argumentos(sys.argv[1:])
+    if argumentos:
+        from PyQt5.QtCore import QTimer
+        QTimer.singleShot(0, lambda: window.abrir_argumentos(argumentos))
+    # Registrar en el log los bloqueos de la interfaz (VTESPROXI_VIGILANTE_MS=0 lo desactiva)
+    from logicas.diagnostico.vigilante import vigilante_interfaz
+    vigilante_interfaz.iniciar(app)
     sys.exit(app.exec_())
 
 
@@ -1,7 +1,12 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+import os
+import sys
 from pathlib import Path
 
+sys.path.insert(0, os.path.abspath('.'))
+from logicas.render.indice_recursos import generar_manifiesto
+
 
 def _collect_tree(src_dir: str, prefix: str):
     """Devuelve una lista de tuplas (src, dest) para Analysis.datas."""
@@ -24,6 +29,10 @@ datas = (
     + _collect_tree('fonts', 'fonts')
 )
 
+# Índice de iconos precalculado: el ejecutable no recorre resources/ al arrancar
+os.makedirs('build', exist_ok=True)
+datas.append((generar_manifiesto('resources', os.path.join('build', 'indice_recursos.json')), 'resources'))
+
 
 a = Analysis(
     ['main.py'],
@@ -0,0 +1,246 @@
+"""Regresión visual del renderizado de cartas, sin pantalla.
+
+Renderiza las cartas de regresion_visual/cartas.json (formato de
+`main.py render`, con un "id" y los modos a "comprobar") y compara cada
+imagen con su referencia de regresion_visual/referencias/<id>_<modo>.png.
+Los modos son:
+
+    vista    el preview: CartaImageWidget.paintEvent a 358x500 (grab)
+    online   CartaImageWidget.export_png a tamaño online
+    300dpi   CartaImageWidget.export_png a 300 DPI
+
+Las cartas sin "arte" se pintan sin ilustración (no hay ningún archivo con
+su nombre en la raíz del proyecto, que es la carpeta de arte).
+
+Un píxel cuenta como distinto si alguno de sus canales (RGBA) difiere en
+más de --umbral-canal; una imagen falla si los píxeles distintos superan
+--max-fraccion del total (el suavizado de bordes puede variar un poco,
+un icono movido o un texto que corta distinto no). Por cada fallo se
+escriben en --salida (por defecto regresion_visual/resultados/) la imagen
+actual, la referencia y una imagen de diferencias con los píxeles
+distintos en rojo sobre la referencia oscurecida.
+
+    python regresion_visual/comprobar.py [--filtro TEXTO] [--actualizar]
+
+--actualizar reescribe las referencias con lo renderizado (tras un cambio
+visual intencionado; revisa las diferencias antes). Termina con código 1
+si alguna imagen falla o no tiene referencia.
+
+Las referencias se generaron con Qt 5.15 en Linux; el ilustrador usa la
+fuente "Arial" del sistema, así que en otra máquina puede hacer falta
+regenerarlas. Las de "vista" son las del preview anterior a las
+optimizaciones del renderizado (iguales píxel a píxel); las de exportación
+son las del renderizado nativo, que a diferencia del de entonces no pinta
+el fondo del widget ni desplaza la carta una fracción de píxel.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(DIRECTORIO)
+CARTAS = os.path.join(DIRECTORIO, "cartas.json")
+REFERENCIAS = os.path.join(DIRECTORIO, "referencias")
+RESULTADOS = os.path.join(DIRECTORIO, "resultados")
+MODOS = ("vista", "online", "300dpi")
+MODOS_POR_DEFECTO = ("vista", "online")
+TAMANO_VISTA = (358, 500)
+UMBRAL_CANAL = 32
+MAX_FRACCION = 0.0005
+# Imágenes que se escriben en --salida por cada fallo
+SUFIJOS_RESULTADO = ("_actual.png", "_referencia.png", "_diferencias.png")
+
+
+def preparar_entorno():
+    """Qt sin pantalla y configuración por defecto (sin la del usuario)."""
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    # El texto se maqueta a DPI_REFERENCIA, pero Qt ajusta los glifos a los
+    # DPI de la pantalla (la plataforma offscreen dice 100): fijarlos a 96
+    os.environ["QT_FONT_DPI"] = "96"
+    os.environ["XDG_CONFIG_HOME"] = tempfile.mkdtemp(prefix="vtesproxi-regresion-config-")
+    os.environ["VTESPROXI_PERFIL_PINTADO"] = "0"
+    os.chdir(RAIZ)
+    if RAIZ not in sys.path:
+        sys.path.insert(0, RAIZ)
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    from logicas.render.indice_recursos import indice_recursos_global
+    indice_recursos_global.construir()
+    return app
+
+
+def cargar_cartas(filtro=""):
+    with open(CARTAS, "r", encoding="utf-8") as f:
+        cartas = json.load(f)["cartas"]
+    return [c for c in cartas if filtro in c["id"]]
+
+
+def widget_carta(carta, app):
+    """CartaImageWidget visible con la carta montada como en su pestaña."""
+    from PyQt5.QtGui import QPixmap
+    from ventana.cripta_widget import CartaImageWidget
+    from logicas.exportador.lote import construir_renderizador
+
+    renderizador, ruta_arte = construir_renderizador(carta, RAIZ, cargar_arte=False)
+    widget = CartaImageWidget()
+    widget.renderizador = renderizador
+    if ruta_arte:
+        widget.set_pixmap(QPixmap(ruta_arte))
+    widget.resize(*TAMANO_VISTA)
+    widget.show()
+    app.processEvents()
+    return widget
+
+
+def renderizar(widget, modo, directorio):
+    """QImage (ARGB32) de la carta en el modo pedido."""
+    from PyQt5.QtGui import QImage
+    from logicas.exportador.variantes import VARIANTES
+
+    if modo == "vista":
+        imagen = widget.grab().toImage()
+    else:
+        ancho, alto, dpi, _sufijo = VARIANTES[modo]
+        ruta = os.path.join(directorio, f"{modo}.png")
+        if not widget.export_png(ruta, ancho, alto, dpi, usar_cache=False):
+            raise RuntimeError(f"export_png no pudo escribir {ruta}")
+        imagen = QImage(ruta)
+    return imagen.convertToFormat(QImage.Format_ARGB32)
+
+
+def limpiar_resultados(directorio):
+    """Borra las imágenes de una comprobación anterior (sólo las de esta herramienta)."""
+    if not os.path.isdir(directorio):
+        return
+    for nombre in os.listdir(directorio):
+        ruta = os.path.join(directorio, nombre)
+        if nombre.endswith(SUFIJOS_RESULTADO) and os.path.isfile(ruta):
+            os.remove(ruta)
+
+
+def _filas(imagen):
+    """Bytes de cada fila de píxeles (sin el relleno de fin de línea)."""
+    ancho_bytes = imagen.width() * 4
+    por_linea = imagen.bytesPerLine()
+    datos = imagen.constBits().asstring(imagen.sizeInBytes())
+    return [datos[y * por_linea:y * por_linea + ancho_bytes] for y in range(imagen.height())]
+
+
+def comparar(referencia, actual, umbral_canal=UMBRAL_CANAL):
+    """Compara dos QImage ARGB32 del mismo tamaño.
+
+    Devuelve (píxeles distintos, diferencia máxima de canal, [(x, y)]).
+    Las filas idénticas se descartan de una vez; sólo las distintas se
+    recorren píxel a píxel.
+    """
+    distintos = []
+    delta_maximo = 0
+    for y, (fila_ref, fila_act) in enumerate(zip(_filas(referencia), _filas(actual))):
+        if fila_ref == fila_act:
+            continue
+        for i in range(0, len(fila_ref), 4):
+            delta = max(
+                abs(fila_ref[i] - fila_act[i]),
+                abs(fila_ref[i + 1] - fila_act[i + 1]),
+                abs(fila_ref[i + 2] - fila_act[i + 2]),
+                abs(fila_ref[i + 3] - fila_act[i + 3]),
+            )
+            if delta > delta_maximo:
+                delta_maximo = delta
+            if delta > umbral_canal:
+                distintos.append((i // 4, y))
+    return len(distintos), delta_maximo, distintos
+
+
+def imagen_diferencias(referencia, distintos):
+    """La referencia oscurecida con los píxeles distintos en rojo."""
+    from PyQt5.QtGui import QColor, QImage, QPainter
+
+    diferencias = QImage(referencia.size(), QImage.Format_ARGB32)
+    diferencias.fill(QColor(0, 0, 0))
+    painter = QPainter(diferencias)
+    painter.drawImage(0, 0, referencia)
+    painter.fillRect(diferencias.rect(), QColor(0, 0, 0, 190))
+    painter.end()
+    rojo = QColor(255, 0, 0).rgba()
+    for x, y in distintos:
+        diferencias.setPixel(x, y, rojo)
+    return diferencias
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regresión visual del renderizado de cartas.")
+    parser.add_argument("--filtro", default="", help="sólo las cartas cuyo id contenga este texto")
+    parser.add_argument("--actualizar", action="store_true", help="reescribe las referencias")
+    parser.add_argument("--salida", default=RESULTADOS)
+    parser.add_argument("--umbral-canal", type=int, default=UMBRAL_CANAL)
+    parser.add_argument("--max-fraccion", type=float, default=MAX_FRACCION)
+    args = parser.parse_args(argv)
+
+    app = preparar_entorno()
+    from PyQt5.QtGui import QImage
+
+    fallos = []
+    comprobadas = 0
+    if not args.actualizar:
+        limpiar_resultados(args.salida)
+    with tempfile.TemporaryDirectory(prefix="vtesproxi-regresion-") as directorio:
+        for carta in cargar_cartas(args.filtro):
+            widget = widget_carta(carta, app)
+            for modo in carta.get("comprobar", MODOS_POR_DEFECTO):
+                if modo not in MODOS:
+                    raise ValueError(f"{carta['id']}: modo desconocido {modo!r}")
+                nombre = f"{carta['id']}_{modo}"
+                ruta_referencia = os.path.join(REFERENCIAS, nombre + ".png")
+                actual = renderizar(widget, modo, directorio)
+                comprobadas += 1
+
+                if args.actualizar:
+                    os.makedirs(REFERENCIAS, exist_ok=True)
+                    actual.save(ruta_referencia)
+                    print(f"[regresion] {nombre}: referencia actualizada")
+                    continue
+                if not os.path.exists(ruta_referencia):
+                    print(f"[regresion] {nombre}: FALTA la referencia (usa --actualizar)")
+                    fallos.append(nombre)
+                    continue
+
+                referencia = QImage(ruta_referencia).convertToFormat(QImage.Format_ARGB32)
+                if referencia.size() != actual.size():
+                    print(f"[regresion] {nombre}: FALLO, tamaño {actual.width()}x{actual.height()} "
+                          f"en lugar de {referencia.width()}x{referencia.height()}")
+                    distintos = []
+                    fallo = True
+                else:
+                    n, delta_maximo, distintos = comparar(referencia, actual, args.umbral_canal)
+                    fraccion = n / float(actual.width() * actual.height())
+                    fallo = fraccion > args.max_fraccion
+                    estado = "FALLO" if fallo else "ok"
+                    print(f"[regresion] {nombre}: {estado} ({n} píxeles distintos, "
+                          f"{fraccion:.4%}, diferencia máxima {delta_maximo})")
+                if fallo:
+                    fallos.append(nombre)
+                    os.makedirs(args.salida, exist_ok=True)
+                    actual.save(os.path.join(args.salida, nombre + "_actual.png"))
+                    referencia.save(os.path.join(args.salida, nombre + "_referencia.png"))
+                    if distintos:
+                        imagen_diferencias(referencia, distintos).save(
+                            os.path.join(args.salida, nombre + "_diferencias.png"))
+            widget.close()
+            widget.deleteLater()
+
+    if args.actualizar:
+        print(f"[regresion] {comprobadas} referencias escritas en {REFERENCIAS}")
+        return 0
+    if fallos:
+        print(f"[regresion] {len(fallos)} de {comprobadas} imágenes fallan; diferencias en {args.salida}")
+        return 1
+    print(f"[regresion] OK: {comprobadas} imágenes iguales a su referencia")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,61 +1,29 @@
 import json
-import os
-import sys
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QPushButton, QColorDialog, QComboBox, QSlider
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QPushButton, QColorDialog, QComboBox, QSlider, QCheckBox
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont, QColor
-
-from configuracion import load_config_data, save_config_data
-
-def get_resource_path(relative_path):
-    if hasattr(sys, '_MEIPASS'):
-        base_path = sys._MEIPASS
-    else:
-        base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    return os.path.join(base_path, relative_path)
-
-FONTS_DIR = get_resource_path("fonts")
-
-def _deep_merge_dicts(defaults: dict, overrides: dict) -> dict:
-    merged = dict(defaults)
-    for key, value in (overrides or {}).items():
-        if isinstance(value, dict) and isinstance(merged.get(key), dict):
-            merged[key] = _deep_merge_dicts(merged[key], value)
-        else:
-            merged[key] = value
-    return merged
-
-def cargar_config():
-    defaults = {
-        "nombre_carta": {
-            "fuente": "fonts/MatrixExtraBold.otf",
-            "tamano": 18,
-            "color": "#ffffff",
-            "alineacion": "centro"
-        },
-        "texto_habilidad": {
-            "fuente": "fonts/Gill Sans.otf",
-            "tamano": 12,
-            "color": "#ffffff",
-            "opacidad_fondo": 50
-        }
-    }
-
-    data = load_config_data({})
-    return _deep_merge_dicts(defaults, data)
 
-def guardar_config(data):
-    save_config_data(data)
+from configuracion import almacen_configuracion, cargar_config
+from logicas.render.fuentes import registro_fuentes_global
+
+# Valores que se usan si faltan en config_data.json
+CONFIG_POR_DEFECTO = {
+    "nombre_carta": {
+        "fuente": "fonts/MatrixExtraBold.otf",
+        "tamano": 18,
+        "color": "#ffffff",
+        "alineacion": "centro"
+    },
+    "texto_habilidad": {
+        "fuente": "fonts/Gill Sans.otf",
+        "tamano": 12,
+        "color": "#ffffff",
+        "opacidad_fondo": 50
+    }
+}
 
 def obtener_fuentes_disponibles():
     """Obtiene la lista de fuentes disponibles en la carpeta fonts/"""
-    fuentes = []
-    if os.path.exists(FONTS_DIR):
-        for archivo in os.listdir(FONTS_DIR):
-            if archivo.endswith(('.otf', '.ttf', '.ttc')):
-                nombre_display = os.path.splitext(archivo)[0]
-                fuentes.append((nombre_display, archivo))  # Solo el nombre del archivo
-    return fuentes
+    return registro_fuentes_global.disponibles()
 
 class ConfiguracionWidget(QWidget):
     def __init__(self, carta_title_label=None, cripta_widget=None, libreria_widget=None):
@@ -71,7 +39,7 @@ class ConfiguracionWidget(QWidget):
         self.main_layout.addLayout(self.col1_layout)
         self.main_layout.addLayout(self.col2_layout)
         self.main_layout.addLayout(self.col3_layout)
-        self.config = cargar_config()
+        self.config = cargar_config(CONFIG_POR_DEFECTO)
         
         # Fuente
         self.col1_layout.addWidget(QLabel("Fuente del nombre:"))
@@ -257,312 +225,115 @@ class ConfiguracionWidget(QWidget):
         self.discipline_size_spin.setValue(simbolo_disciplina_config.get("tamano", 24))
         self.discipline_size_spin.valueChanged.connect(self.cambiar_tamano_disciplina)
         self.col3_layout.addWidget(self.discipline_size_spin)
+
+        self.col3_layout.addWidget(QLabel(""))  # Espacio
+        self.col3_layout.addWidget(QLabel("=== Exportación ==="))
+
+        # Tamaños que se escriben además del de 300 DPI al pulsar "Guardar"
+        from logicas.exportador.variantes import variantes_configuradas
+        variantes_actuales = variantes_configuradas(self.config)
+        self.export_checks = {}
+        for variante, texto in (
+            ("online", "Online (358x500)"),
+            ("miniatura", "Miniatura (179x250)"),
+            ("600dpi", "600 DPI (1488x2076)"),
+        ):
+            check = QCheckBox(texto)
+            check.setChecked(variante in variantes_actuales)
+            check.toggled.connect(self.cambiar_variantes_exportacion)
+            self.col3_layout.addWidget(check)
+            self.export_checks[variante] = check
+
+        # Resolución a la que se guarda la ilustración tras recortarla
+        from logicas.exportador.variantes import dpi_maximo_arte
+        self.col3_layout.addWidget(QLabel("Resolución máxima de la ilustración (DPI):"))
+        self.art_dpi_spin = QSpinBox()
+        self.art_dpi_spin.setRange(150, 1200)
+        self.art_dpi_spin.setSingleStep(50)
+        self.art_dpi_spin.setValue(dpi_maximo_arte(self.config))
+        self.art_dpi_spin.valueChanged.connect(self.cambiar_dpi_maximo_arte)
+        self.col3_layout.addWidget(self.art_dpi_spin)
         self.col3_layout.addStretch()
 
         self.setLayout(self.main_layout)
 
+    def _establecer(self, clave, valor):
+        """Guarda una clave; las pestañas se actualizan con la señal del almacén."""
+        almacen_configuracion().establecer(clave, valor)
+
     def cambiar_fuente(self, index):
         fuente_archivo = self.font_combo.itemData(index)
         if fuente_archivo:
-            self.config["nombre_carta"]["fuente"] = fuente_archivo
-            guardar_config(self.config)
-            self.actualizar_cripta_widget()
+            self._establecer("nombre_carta.fuente", fuente_archivo)
 
     def cambiar_tamano(self, value):
-        self.config["nombre_carta"]["tamano"] = value
-        guardar_config(self.config)
-        self.actualizar_cripta_widget()
+        self._establecer("nombre_carta.tamano", value)
 
     def cambiar_color(self):
         color = QColorDialog.getColor()
         if color.isValid():
             color_hex = color.name()
-            self.config["nombre_carta"]["color"] = color_hex
-            guardar_config(self.config)
             self.color_btn.setStyleSheet(f"background: {color_hex}; color: black;")
-            self.actualizar_cripta_widget()
+            self._establecer("nombre_carta.color", color_hex)
 
     def cambiar_alineacion(self, index):
         alineacion = self.alignment_combo.itemData(index)
         if alineacion:
-            self.config["nombre_carta"]["alineacion"] = alineacion
-            guardar_config(self.config)
-            self.actualizar_cripta_widget()
+            self._establecer("nombre_carta.alineacion", alineacion)
 
     def cambiar_fuente_habilidad(self, index):
         fuente_archivo = self.ability_font_combo.itemData(index)
         if fuente_archivo:
-            if "texto_habilidad" not in self.config:
-                self.config["texto_habilidad"] = {}
-            self.config["texto_habilidad"]["fuente"] = fuente_archivo
-            guardar_config(self.config)
-            self.actualizar_cripta_widget()
+            self._establecer("texto_habilidad.fuente", fuente_archivo)
 
     def cambiar_tamano_habilidad(self, value):
-        if "texto_habilidad" not in self.config:
-            self.config["texto_habilidad"] = {}
-        self.config["texto_habilidad"]["tamano"] = value
-        guardar_config(self.config)
-        self.actualizar_cripta_widget()
+        self._establecer("texto_habilidad.tamano", value)
 
     def cambiar_color_habilidad(self):
         color = QColorDialog.getColor()
         if color.isValid():
             color_hex = color.name()
-            if "texto_habilidad" not in self.config:
-                self.config["texto_habilidad"] = {}
-            self.config["texto_habilidad"]["color"] = color_hex
-            guardar_config(self.config)
             self.ability_color_btn.setStyleSheet(f"background: {color_hex}; color: black;")
-            self.actualizar_cripta_widget()
+            self._establecer("texto_habilidad.color", color_hex)
 
     def cambiar_opacidad_habilidad(self, value):
-        if "texto_habilidad" not in self.config:
-            self.config["texto_habilidad"] = {}
-        self.config["texto_habilidad"]["opacidad_fondo"] = int(value)
-        guardar_config(self.config)
-        self.actualizar_cripta_widget()
-    
+        self._establecer("texto_habilidad.opacidad_fondo", int(value))
+
     def cambiar_tamano_clan(self, value):
-        if "simbolo_clan" not in self.config:
-            self.config["simbolo_clan"] = {}
-        self.config["simbolo_clan"]["tamano"] = value
-        guardar_config(self.config)
-        self.actualizar_cripta_widget()
-    
+        self._establecer("simbolo_clan.tamano", value)
+
     def cambiar_alineacion_clan(self, index):
         alineacion = self.clan_alignment_combo.itemData(index)
         if alineacion:
-            if "simbolo_clan" not in self.config:
-                self.config["simbolo_clan"] = {}
-            self.config["simbolo_clan"]["alineacion"] = alineacion
-            guardar_config(self.config)
-            self.actualizar_cripta_widget()
-    
+            self._establecer("simbolo_clan.alineacion", alineacion)
+
     def cambiar_tamano_libreria(self, value):
-        if "simbolo_libreria" not in self.config:
-            self.config["simbolo_libreria"] = {}
-        self.config["simbolo_libreria"]["tamano"] = value
-        guardar_config(self.config)
-        self.actualizar_cripta_widget()
-    
+        self._establecer("simbolo_libreria.tamano", value)
+
     def cambiar_alineacion_libreria(self, index):
         alineacion = self.libreria_alignment_combo.itemData(index)
         if alineacion:
-            if "simbolo_libreria" not in self.config:
-                self.config["simbolo_libreria"] = {}
-            self.config["simbolo_libreria"]["alineacion"] = alineacion
-            guardar_config(self.config)
-            self.actualizar_cripta_widget()
+            self._establecer("simbolo_libreria.alineacion", alineacion)
 
     def cambiar_tamano_coste(self, value):
-        if "simbolo_coste" not in self.config:
-            self.config["simbolo_coste"] = {}
-        self.config["simbolo_coste"]["tamano"] = value
-        guardar_config(self.config)
-        # actualizar libreria directamente
-        if self.libreria_widget and hasattr(self.libreria_widget, 'actualizar_configuracion'):
-            self.libreria_widget.actualizar_configuracion()
-        # y también la cripta (mismo tamaño de coste)
-        self.actualizar_cripta_widget()
+        # Compartido por librería y cripta
+        self._establecer("simbolo_coste.tamano", value)
 
     def cambiar_tamano_disciplina(self, value):
-        if "simbolo_disciplina" not in self.config:
-            self.config["simbolo_disciplina"] = {}
-        self.config["simbolo_disciplina"]["tamano"] = value
-        guardar_config(self.config)
-        # actualizar libreria directamente
-        if self.libreria_widget and hasattr(self.libreria_widget, 'actualizar_configuracion'):
-            self.libreria_widget.actualizar_configuracion()
-        # y también la cripta (mismo tamaño de disciplinas)
-        self.actualizar_cripta_widget()
+        # Compartido por librería y cripta
+        self._establecer("simbolo_disciplina.tamano", value)
+
+    def cambiar_variantes_exportacion(self, _checked=None):
+        variantes = ["300dpi"] + [v for v, check in self.export_checks.items() if check.isChecked()]
+        self._establecer("exportacion.variantes", variantes)
+
+    def cambiar_dpi_maximo_arte(self, value):
+        self._establecer("exportacion.dpi_maximo_arte", value)
 
     def cambiar_tamano_senda(self, value):
-        if "simbolo_senda" not in self.config:
-            self.config["simbolo_senda"] = {}
-        self.config["simbolo_senda"]["tamano"] = value
-        guardar_config(self.config)
-        self.actualizar_cripta_widget()
+        self._establecer("simbolo_senda.tamano", value)
 
     def cambiar_alineacion_senda(self, index):
         alineacion = self.senda_alignment_combo.itemData(index)
         if alineacion:
-            if "simbolo_senda" not in self.config:
-                self.config["simbolo_senda"] = {}
-            self.config["simbolo_senda"]["alineacion"] = alineacion
-            guardar_config(self.config)
-            self.actualizar_cripta_widget()
-
-    def actualizar_cripta_widget(self):
-        """Actualiza el widget de cripta con la nueva configuración"""
-        if self.cripta_widget:
-            config = cargar_config()
-            nombre_config = config["nombre_carta"]
-            from PyQt5.QtGui import QFontDatabase
-            fuente_archivo = nombre_config["fuente"]
-            font_path = os.path.join(FONTS_DIR, fuente_archivo)
-            font_id = QFontDatabase.addApplicationFont(font_path)
-            if font_id != -1:
-                font_families = QFontDatabase.applicationFontFamilies(font_id)
-                if font_families:
-                    font = QFont(font_families[0], nombre_config["tamano"])
-                else:
-                    font = QFont(fuente_archivo, nombre_config["tamano"])
-            else:
-                font = QFont(fuente_archivo, nombre_config["tamano"])
-            self.cripta_widget.cripta_title_font = font
-            self.cripta_widget.cripta_title_color = nombre_config["color"]
-            self.cripta_widget.cripta_card_widget.title_alignment = nombre_config.get("alineacion", "centro")
-            # Actualizar tamaño y alineación del símbolo de clan
-            simbolo_config = config.get("simbolo_clan", {})
-            clan_size = simbolo_config.get("tamano", 40)
-            clan_alignment = simbolo_config.get("alineacion", "izquierda")
-            self.cripta_widget.cripta_card_widget.clan_size = clan_size
-            self.cripta_widget.cripta_card_widget.clan_alignment = clan_alignment
-            # Actualizar tamaño y alineación del símbolo de senda
-            simbolo_senda_config = config.get("simbolo_senda", {})
-            senda_size = simbolo_senda_config.get("tamano", 24)
-            senda_alignment = simbolo_senda_config.get("alineacion", "izquierda")
-            self.cripta_widget.cripta_card_widget.senda_size = senda_size
-            self.cripta_widget.cripta_card_widget.senda_alignment = senda_alignment
-            # Actualizar tamaño de iconos de disciplina también en cripta
-            simbolo_disciplina_config = config.get("simbolo_disciplina", {})
-            discipline_size = simbolo_disciplina_config.get("tamano", 24)
-            self.cripta_widget.cripta_card_widget.discipline_size = discipline_size
-            # Actualizar tamaño de coste también en cripta
-            simbolo_coste_config = config.get("simbolo_coste", {})
-            cost_size = simbolo_coste_config.get("tamano", 40)
-            self.cripta_widget.cripta_card_widget.cost_size = cost_size
-            
-            # Actualizar el título si hay texto
-            texto_actual = self.cripta_widget.cripta_card_widget.title
-            if texto_actual:
-                self.cripta_widget.cripta_card_widget.set_title(
-                    texto_actual, 
-                    font=font, 
-                    color=nombre_config["color"],
-                    alignment=nombre_config.get("alineacion", "centro")
-                )
-            
-            # Actualizar el símbolo del clan si hay uno seleccionado
-            if hasattr(self.cripta_widget, 'cripta_clan_combo'):
-                clan_actual = self.cripta_widget.cripta_clan_combo.currentText()
-                if clan_actual:
-                    self.cripta_widget.cripta_card_widget.set_clan(
-                        clan_actual, 
-                        size=clan_size,
-                        alignment=clan_alignment
-                    )
-
-            # Actualizar configuración de texto de habilidades en Cripta
-            texto_hab_config = config.get("texto_habilidad", {})
-            hab_font_path = texto_hab_config.get("fuente", "fonts/Gill Sans.otf")
-            if not os.path.isabs(hab_font_path):
-                hab_font_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), hab_font_path)
-            hab_size = texto_hab_config.get("tamano", 12)
-            hab_color = texto_hab_config.get("color", "#ffffff")
-            hab_opacidad_pct = texto_hab_config.get("opacidad_fondo", 50)
-            try:
-                hab_opacidad_pct = int(hab_opacidad_pct)
-            except Exception:
-                hab_opacidad_pct = 50
-            hab_opacidad_pct = max(0, min(100, hab_opacidad_pct))
-            hab_opacidad = int(hab_opacidad_pct * 2.55)
-
-            from PyQt5.QtGui import QFontDatabase
-            hab_font_id = QFontDatabase.addApplicationFont(hab_font_path)
-            if hab_font_id != -1:
-                hab_families = QFontDatabase.applicationFontFamilies(hab_font_id)
-                if hab_families:
-                    hab_font = QFont(hab_families[0], hab_size)
-                else:
-                    hab_font = QFont(hab_font_path, hab_size)
-            else:
-                hab_font = QFont(hab_font_path, hab_size)
-
-            self.cripta_widget.cripta_ability_font = hab_font
-            self.cripta_widget.cripta_ability_color = hab_color
-            self.cripta_widget.cripta_ability_bg_opacity = hab_opacidad
-            self.cripta_widget.cripta_card_widget.ability_font = hab_font
-            self.cripta_widget.cripta_card_widget.ability_color = hab_color
-            self.cripta_widget.cripta_card_widget.ability_bg_opacity = hab_opacidad
-
-            # Reaplicar texto de habilidades actual si existe
-            if hasattr(self.cripta_widget, 'cripta_ability_edit'):
-                texto_hab_actual = self.cripta_widget.cripta_ability_edit.toPlainText()
-                self.cripta_widget.cripta_card_widget.set_ability_text(
-                    texto_hab_actual,
-                    font=hab_font,
-                    color=hab_color,
-                    bg_opacity=hab_opacidad,
-                )
-        
-        # Actualizar también el widget de librería
-        if self.libreria_widget and hasattr(self.libreria_widget, 'actualizar_configuracion'):
-            self.libreria_widget.actualizar_configuracion()
-        
-        # Actualizar tamaño y alineación del símbolo de librería
-        if self.libreria_widget:
-            simbolo_libreria_config = config.get("simbolo_libreria", {})
-            libreria_size = simbolo_libreria_config.get("tamano", 40)
-            libreria_alignment = simbolo_libreria_config.get("alineacion", "izquierda")
-            self.libreria_widget.libreria_card_widget.clan_size = libreria_size
-            self.libreria_widget.libreria_card_widget.clan_alignment = libreria_alignment
-            
-            # Actualizar el símbolo del tipo si hay uno seleccionado
-            if hasattr(self.libreria_widget, 'libreria_type_combo'):
-                tipo_actual = self.libreria_widget.libreria_type_combo.currentText()
-                if tipo_actual and tipo_actual != "Ninguno":
-                    # Importar aquí para evitar importación circular
-                    try:
-                        from ventana.libreria_widget import obtener_archivo_tipo_libreria
-                        tipo_svg_path = obtener_archivo_tipo_libreria(tipo_actual)
-                        if tipo_svg_path:
-                            self.libreria_widget.libreria_card_widget.clan = tipo_actual
-                            self.libreria_widget.libreria_card_widget.clan_svg_path = tipo_svg_path
-                            self.libreria_widget.libreria_card_widget.update()
-                    except ImportError:
-                        pass  # Si no se puede importar, simplemente no actualizar
-
-            # Actualizar configuración de texto de habilidades en Librería
-            texto_hab_config = config.get("texto_habilidad", {})
-            hab_font_path = texto_hab_config.get("fuente", "fonts/Gill Sans.otf")
-            if not os.path.isabs(hab_font_path):
-                hab_font_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), hab_font_path)
-            hab_size = texto_hab_config.get("tamano", 12)
-            hab_color = texto_hab_config.get("color", "#ffffff")
-            hab_opacidad_pct = texto_hab_config.get("opacidad_fondo", 50)
-            try:
-                hab_opacidad_pct = int(hab_opacidad_pct)
-            except Exception:
-                hab_opacidad_pct = 50
-            hab_opacidad_pct = max(0, min(100, hab_opacidad_pct))
-            hab_opacidad = int(hab_opacidad_pct * 2.55)
-
-            from PyQt5.QtGui import QFontDatabase
-            hab_font_id = QFontDatabase.addApplicationFont(hab_font_path)
-            if hab_font_id != -1:
-                hab_families = QFontDatabase.applicationFontFamilies(hab_font_id)
-                if hab_families:
-                    hab_font = QFont(hab_families[0], hab_size)
-                else:
-                    hab_font = QFont(hab_font_path, hab_size)
-            else:
-                hab_font = QFont(hab_font_path, hab_size)
-
-            self.libreria_widget.libreria_ability_font = hab_font
-            self.libreria_widget.libreria_ability_color = hab_color
-            self.libreria_widget.libreria_ability_bg_opacity = hab_opacidad
-            self.libreria_widget.libreria_card_widget.ability_font = hab_font
-            self.libreria_widget.libreria_card_widget.ability_color = hab_color
-            self.libreria_widget.libreria_card_widget.ability_bg_opacity = hab_opacidad
-
-            # Reaplicar texto de habilidades actual si existe
-            if hasattr(self.libreria_widget, 'libreria_ability_edit'):
-                texto_hab_actual = self.libreria_widget.libreria_ability_edit.toPlainText()
-                self.libreria_widget.libreria_card_widget.set_ability_text(
-                    texto_hab_actual,
-                    font=hab_font,
-                    color=hab_color,
-                    bg_opacity=hab_opacidad,
-                )
\ No newline at end of file
+            self._establecer("simbolo_senda.alineacion", alineacion)
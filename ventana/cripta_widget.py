@@ -1,15 +1,23 @@
 import os
 import json
-import html
 import sys
+import time
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSizePolicy, QPlainTextEdit, QFileDialog
-from PyQt5.QtCore import Qt, QSize, QRectF, QUrl
-from PyQt5.QtGui import QPixmap, QFont, QPainter, QColor, QFontDatabase, QFontMetrics, QImage
-from PyQt5.QtSvg import QSvgRenderer
+from PyQt5.QtCore import Qt, QSize, QRectF, QTimer
+from PyQt5.QtGui import QPixmap, QFont, QPainter, QImage
 from functools import partial
 
 from resources.listas.clans_list import CLAN_SVG_MAP
 from resources.listas.sendas_list import SENDA_SVG_MAP, SENDAS
+from logicas.render.renderizador import (
+    RenderizadorCarta,
+    CAPAS_POR_ATRIBUTO,
+    imagen_lienzo,
+    obtener_archivo_disciplina_texto,
+)
+from logicas.render.fuentes import registro_fuentes_global
+from logicas.diagnostico.perfil_pintado import perfil_pintado
+from logicas.render.indice_recursos import indice_recursos_global
 from logicas.recorte.constantes import (
     VTES_CARD_ASPECT_RATIO,
     VTES_CARD_WIDTH_300DPI,
@@ -35,16 +43,8 @@ def obtener_archivo_coste_cripta(valor):
     if not valor or str(valor).lower() == "ninguno":
         return None
 
-    base_dir = get_resource_path(os.path.join("resources", "costes"))
-    if not os.path.isdir(base_dir):
-        return None
-
     num = str(valor).strip()
-    candidate = f"cap{num}.gif"
-    ruta = os.path.join(base_dir, candidate)
-    if os.path.exists(ruta):
-        return ruta
-    return None
+    return indice_recursos_global.ruta("costes", f"cap{num}.gif")
 
 
 def obtener_archivo_clan(nombre_clan):
@@ -54,13 +54,7 @@ def obtener_archivo_clan(nombre_clan):
 
     nombre_normalizado = nombre_clan.strip()
     archivo = CLAN_SVG_MAP.get(nombre_normalizado)
-
-    if archivo:
-        base_dir = get_resource_path(os.path.join("resources", "clans"))
-        ruta_completa = os.path.join(base_dir, archivo)
-        if os.path.exists(ruta_completa):
-            return ruta_completa
-    return None
+    return indice_recursos_global.ruta("clanes", archivo)
 
 
 def obtener_archivo_senda(nombre_senda):
@@ -70,154 +64,70 @@ def obtener_archivo_senda(nombre_senda):
 
     nombre_normalizado = nombre_senda.strip()
     archivo = SENDA_SVG_MAP.get(nombre_normalizado)
+    return indice_recursos_global.ruta("sendas", archivo)
 
-    if archivo:
-        base_dir = get_resource_path(os.path.join("resources", "sendas"))
-        ruta_completa = os.path.join(base_dir, archivo)
-        if os.path.exists(ruta_completa):
-            return ruta_completa
-    return None
-
-
-def obtener_archivo_disciplina_texto(nombre_disciplina):
-    """Resuelve el archivo de icono para una disciplina usada en el texto de habilidades.
-
-    Se intenta primero con el nombre completo tal cual aparece entre corchetes
-    (p. ej. "Superior Oblivion") y, si no se encuentra, con la versión
-    sin "Superior" para reutilizar el mismo icono.
-    """
-    if not nombre_disciplina:
-        return None
-
-    base_dir = get_resource_path(os.path.join("resources", "disciplines"))
-    if not os.path.isdir(base_dir):
-        return None
-    nombre_raw = nombre_disciplina.strip()
-    if not nombre_raw:
-        return None
-
-    lower = nombre_raw.lower()
-    es_superior = False
 
-    # Aceptar tanto "Oblivion Superior" como "Superior Oblivion"
-    if lower.startswith("superior "):
-        es_superior = True
-        base = nombre_raw[len("Superior "):].strip()
-    elif lower.endswith(" superior"):
-        es_superior = True
-        base = nombre_raw[:-len(" superior")].strip()
-    else:
-        base = nombre_raw
+def seleccionar_en_combo(combo, texto):
+    """Selecciona `texto` en el combo (sin distinguir mayúsculas) o "Ninguno" si no está."""
+    indice = combo.findText(str(texto).strip(), Qt.MatchFixedString) if texto not in (None, "") else -1
+    if indice < 0:
+        indice = combo.findText("Ninguno")
+    if indice >= 0:
+        combo.setCurrentIndex(indice)
 
-    stem = base.replace(" ", "").lower()
-    if not stem:
-        return None
 
-    if es_superior:
-        fname = f"{stem}sup.svg"
-    else:
-        fname = f"{stem}.svg"
+def seleccionar_en_lista(lista, textos):
+    """Deja seleccionados en la lista sólo los elementos de `textos`, sin emitir señales."""
+    buscados = {str(t).strip().lower() for t in textos or []}
+    lista.blockSignals(True)
+    for i in range(lista.count()):
+        item = lista.item(i)
+        item.setSelected(item.text().lower() in buscados)
+    lista.blockSignals(False)
 
-    ruta_directa = os.path.join(base_dir, fname)
-    if os.path.exists(ruta_directa):
-        return ruta_directa
 
-    # Fallback heurístico: buscar coincidencias dentro de la carpeta
-    try:
-        archivos = os.listdir(base_dir)
-    except OSError:
-        return None
+# Vista previa en borrador mientras se redimensiona la ventana: la última
+# composición de las capas se reescala sin suavizado y, si alguna capa ha
+# cambiado, se pintan a ESCALA_BORRADOR de la resolución. Tras
+# RETARDO_REFINADO_MS sin cambios de tamaño se repinta una vez a calidad
+# completa.
+ESCALA_BORRADOR = 0.5
+RETARDO_REFINADO_MS = 150
 
-    archivos_validos = []
-    for archivo in archivos:
-        ruta = os.path.join(base_dir, archivo)
-        if not os.path.isfile(ruta):
-            continue
-        nombre_sin_ext, ext = os.path.splitext(archivo)
-        ext = ext.lower()
-        if ext not in (".svg", ".png", ".gif", ".jpg", ".jpeg", ".webp"):
-            continue
-        stem_norm = nombre_sin_ext.lower().replace(" ", "").replace("_", "").replace("-", "")
-        archivos_validos.append((stem_norm, ruta))
-
-    cand_norm = stem
-    mejor_match = None
-    for stem_norm, ruta in archivos_validos:
-        if stem_norm == cand_norm:
-            return ruta
-        if stem_norm.startswith(cand_norm) and mejor_match is None:
-            mejor_match = ruta
-
-    return mejor_match
 
 # Widget personalizado para mostrar imagen y texto superpuesto
 class CartaImageWidget(QWidget):
+    # Capas del preview, en orden de composición
+    CAPAS = RenderizadorCarta.CAPAS
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        # Descripción de la carta y su pintado. Los atributos de carta
+        # (title, clan_size, ability_text...) se leen y asignan a través
+        # del widget, pero viven en el renderizador.
+        self.renderizador = RenderizadorCarta()
+        # Caché de capas ya pintadas: cada una compuesta sobre las de debajo
+        # (QImage, o None si no hay nada pintado hasta ella), la clave con
+        # la que se pintó cada una y las capas pendientes
+        self._capas = {}
+        self._capas_claves = {}
+        self._capas_sucias = set(self.CAPAS)
+        # Rectángulo de carta y devicePixelRatio de la última composición
+        self._composicion_destino = None
+        # Modo borrador y temporizador de la pasada a calidad completa
+        self._borrador = False
+        self._temporizador_refinado = QTimer(self)
+        self._temporizador_refinado.setSingleShot(True)
+        self._temporizador_refinado.setInterval(RETARDO_REFINADO_MS)
+        self._temporizador_refinado.timeout.connect(self._refinar)
+        self._ultimo_redimensionado = 0.0
+        self._pintada_al_mostrar = False
         # Proporción de carta VTES/MTG: ancho/alto = 63/88
         self.aspect_ratio = VTES_CARD_ASPECT_RATIO
-        self.pixmap = None
-        self.title = ""
-        self.title_font = QFont()
-        self.title_color = "#ffffff"
-        self.title_alignment = "centro"  # "centro" o "izquierda"
-        self.clan = None  # Nombre del clan
-        self.clan_svg_path = None  # Ruta al SVG del clan
-        self.clan_size = 40  # Tamaño del símbolo del clan en píxeles
-        self.clan_alignment = "izquierda"  # "izquierda", "centro", "derecha"
-        # Segundo símbolo (solo para tipos de librería con dos tipos)
-        self.clan2 = None
-        self.clan2_svg_path = None
-        # Controla si el segundo símbolo se dibuja apilado (debajo) o en línea (lado a lado)
-        self.clan2_stack = False
-        # Controla si se dibuja un reborde blanco detrás del símbolo (por defecto False)
-        # Se activará desde `LibreriaWidget` para mantener Cripta sin recuadro
-        self.clan_draw_border = False
-        # Senda (símbolo que va debajo del clan)
-        self.senda = None
-        self.senda_svg_path = None
-        self.senda_size = 24
-        self.senda_alignment = "izquierda"  # "izquierda" o "derecha"
-        self.senda_draw_border = False
-        # Texto de habilidades (recuadro inferior semitransparente)
-        self.ability_text = ""
-        self.ability_font = QFont()
-        self.ability_color = "#ffffff"
-        # Opacidad del fondo (0-255)
-        self.ability_bg_opacity = 128
-        # Modo de maquetación del texto de habilidades: "default" o "cripta"
-        self.ability_layout_mode = "default"
-        # Disciplinas (columna de iconos en el borde izquierdo)
-        # Lista de elementos de disciplina: cada uno es un dict con claves
-        # {"nombre": str, "svg_path": str}
-        self.disciplines = []
-        self.discipline_size = 24
-        # Halo/borde blanco semitransparente alrededor del icono de disciplina
-        self.discipline_draw_border = False
-        # Modo de anclaje vertical de las disciplinas:
-        #   "centro" (por defecto, usado en librería)
-        #   "inferior" (anclar el primer icono en el tercio inferior y apilar hacia arriba)
-        self.discipline_anchor_mode = "centro"
-        # Ilustrador (texto en la parte inferior, debajo del cuadro de habilidades)
-        self.illustrator_text = ""
-        self.illustrator_font = QFont()
-        self.illustrator_color = "#ffffff"
-        # Grupo de cripta (número pequeño 1-9 sobre el cuadro de texto)
-        self.crypt_group = None
-        self.crypt_group_font = QFont()
-        self.crypt_group_color = "#ffffff"
-        # Coste (usado por Librería y Cripta)
-        self.cost_type = None  # 'blood', 'pool', 'capacity' o None
-        self.cost_svg_path = None
-        self.cost_size = 20
-        self.cost_draw_border = False
-        self.cost_alignment = "izquierda"  # "izquierda" o "derecha"
-        # Valor del coste: '1'..'6' o 'X' o None
-        self.cost_value = None
-
-        # Para depurar tamaños nativos de iconos de coste y evitar
-        # saturar la consola, registramos qué rutas ya hemos informado.
-        self._logged_cost_icon_sizes = set()
+        # Copia de la ilustración escalada para pantalla (la original,
+        # inmutable, es self.pixmap)
+        self._pixmap_escalado = None
+        self._pixmap_escalado_clave = None
 
         # Asegurar que el layout tenga en cuenta heightForWidth
         policy = QSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -230,90 +140,90 @@ class CartaImageWidget(QWidget):
         width=VTES_CARD_WIDTH_300DPI,
         height=VTES_CARD_HEIGHT_300DPI,
         dpi=300,
+        usar_cache=True,
     ):
         """Exporta la carta a un PNG con el tamaño oficial 63x88mm a 300 DPI.
 
-        Usa por defecto 744x1038 píxeles (63x88mm a 300 DPI) y centra la carta
-        dentro de ese lienzo respetando siempre la proporción.
+        Usa por defecto 744x1038 píxeles (63x88mm a 300 DPI). La carta se
+        rasteriza directamente a ese tamaño desde la ilustración original y
+        los iconos vectoriales, sin depender del tamaño del preview. Si la
+        misma carta ya se exportó a ese tamaño, se copia de la caché de
+        renderizado.
         """
         if not filename:
             return False
 
-        image = QImage(width, height, QImage.Format_ARGB32)
-        image.fill(Qt.transparent)
+        from logicas.exportador.cache_render import exportar_carta
+        ok, _desde_cache = exportar_carta(self.renderizador, filename, width, height, dpi, usar_cache)
+        return ok
 
-        # Ajustar metadatos de resolución a ~300 DPI
-        try:
-            dots_per_meter = int(dpi / 0.0254)
-            image.setDotsPerMeterX(dots_per_meter)
-            image.setDotsPerMeterY(dots_per_meter)
-        except Exception:
-            pass
+    def export_variantes(self, filename, variantes=None, usar_cache=True):
+        """Exporta la carta a varios tamaños pintándola una sola vez.
 
-        painter = QPainter(image)
-        painter.setRenderHint(QPainter.Antialiasing)
-
-        # Queremos que el área de carta (la ilustración más todo lo
-        # superpuesto) llene por completo el archivo, sin bordes extra.
-        # Para ello calculamos el rectángulo de carta igual que en
-        # paintEvent y sólo escalamos esa zona al lienzo de salida.
-
-        src_w = float(self.width() or width)
-        src_h = float(self.height() or height)
-        if src_w <= 0 or src_h <= 0:
-            painter.end()
-            return False
-
-        # Rectángulo de carta dentro del widget
-        if self.pixmap and not self.pixmap.isNull():
-            pw = float(self.pixmap.width())
-            ph = float(self.pixmap.height())
-            if pw > 0 and ph > 0:
-                # Mismo criterio que en paintEvent: KeepAspectRatio
-                scale = min(src_w / pw, src_h / ph)
-                card_w = pw * scale
-                card_h = ph * scale
-                card_x = (src_w - card_w) / 2.0
-                card_y = (src_h - card_h) / 2.0
-            else:
-                card_x = 0.0
-                card_y = 0.0
-                card_w = src_w
-                card_h = src_h
-        else:
-            card_x = 0.0
-            card_y = 0.0
-            card_w = src_w
-            card_h = src_h
-
-        if card_w <= 0 or card_h <= 0:
-            painter.end()
-            return False
+        `filename` es la ruta del archivo principal; el resto de variantes
+        se escriben junto a él con su sufijo (_online, _mini, _600dpi).
+        Devuelve una lista de (variante, ruta, ok, desde_cache).
+        """
+        if not filename:
+            return []
 
-        # Factor de escala para llevar exactamente ese rectángulo de carta
-        # al tamaño final (744x1038). Como ambas tienen la misma proporción
-        # 63/88, usamos un único factor.
-        scale_factor = width / card_w
+        from logicas.exportador.variantes import exportar_variantes, VARIANTES_POR_DEFECTO
+        return exportar_variantes(self.renderizador, filename, variantes or VARIANTES_POR_DEFECTO, usar_cache)
 
-        # Trasladar el origen al rectángulo de carta y escalar de forma
-        # que dicho rectángulo ocupe todo el lienzo de salida.
-        painter.translate(-card_x * scale_factor, -card_y * scale_factor)
-        painter.scale(scale_factor, scale_factor)
+    def exportar_en_segundo_plano(self, filename, variantes=None, usar_cache=True):
+        """Como `export_variantes`, pero sin bloquear la interfaz.
 
-        # Renderizar el widget completo; sólo la zona de carta rellenará
-        # el archivo, eliminando los bordes externos.
-        self.render(painter)
+        Encola la exportación de una copia de la carta en el pool de
+        exportaciones y devuelve el TrabajoExportacion (con sus señales de
+        progreso/fin/error y `cancelar()`), o None si no hay archivo.
+        """
+        if not filename:
+            return None
 
-        painter.end()
+        from logicas.exportador.trabajos import gestor_exportaciones
+        from logicas.exportador.variantes import VARIANTES_POR_DEFECTO
+        return gestor_exportaciones().exportar(self.renderizador, filename, variantes or VARIANTES_POR_DEFECTO, usar_cache)
 
-        # Determinar formato de salida según la extensión del archivo
-        ext = os.path.splitext(filename)[1].lower()
-        if ext in (".jpg", ".jpeg"):
-            fmt = "JPEG"
-        else:
-            fmt = "PNG"
+    def __setattr__(self, nombre, valor):
+        capas = CAPAS_POR_ATRIBUTO.get(nombre)
+        if capas is None:
+            super().__setattr__(nombre, valor)
+            return
+        # Atributo de carta: se guarda en el renderizador y sólo se marca
+        # sucia la capa a la que afecta
+        setattr(self.renderizador, nombre, valor)
+        self._capas_sucias.update(capas)
+
+    def __getattr__(self, nombre):
+        # Sólo se llama cuando el widget no tiene el atributo
+        renderizador = self.__dict__.get("renderizador")
+        if renderizador is not None and nombre in CAPAS_POR_ATRIBUTO:
+            return getattr(renderizador, nombre)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{nombre}'")
+
+    def modo_borrador(self):
+        """Pinta en borrador hasta que pasen RETARDO_REFINADO_MS sin cambios."""
+        self._borrador = True
+        self._temporizador_refinado.start()
+
+    def _refinar(self):
+        self._borrador = False
+        self.update()
 
-        return image.save(filename, fmt)
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        # Sólo las ráfagas de cambios de tamaño (arrastrar el borde de la
+        # ventana) pasan a borrador; un cambio suelto (al mostrarse, al
+        # maximizar, al ajustar la proporción) se pinta a calidad completa
+        ahora = time.monotonic()
+        if self._pintada_al_mostrar and ahora - self._ultimo_redimensionado < RETARDO_REFINADO_MS / 1000.0:
+            self.modo_borrador()
+        self._ultimo_redimensionado = ahora
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Hasta el primer pintado completo tras mostrarse no hay borrador
+        self._pintada_al_mostrar = False
 
     def hasHeightForWidth(self):
         # Informar al layout de que usamos heightForWidth para mantener la proporción
@@ -332,8 +242,34 @@ class CartaImageWidget(QWidget):
         return QSize(base_width, h)
         
     def set_pixmap(self, pixmap):
+        """Establece la ilustración original (a resolución completa).
+
+        El pixmap recibido no se modifica nunca: la copia escalada para
+        pantalla vive aparte y se regenera sólo cuando cambia el tamaño.
+        """
         self.pixmap = pixmap
+        self._pixmap_escalado = None
+        self._pixmap_escalado_clave = None
         self.update()
+
+    def _pixmap_escalado_para(self, width, height):
+        """Devuelve la ilustración escalada a (width, height), cacheada por tamaño."""
+        clave = (width, height, self.pixmap.cacheKey())
+        if self._pixmap_escalado is None or self._pixmap_escalado_clave != clave:
+            t = perfil_pintado.inicio()
+            escalado = self.pixmap.scaled(
+                width,
+                height,
+                Qt.KeepAspectRatio,
+                Qt.SmoothTransformation,
+            )
+            perfil_pintado.fin("escalado_arte", t)
+            # El renderizador admite la ilustración como QImage o QPixmap
+            if isinstance(escalado, QImage):
+                escalado = QPixmap.fromImage(escalado)
+            self._pixmap_escalado = escalado
+            self._pixmap_escalado_clave = clave
+        return self._pixmap_escalado
         
     def set_title(self, text, font=None, color=None, alignment=None):
         self.title = text
@@ -440,688 +376,190 @@ class CartaImageWidget(QWidget):
             self.crypt_group_color = color
         self.update()
         
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        # Reiniciar la referencia del borde inferior del cuadro de texto de
-        # habilidades para este repintado
-        self._last_overlay_bottom = None
-        
-        # Dibujar imagen de fondo y calcular el rectángulo exacto de la carta
-        if self.pixmap:
+    def _calcular_geometria(self, borrador=False):
+        """Geometría de la carta (en el espacio de referencia) y su destino en el widget."""
+        geo = self.renderizador.calcular_geometria()
+        if self.pixmap and borrador:
+            # En borrador no se reescala la ilustración: basta su tamaño
+            ajustado = self.pixmap.size().scaled(self.width(), self.height(), Qt.KeepAspectRatio)
+            card_w = ajustado.width()
+            card_h = ajustado.height()
+        elif self.pixmap:
             # Ajustar la imagen completa dentro del widget manteniendo SIEMPRE
             # la proporción (sin recortar), para que se vea entera la
             # ilustración importada.
-            scaled = self.pixmap.scaled(
-                self.width(),
-                self.height(),
-                1,  # Qt.KeepAspectRatio
-                Qt.SmoothTransformation,
-            )
+            scaled = self._pixmap_escalado_para(self.width(), self.height())
             card_w = scaled.width()
             card_h = scaled.height()
-            card_x = int((self.width() - card_w) / 2)
-            card_y = int((self.height() - card_h) / 2)
-            painter.drawPixmap(card_x, card_y, scaled)
         else:
-            card_x = 0
-            card_y = 0
             card_w = self.width()
             card_h = self.height()
+        card_x = int((self.width() - card_w) / 2)
+        card_y = int((self.height() - card_h) / 2)
+        geo["destino"] = QRectF(card_x, card_y, card_w, card_h)
+        return geo
+
+    def _contenido_capa(self, capa, geo):
+        """Parte de la carta de la que depende el pintado de la capa."""
+        if capa == "arte":
+            return self.pixmap.cacheKey() if self.pixmap else None
+        return self.renderizador.clave_geometria(capa, geo)
+
+    def _componer(self, geo, dpr, borrador=False):
+        """Imagen con todas las capas, repintando desde la primera que cambie.
+
+        Cada capa se guarda ya compuesta sobre las de debajo (ilustración
+        incluida) y se pinta encima de ellas, igual que al pintar la carta
+        de una vez: Qt suaviza el texto de otra forma sobre píxeles opacos
+        que sobre una imagen transparente compuesta después, y el título o
+        las habilidades salían más finos sobre la ilustración.
+        """
+        base = None
+        repintar = False
+        for capa in self.CAPAS:
+            clave = (
+                self.width(),
+                self.height(),
+                dpr,
+                geo["destino"].getRect(),
+                self._contenido_capa(capa, geo),
+            )
+            if not repintar and capa not in self._capas_sucias and self._capas_claves.get(capa) == clave:
+                base = self._capas.get(capa)
+                continue
+            # Las capas de encima se pintaron sobre la anterior versión de ésta
+            repintar = True
+            imagen = self._pintar_capa(capa, geo, dpr, base, borrador)
+            # Las capas vacías (sin coste, sin texto...) comparten la imagen de debajo
+            if imagen is not None:
+                base = imagen
+            self._capas[capa] = base
+            self._capas_claves[capa] = clave
+            self._capas_sucias.discard(capa)
+        self._composicion_destino = (self._rect_carta(geo), dpr)
+        return base
+
+    def _pintar_capa(self, capa, geo, dpr, base, borrador):
+        """Copia de `base` con la capa pintada encima, o None si la capa está vacía."""
+        if capa == "arte" and not self.pixmap:
+            return None
+        if base is not None:
+            imagen = base.copy()
+        else:
+            imagen = imagen_lienzo(round(self.width() * dpr), round(self.height() * dpr), max(dpr, 1.0))
+        p = QPainter(imagen)
+        if dpr < 1.0:
+            # QPainter no aplica un devicePixelRatio menor que 1 (borrador)
+            p.scale(dpr, dpr)
+        p.setRenderHint(QPainter.Antialiasing)
+        if capa == "arte":
+            dibujado = self._pintar_arte(p, geo, borrador)
+        else:
+            escala = self.renderizador.transformar(p, geo, geo["destino"])
+            dibujado = self.renderizador.pintar_capa(capa, p, geo, dpr * escala)
+        p.end()
+        return imagen if dibujado else None
+
+    def _pintar_arte(self, painter, geo, borrador):
+        destino = geo["destino"]
+        if borrador:
+            # La última copia escalada (o la original) estirada al nuevo tamaño
+            fuente = self._pixmap_escalado if self._pixmap_escalado is not None else self.pixmap
+            if isinstance(fuente, QImage):
+                painter.drawImage(destino, fuente, QRectF(fuente.rect()))
+            else:
+                painter.drawPixmap(destino, fuente, QRectF(fuente.rect()))
+            return True
+        # La copia escalada de la ilustración ya está cacheada por tamaño
+        t = perfil_pintado.inicio()
+        painter.drawPixmap(int(destino.left()), int(destino.top()), self._pixmap_escalado_para(self.width(), self.height()))
+        perfil_pintado.fin("arte", t)
+        return True
 
-        margin = 16
+    def _composicion_reutilizable(self, geo):
+        """True si desde la última composición sólo ha cambiado el tamaño."""
+        for capa in self.CAPAS:
+            clave = self._capas_claves.get(capa)
+            if capa in self._capas_sucias or clave is None or clave[4] != self._contenido_capa(capa, geo):
+                return False
+        return True
 
-        # Centro común de la columna izquierda (clan/senda/disciplinas)
-        # Nota: NO usamos cost_size aquí para que al agrandar el icono de coste
-        # no se desplace hacia la derecha toda la columna de símbolos.
-        max_icon_col = max(
-            getattr(self, 'clan_size', 0),
-            getattr(self, 'senda_size', 0),
-            getattr(self, 'discipline_size', 0),
-        )
-        left_col_center_x = card_x + (margin + (max_icon_col / 2.0) if max_icon_col > 0 else margin)
-        
-        # Dibujar título
-        painter.setFont(self.title_font)
-        color = QColor(self.title_color) if isinstance(self.title_color, str) else self.title_color
-        painter.setPen(color)
-        
-        # Calcular posición del título dentro del rectángulo de la carta
-        title_rect = QRectF(
-            card_x + margin,
-            card_y + margin,
-            max(1, card_w - 2 * margin),
-            40,
-        )
-        if self.title_alignment == "izquierda":
-            alignment_flags = Qt.AlignLeft | Qt.AlignTop
-        else:  # centro por defecto
-            alignment_flags = Qt.AlignCenter | Qt.AlignTop
-        painter.drawText(title_rect, alignment_flags, self.title)
-        
-            # Dibujar símbolo del clan (o tipo en Librería) debajo del nombre
-        if self.clan_svg_path and os.path.exists(self.clan_svg_path):
-            # Calcular posición Y del símbolo (debajo del título)
-            title_height = painter.fontMetrics().height()
-            clan_y = card_y + margin + title_height + 8  # 8 píxeles de separación
-            
-            # Calcular posición X según la alineación configurada
-            if self.clan_alignment == "derecha":
-                clan_x = card_x + card_w - margin - self.clan_size
-            elif self.clan_alignment == "centro":
-                clan_x = card_x + (card_w - self.clan_size) // 2
-            else:  # "izquierda" por defecto: centrar en la columna izquierda
-                clan_x = left_col_center_x - (self.clan_size / 2.0)
-            
-            # Renderizar SVG con reborde blanco
-            svg_renderer = QSvgRenderer(self.clan_svg_path)
-            if svg_renderer.isValid():
-                from PyQt5.QtGui import QBrush, QPen
-
-                # Reborde más fino: sólo contorno blanco alrededor del icono
-
-                # Dibujar reborde blanco sólo si la bandera está activada
-                if getattr(self, 'clan_draw_border', False):
-                    border_width = max(1, int(self.clan_size * 0.04))
-                    border_rect = QRectF(
-                        clan_x,
-                        clan_y,
-                        self.clan_size,
-                        self.clan_size,
-                    )
-                    painter.setBrush(Qt.NoBrush)
-                    painter.setPen(QPen(QColor(255, 255, 255, 255), border_width))
-                    painter.drawRoundedRect(border_rect, 3, 3)
-
-                # Renderizar el símbolo SVG (siempre)
-                clan_rect = QRectF(clan_x, clan_y, self.clan_size, self.clan_size)
-                svg_renderer.render(painter, clan_rect)
-            
-            # Dibujar segundo símbolo si existe (para tipos de librería con dos tipos)
-            if self.clan2_svg_path and os.path.exists(self.clan2_svg_path):
-                # Renderizar segundo SVG con reborde blanco (más fino)
-                svg_renderer2 = QSvgRenderer(self.clan2_svg_path)
-                if svg_renderer2.isValid():
-                    from PyQt5.QtGui import QBrush, QPen
-
-                    # Separación entre símbolos
-                    spacing = 4
-
-                    # Si clan2_stack es True, dibujar el segundo símbolo debajo del primero
-                    if getattr(self, 'clan2_stack', False):
-                        clan2_x = clan_x
-                        clan2_y = clan_y + self.clan_size + spacing
-                    else:
-                        # Comportamiento por defecto: lado a lado
-                        clan2_x = clan_x + self.clan_size + spacing
-                        clan2_y = clan_y
-
-                    # Dibujar reborde blanco para el segundo símbolo sólo si la bandera está activada
-                    if getattr(self, 'clan_draw_border', False):
-                        border_width2 = max(1, int(self.clan_size * 0.04))
-                        border_rect2 = QRectF(
-                            clan2_x,
-                            clan2_y,
-                            self.clan_size,
-                            self.clan_size,
-                        )
-                        painter.setBrush(Qt.NoBrush)
-                        painter.setPen(QPen(QColor(255, 255, 255, 255), border_width2))
-                        painter.drawRoundedRect(border_rect2, 3, 3)
-
-                    # Renderizar el segundo símbolo SVG encima del reborde (si existe)
-                    clan2_rect = QRectF(clan2_x, clan2_y, self.clan_size, self.clan_size)
-                    svg_renderer2.render(painter, clan2_rect)
-
-                    # fin bloque clan/clan2
-
-        # Dibujar senda si existe (se dibuja incluso si no hay clan)
-        if getattr(self, 'senda_svg_path', None) and os.path.exists(self.senda_svg_path):
-            svg_renderer_senda = QSvgRenderer(self.senda_svg_path)
-            if svg_renderer_senda.isValid():
-                from PyQt5.QtGui import QBrush
-
-                # Recalcular altura del título para posicionamiento
-                title_height = painter.fontMetrics().height()
-                base_y = card_y + margin + title_height + 8
-
-                # Determinar la Y inferior según si hay clan/clan2 dibujados
-                bottom_y = base_y
-                if self.clan_svg_path and os.path.exists(self.clan_svg_path):
-                    bottom_y += self.clan_size
-                # Si existe clan2 y está apilado, añadir espacio adicional
-                spacing = 6
-                if self.clan2_svg_path and os.path.exists(self.clan2_svg_path) and getattr(self, 'clan2_stack', False):
-                    bottom_y += self.clan_size + spacing
-
-                senda_y = bottom_y + spacing
-
-                # Calcular X según alineación de la senda
-                if self.senda_alignment == 'derecha':
-                    senda_x = card_x + card_w - margin - self.senda_size
-                else:  # izquierda por defecto: centrar en la columna izquierda
-                    senda_x = left_col_center_x - (self.senda_size / 2.0)
-
-                # Dibujar reborde si está activado y renderizar la senda
-                border_width = 1
-
-                # Mantener la proporción original del SVG al escalar
-                svg_default = svg_renderer_senda.defaultSize()
-                svg_w = svg_default.width() if svg_default.width() > 0 else 1
-                svg_h = svg_default.height() if svg_default.height() > 0 else 1
-                # Usar self.senda_size como tamaño máximo (lado mayor)
-                scale = min(self.senda_size / svg_w, self.senda_size / svg_h)
-                target_w = svg_w * scale
-                target_h = svg_h * scale
-
-                # Ajustar X según alineación usando el ancho real objetivo
-                if self.senda_alignment == 'derecha':
-                    senda_x = card_x + card_w - margin - target_w
-                else:
-                    # izquierda por defecto: centrar en la columna izquierda
-                    senda_x = left_col_center_x - (target_w / 2.0)
-
-                # Dibujar reborde (basado en las dimensiones reales)
-                if getattr(self, 'senda_draw_border', False):
-                    border_rect_s = QRectF(
-                        senda_x - border_width,
-                        senda_y - border_width,
-                        target_w + (border_width * 2),
-                        target_h + (border_width * 2)
-                    )
-                    painter.setBrush(QBrush(QColor(255, 255, 255, 255)))
-                    painter.setPen(Qt.NoPen)
-                    painter.drawRoundedRect(border_rect_s, 3, 3)
-
-                # Renderizar senda respetando su proporción
-                senda_rect = QRectF(senda_x, senda_y, target_w, target_h)
-                svg_renderer_senda.render(painter, senda_rect)
-
-        # Recuadro de texto de habilidades (parte inferior de la carta)
-        ability_text_str = getattr(self, 'ability_text', "").strip()
-        illustrator_text_str = getattr(self, 'illustrator_text', "").strip()
-
-        if ability_text_str:
-            from PyQt5.QtGui import QTextDocument, QTextOption
-
-            # Configuración del recuadro de habilidades: tamaño y posición
-            layout_mode = getattr(self, 'ability_layout_mode', 'default')
-
-            if layout_mode == 'cripta':
-                # En cripta queremos un recuadro algo más pequeño y más bajo
-                # para dejar más aire al resto de elementos.
-                overlay_height = max(60, int(card_h * 0.22))
-                overlay_height = min(overlay_height, max(60, card_h - margin * 3))
-            else:
-                overlay_height = max(80, int(card_h * 0.28))
-                overlay_height = min(overlay_height, max(80, card_h - margin * 3))
-
-            # Reservar espacio para el texto del ilustrador debajo del recuadro.
-            # En cripta lo reservamos siempre (haya texto o no) para que la
-            # posición vertical del cuadro de habilidades no cambie.
-            extra_for_illustrator = 0
-            ill_font = self.illustrator_font if self.illustrator_font is not None else self.ability_font
-            if layout_mode == 'cripta' or illustrator_text_str:
-                fm_ill = QFontMetrics(ill_font)
-                extra_for_illustrator = fm_ill.height() + 4
-
-            if layout_mode == 'cripta':
-                # Bajar ligeramente el recuadro en cripta para que quede
-                # algo más cerca del borde inferior.
-                offset = margin * 0.5
-                overlay_y = card_y + card_h - margin - overlay_height - extra_for_illustrator + offset
-            else:
-                overlay_y = card_y + card_h - margin - overlay_height - extra_for_illustrator
-
-            # Dejar una columna libre a la izquierda para coste/disciplinas.
-            # En cripta ampliamos un poco más esa columna para que haya
-            # más aire entre los iconos de disciplina y el cuadro de texto.
-            icon_col = max(getattr(self, 'discipline_size', 0), getattr(self, 'cost_size', 0))
-            extra_icon_space = 0
-            if layout_mode == 'cripta':
-                # En cripta dejamos una separación clara respecto a la columna
-                # de disciplinas/coste: usamos todo el ancho de icon_col más
-                # un pequeño extra para que el fondo no toque los iconos.
-                base_icon_offset = icon_col
-                extra_icon_space = int(icon_col * 0.5)
-                left_free = card_x + margin + base_icon_offset + extra_icon_space + 2
-            else:
-                # En librería queremos ganar algo de ancho de texto, así que
-                # reducimos la reserva horizontal para la columna de iconos.
-                base_icon_offset = int(icon_col * 0.6)
-                left_free = card_x + margin + base_icon_offset + extra_icon_space + 2
-            overlay_rect = QRectF(left_free, overlay_y, card_x + card_w - margin - left_free, overlay_height)
-
-            # Guardar el borde inferior del cuadro de texto para alinear
-            # las disciplinas con él (en modo cripta)
-            self._last_overlay_bottom = overlay_rect.bottom()
-
-            # Dibujar, si existe, el número de grupo de cripta justo encima del
-            # cuadro de texto, pequeñito y alineado a la izquierda de dicho cuadro.
-            group_value = getattr(self, 'crypt_group', None)
-            if group_value:
-                painter.save()
-                group_font = self.crypt_group_font if self.crypt_group_font is not None else self.ability_font
-                painter.setFont(group_font)
-                group_color = self.crypt_group_color if not isinstance(self.crypt_group_color, str) else QColor(self.crypt_group_color)
-                painter.setPen(group_color)
-
-                fm_group = QFontMetrics(group_font)
-                text = str(group_value)
-                text_w = fm_group.horizontalAdvance(text)
-                text_h = fm_group.height()
-
-                # Pequeño margen desde la izquierda del cuadro de texto
-                # (lo movemos un poco más a la derecha junto con el cuadro).
-                margin_x = 6
-                # Colocar el número justo por encima del recuadro
-                group_rect = QRectF(
-                    overlay_rect.left() + margin_x,
-                    overlay_rect.top() - text_h - 2,
-                    text_w,
-                    text_h,
-                )
-                painter.drawText(group_rect, Qt.AlignLeft | Qt.AlignBottom, text)
-                painter.restore()
-
-            # Fondo semitransparente
-            bg_opacity = getattr(self, 'ability_bg_opacity', 128)
-            bg_opacity = max(0, min(255, int(bg_opacity)))
-            painter.save()
-            painter.setPen(Qt.NoPen)
-            painter.setBrush(QColor(0, 0, 0, bg_opacity))
-            painter.drawRoundedRect(overlay_rect, 6, 6)
-
-            # Preparar texto con soporte básico de **negrita** y [Disciplina]
-            # Altura del icono de disciplina ~ altura de la fuente de habilidades
-            fm = QFontMetrics(self.ability_font)
-            icon_h = max(8, fm.height() - 2)
-
-            inline_images = {}
-
-            def _ability_to_html(source: str) -> str:
-                res = []
-                bold = False
-                i = 0
-                while i < len(source):
-                    if source[i:i+2] == "**":
-                        res.append("</b>" if bold else "<b>")
-                        bold = not bold
-                        i += 2
-                        continue
-                    if source[i] == "[":
-                        end = source.find("]", i + 1)
-                        if end != -1:
-                            tag = source[i+1:end].strip()
-                            icon_path = obtener_archivo_disciplina_texto(tag)
-                            if icon_path:
-                                # Si el recurso es SVG, lo convertimos a QImage y lo
-                                # registramos explícitamente en el QTextDocument para
-                                # que pueda renderizarlo dentro del texto.
-                                ext = os.path.splitext(icon_path)[1].lower()
-                                if ext == ".svg":
-                                    # Usamos una URL lógica para el recurso, independiente de la ruta física
-                                    url_str = f"disciplina:{os.path.basename(icon_path)}"
-                                    if url_str not in inline_images:
-                                        svg_renderer = QSvgRenderer(icon_path)
-                                        if svg_renderer.isValid():
-                                            default_size = svg_renderer.defaultSize()
-                                            native_w = default_size.width() if default_size.width() > 0 else icon_h
-                                            native_h = default_size.height() if default_size.height() > 0 else icon_h
-                                            scale = icon_h / max(native_w, native_h)
-                                            target_w = max(1, int(native_w * scale))
-                                            target_h = max(1, int(native_h * scale))
-
-                                            image = QImage(target_w, target_h, QImage.Format_ARGB32)
-                                            image.fill(Qt.transparent)
-                                            p = QPainter(image)
-                                            p.setRenderHint(QPainter.Antialiasing)
-                                            svg_renderer.render(p, QRectF(0, 0, target_w, target_h))
-                                            p.end()
-
-                                            inline_images[url_str] = image
-
-                                    res.append(f'<img src="{url_str}" />')
-                                else:
-                                    # Formatos raster se pueden usar directamente
-                                    res.append(f'<img src="{icon_path}" height="{icon_h}" />')
-                                i = end + 1
-                                continue
-                            # Si no se encuentra icono, dejar el texto tal cual
-                            res.append(html.escape(source[i:end+1]))
-                            i = end + 1
-                            continue
-                    ch = source[i]
-                    if ch == "\n":
-                        res.append("<br/>")
-                    else:
-                        res.append(html.escape(ch))
-                    i += 1
-                if bold:
-                    res.append("</b>")
-                return "".join(res)
-
-            ability_html = _ability_to_html(self.ability_text)
-
-            doc = QTextDocument()
-            doc.setDefaultFont(self.ability_font)
-            html_color = self.ability_color if isinstance(self.ability_color, str) else QColor(self.ability_color).name()
-            # Reducir ligeramente el interlineado. En cripta lo hacemos
-            # todavía un poco más compacto que en librería.
-            if layout_mode == 'cripta':
-                line_height = "90%"
-            else:
-                line_height = "95%"
-            doc.setHtml(f'<div style="color:{html_color}; line-height: {line_height};">{ability_html}</div>')
-
-            # Registrar recursos de imagen generados a partir de SVG para que
-            # QTextDocument pueda resolver las URLs usadas en los <img src="...">.
-            if inline_images:
-                for url_str, image in inline_images.items():
-                    doc.addResource(QTextDocument.ImageResource, QUrl(url_str), image)
-            opt = QTextOption()
-            opt.setWrapMode(QTextOption.WordWrap)
-            # Texto centrado horizontalmente; el centrado vertical real
-            # lo controlamos desplazando el área de dibujo según la altura
-            # real del QTextDocument.
-            opt.setAlignment(Qt.AlignHCenter | Qt.AlignTop)
-            doc.setDefaultTextOption(opt)
-            doc.setTextWidth(overlay_rect.width() - 16)
-
-            # Dibujar el texto dentro del recuadro con padding; en cripta
-            # centramos verticalmente calculando el alto real del contenido.
-            avail_h = overlay_rect.height() - 16
-            content_h = doc.size().height()
-            if layout_mode == 'cripta':
-                extra_top = max(0.0, (avail_h - content_h) / 2.0)
-            else:
-                extra_top = 0.0
+    def _rect_carta(self, geo):
+        """Rectángulo que ocupa la carta en el widget (transformar() conserva
+        la proporción, así que puede sobresalir del destino)."""
+        destino = geo["destino"]
+        _x, _y, card_w, card_h = geo["card"]
+        alto = destino.width() * card_h / card_w if card_w > 0 else destino.height()
+        return QRectF(destino.left(), destino.top(), destino.width(), alto)
 
-            painter.translate(
-                overlay_rect.left() + 8,
-                overlay_rect.top() + 8 + extra_top,
-            )
-            clip_rect = QRectF(0, 0, overlay_rect.width() - 16, avail_h)
-            painter.setClipRect(clip_rect)
-            doc.drawContents(painter, clip_rect)
-            painter.restore()
-
-            # Texto de ilustrador bajo el recuadro de habilidades
-            if illustrator_text_str:
-                painter.save()
-                painter.setFont(ill_font)
-                ill_color = self.illustrator_color if isinstance(self.illustrator_color, str) else QColor(self.illustrator_color).name()
-                painter.setPen(QColor(ill_color) if isinstance(ill_color, str) else ill_color)
-
-                fm_ill = QFontMetrics(ill_font)
-                ill_h = fm_ill.height()
-                ill_rect = QRectF(
-                    overlay_rect.left(),
-                    overlay_rect.bottom() + 2,
-                    overlay_rect.width(),
-                    ill_h + 2,
-                )
-                painter.drawText(ill_rect, Qt.AlignHCenter | Qt.AlignTop, illustrator_text_str)
-                painter.restore()
-
-        # Dibujar disciplinas (columna de iconos en el borde izquierdo)
-        if getattr(self, 'disciplines', None):
-            from PyQt5.QtGui import QBrush
-
-            # Filtrar entradas con ruta válida existente
-            valid_items = [d for d in self.disciplines if d.get("svg_path") and os.path.exists(d["svg_path"])]
-            if valid_items:
-                # Espaciado vertical entre iconos (mismo para todas las disciplinas)
-                base_size = max(8, self.discipline_size)
-                spacing = max(6, int(base_size * 0.35))
-
-                # Preparar lista de iconos con sus tamaños reales ya calculados
-                prepared = []
-                for item in valid_items:
-                    path = item["svg_path"]
-                    ext = os.path.splitext(path)[1].lower()
-                    is_svg = ext == '.svg'
-
-                    svg_renderer_d = None
-                    pixmap_d = None
-                    if is_svg:
-                        svg_renderer_d = QSvgRenderer(path)
-                        if not svg_renderer_d.isValid():
-                            svg_renderer_d = None
-                    else:
-                        pixmap_d = QPixmap(path)
-                        if pixmap_d.isNull():
-                            pixmap_d = None
-
-                    if svg_renderer_d is None and pixmap_d is None:
-                        continue
-
-                    # Determinar si esta disciplina es "Superior" según su nombre
-                    nombre_disc = str(item.get("nombre", ""))
-                    lower_name = nombre_disc.lower()
-                    es_superior = lower_name.startswith("superior ") or lower_name.endswith(" superior")
-
-                    # Obtener dimensiones nativas
-                    if svg_renderer_d:
-                        svg_default = svg_renderer_d.defaultSize()
-                        native_w = svg_default.width() if svg_default.width() > 0 else 1
-                        native_h = svg_default.height() if svg_default.height() > 0 else 1
-                    else:
-                        native_w = pixmap_d.width() if pixmap_d.width() > 0 else 1
-                        native_h = pixmap_d.height() if pixmap_d.height() > 0 else 1
-
-                    # Hacer que las disciplinas superiores sean más grandes
-                    # que las inferiores.
-                    icon_size = base_size * (1.3 if es_superior else 1.0)
-                    scale = min(icon_size / native_w, icon_size / native_h)
-                    target_w = native_w * scale
-                    target_h = native_h * scale
-
-                    prepared.append({
-                        "item": item,
-                        "path": path,
-                        "svg_renderer": svg_renderer_d,
-                        "pixmap": pixmap_d,
-                        "es_superior": es_superior,
-                        "target_w": target_w,
-                        "target_h": target_h,
-                    })
-
-                if not prepared:
-                    return
-
-                # Altura total de la columna: suma de alturas reales + huecos iguales
-                total_h = sum(p["target_h"] for p in prepared) + spacing * (len(prepared) - 1)
-
-                mode = getattr(self, 'discipline_anchor_mode', 'centro')
-                if mode == 'inferior':
-                    # En cripta, anclar la columna al borde inferior del cuadro
-                    # de texto de habilidades (si existe); en caso contrario,
-                    # usar el borde inferior de la carta.
-                    bottom_limit = card_y + card_h - margin
-                    if getattr(self, 'ability_layout_mode', 'default') == 'cripta':
-                        overlay_bottom = getattr(self, '_last_overlay_bottom', None)
-                        if overlay_bottom is not None:
-                            bottom_limit = overlay_bottom
-
-                    start_y = max(card_y + margin, bottom_limit - total_h)
-                else:
-                    # Centrar aproximadamente la columna en la altura disponible
-                    start_y = max(card_y + margin, (card_y + card_h - total_h) / 2.0)
-
-                y = start_y
-                for data in prepared:
-                    item = data["item"]
-                    svg_renderer_d = data["svg_renderer"]
-                    pixmap_d = data["pixmap"]
-                    es_superior = data["es_superior"]
-                    target_w = data["target_w"]
-                    target_h = data["target_h"]
-
-                    # Centrar cada icono en la misma columna vertical
-                    x = left_col_center_x - (target_w / 2.0)
-
-                    # Opcionalmente halo/borde blanco (igual estilo que tipos/clan).
-                    # Para disciplinas superiores, usamos borde en forma de rombo
-                    # para diferenciarlas visualmente.
-                    if getattr(self, 'discipline_draw_border', False):
-                        from PyQt5.QtGui import QPen
-                        from PyQt5.QtCore import QPointF
-                        from PyQt5.QtGui import QPolygonF
-
-                        painter.setBrush(Qt.NoBrush)
-                        # Grosor proporcional al tamaño del icono, como en clan/tipo
-                        border_width = max(1, int(base_size * 0.04))
-                        painter.setPen(QPen(QColor(255, 255, 255, 255), border_width))
-
-                        if es_superior:
-                            # Rombo centrado en el icono
-                            cx = x + (target_w / 2.0)
-                            cy = y + (target_h / 2.0)
-                            rx = target_w / 2.0
-                            ry = target_h / 2.0
-                            puntos = [
-                                QPointF(cx, cy - ry),  # arriba
-                                QPointF(cx + rx, cy),  # derecha
-                                QPointF(cx, cy + ry),  # abajo
-                                QPointF(cx - rx, cy),  # izquierda
-                            ]
-                            painter.drawPolygon(QPolygonF(puntos))
-                        else:
-                            border_rect_d = QRectF(
-                                x,
-                                y,
-                                target_w,
-                                target_h,
-                            )
-                            painter.drawRoundedRect(border_rect_d, 3, 3)
-
-                    if svg_renderer_d:
-                        d_rect = QRectF(x, y, target_w, target_h)
-                        svg_renderer_d.render(painter, d_rect)
-                    else:
-                        scaled_d = pixmap_d.scaled(int(round(target_w)), int(round(target_h)), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                        painter.drawPixmap(int(round(x)), int(round(y)), scaled_d)
-
-                    # Avanzar Y para el siguiente icono manteniendo siempre
-                    # la misma distancia entre bordes inferiores y superiores.
-                    y += target_h + spacing
-
-        # Coste (se dibuja en la esquina inferior izquierda/derecha según configuración)
-        if getattr(self, 'cost_svg_path', None) and os.path.exists(self.cost_svg_path):
-            from PyQt5.QtGui import QBrush, QFont
-
-            ext = os.path.splitext(self.cost_svg_path)[1].lower()
-            is_svg = ext == '.svg'
-
-            svg_renderer_cost = None
-            pixmap_cost = None
-            if is_svg:
-                svg_renderer_cost = QSvgRenderer(self.cost_svg_path)
-                if not svg_renderer_cost.isValid():
-                    svg_renderer_cost = None
+    def paintEvent(self, event):
+        t_pintado = perfil_pintado.inicio()
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        borrador = self._borrador
+        geo = self._calcular_geometria(borrador)
+        # Borde inferior del cuadro de texto de habilidades de este repintado
+        self._last_overlay_bottom = geo["overlay_bottom"]
+
+        dpr = self.devicePixelRatioF()
+        if borrador:
+            # Sin suavizado; la pasada a calidad completa repinta después
+            # la carta entera de una vez. Si sólo ha cambiado el tamaño se
+            # estira la última composición; si no, se pinta a baja resolución
+            if self._composicion_reutilizable(geo):
+                imagen = self._capas.get(self.CAPAS[-1])
             else:
-                pixmap_cost = QPixmap(self.cost_svg_path)
-                if pixmap_cost.isNull():
-                    pixmap_cost = None
+                imagen = self._componer(geo, dpr * ESCALA_BORRADOR, borrador=True)
+            if imagen is not None:
+                carta, dpr_capa = self._composicion_destino
+                origen = QRectF(carta.x() * dpr_capa, carta.y() * dpr_capa, carta.width() * dpr_capa, carta.height() * dpr_capa)
+                painter.drawImage(self._rect_carta(geo), imagen, origen)
+            self._fin_pintado(painter, t_pintado, borrador)
+            return
 
-            if svg_renderer_cost is None and pixmap_cost is None:
-                pass
-            else:
-                # Obtener dimensiones nativas
-                if svg_renderer_cost:
-                    svg_default = svg_renderer_cost.defaultSize()
-                    native_w = svg_default.width() if svg_default.width() > 0 else 1
-                    native_h = svg_default.height() if svg_default.height() > 0 else 1
-                else:
-                    native_w = pixmap_cost.width() if pixmap_cost.width() > 0 else 1
-                    native_h = pixmap_cost.height() if pixmap_cost.height() > 0 else 1
-
-                scale = min(self.cost_size / native_w, self.cost_size / native_h)
-                target_w = native_w * scale
-                target_h = native_h * scale
-
-                # Log sencillo para ver si estamos ampliando demasiado los
-                # iconos de coste (especialmente pool/blood) y provocar
-                # pixelado en la exportación.
-                try:
-                    key = (self.cost_svg_path, native_w, native_h, self.cost_size)
-                    if hasattr(self, '_logged_cost_icon_sizes') and key not in self._logged_cost_icon_sizes:
-                        self._logged_cost_icon_sizes.add(key)
-                        print(
-                            f"[COST_ICON] type={self.cost_type} path={self.cost_svg_path} "
-                            f"native={native_w}x{native_h}px target={target_w:.1f}x{target_h:.1f}px"
-                        )
-                except Exception:
-                    pass
-
-                # Posición horizontal: izquierda (columna de iconos) o derecha
-                if getattr(self, 'cost_alignment', 'izquierda') == 'derecha':
-                    # Esquina inferior derecha de la carta
-                    cost_x = card_x + card_w - margin - target_w
-                else:
-                    # Esquina inferior izquierda, centrado en la columna de iconos
-                    cost_x = left_col_center_x - (target_w / 2.0)
-                # Elevar ligeramente el icono para que no quede pegado al borde inferior
-                extra_offset = max(4, int(target_h * 0.25))
-                cost_y = max(card_y + margin, card_y + card_h - margin - target_h - extra_offset)
-
-                # Espaciado entre iconos cuando hay varios
-                spacing = 4
-
-                # Independientemente del valor (1..6 o X), dibujar siempre un único icono
-                border_width = 1
-                if getattr(self, 'cost_draw_border', False):
-                    border_rect_c = QRectF(
-                        cost_x - border_width,
-                        cost_y - border_width,
-                        target_w + (border_width * 2),
-                        target_h + (border_width * 2)
-                    )
-                    painter.setBrush(QBrush(QColor(255, 255, 255, 255)))
-                    painter.setPen(Qt.NoPen)
-                    painter.drawRoundedRect(border_rect_c, 3, 3)
-
-                if svg_renderer_cost:
-                    cost_rect = QRectF(cost_x, cost_y, target_w, target_h)
-                    svg_renderer_cost.render(painter, cost_rect)
-                else:
-                    scaled = pixmap_cost.scaled(int(round(target_w)), int(round(target_h)), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    painter.drawPixmap(int(round(cost_x)), int(round(cost_y)), scaled)
-
-# Cargar config desde config/textos/config_data.json
-from configuracion import load_config_data
-
-def _deep_merge_dicts(defaults: dict, overrides: dict) -> dict:
-    merged = dict(defaults)
-    for key, value in (overrides or {}).items():
-        if isinstance(value, dict) and isinstance(merged.get(key), dict):
-            merged[key] = _deep_merge_dicts(merged[key], value)
-        else:
-            merged[key] = value
-    return merged
-
-def cargar_config():
-    defaults = {
-        "nombre_carta": {
-            "fuente": "fonts/MatrixExtraBold.otf",
-            "tamano": 18,
-            "color": "#ffffff",
-            "alineacion": "centro"
-        },
-        "simbolo_clan": {
-            "tamano": 40,
-            "alineacion": "izquierda"
-        }
-        ,
-        "simbolo_senda": {
-            "tamano": 24,
-            "alineacion": "izquierda"
-        }
+        imagen = self._componer(geo, dpr)
+        if imagen is not None:
+            painter.drawImage(0, 0, imagen)
+        self._pintada_al_mostrar = True
+        self._fin_pintado(painter, t_pintado, borrador)
+
+    def _fin_pintado(self, painter, t_pintado, borrador):
+        """Cierra la medida del paintEvent y, si se pide, dibuja el HUD encima."""
+        perfil_pintado.fin("paintEvent", t_pintado, carta=self.title or "", borrador=borrador, tamano=[self.width(), self.height()])
+        if perfil_pintado.hud:
+            perfil_pintado.dibujar_hud(painter, self.rect())
+
+# Config de config_data.json (cargada una vez en el almacén compartido)
+from configuracion import almacen_configuracion, cargar_config, obtener_clave
+
+# Valores que se usan si faltan en config_data.json
+CONFIG_POR_DEFECTO = {
+    "nombre_carta": {
+        "fuente": "fonts/MatrixExtraBold.otf",
+        "tamano": 18,
+        "color": "#ffffff",
+        "alineacion": "centro"
+    },
+    "simbolo_clan": {
+        "tamano": 40,
+        "alineacion": "izquierda"
+    },
+    "simbolo_senda": {
+        "tamano": 24,
+        "alineacion": "izquierda"
     }
-
-    data = load_config_data({})
-    return _deep_merge_dicts(defaults, data)
+}
+
+# Claves de configuración que se copian tal cual a un atributo de la carta
+# de cripta: (atributo, valor por defecto)
+ATRIBUTOS_CONFIG_CRIPTA = {
+    "simbolo_clan.tamano": ("clan_size", 40),
+    "simbolo_clan.alineacion": ("clan_alignment", "izquierda"),
+    "simbolo_senda.tamano": ("senda_size", 24),
+    "simbolo_senda.alineacion": ("senda_alignment", "izquierda"),
+    "simbolo_disciplina.tamano": ("discipline_size", 24),
+    "simbolo_coste.tamano": ("cost_size", 40),
+}
 
 class CriptaWidget(QWidget):
     @property
@@ -1132,7 +570,7 @@ class CriptaWidget(QWidget):
     def __init__(self, importar_imagen_callback):
         super().__init__()
         self.layout = QHBoxLayout()
-        config = cargar_config()
+        config = cargar_config(CONFIG_POR_DEFECTO)
         # Widget personalizado para imagen y título
         from PyQt5.QtWidgets import QLineEdit
         self.cripta_card_widget = CartaImageWidget()
@@ -1142,82 +580,20 @@ class CriptaWidget(QWidget):
         self.layout.addWidget(self.cripta_card_widget, stretch=2)
         # Para compatibilidad con el resto de la app
         self.cripta_label = self.cripta_card_widget
-        # Cargar fuente desde archivo
-        nombre_config = config["nombre_carta"]
-        fuente_archivo = nombre_config["fuente"]
-        font_path = os.path.join(get_resource_path("fonts"), fuente_archivo)
-        font_id = QFontDatabase.addApplicationFont(font_path)
-        if font_id != -1:
-            font_families = QFontDatabase.applicationFontFamilies(font_id)
-            if font_families:
-                font = QFont(font_families[0], nombre_config["tamano"])
-            else:
-                font = QFont(fuente_archivo, nombre_config["tamano"])
-        else:
-            font = QFont(fuente_archivo, nombre_config["tamano"])
-        self.cripta_title_font = font
-        self.cripta_title_color = nombre_config["color"]
-        # Configurar alineación
-        self.cripta_card_widget.title_alignment = nombre_config.get("alineacion", "centro")
-        # Configurar tamaño y alineación del símbolo de clan
-        simbolo_config = config.get("simbolo_clan", {})
-        self.cripta_card_widget.clan_size = simbolo_config.get("tamano", 40)
-        self.cripta_card_widget.clan_alignment = simbolo_config.get("alineacion", "izquierda")
-        # Configurar tamaño y alineación del símbolo de senda (debajo del clan)
-        simbolo_senda_config = config.get("simbolo_senda", {})
-        self.cripta_card_widget.senda_size = simbolo_senda_config.get("tamano", 24)
-        self.cripta_card_widget.senda_alignment = simbolo_senda_config.get("alineacion", "izquierda")
-        # Tamaño de iconos de disciplina (cripta) compartido con librería
-        simbolo_disciplina_config = config.get("simbolo_disciplina", {})
-        self.cripta_card_widget.discipline_size = simbolo_disciplina_config.get("tamano", 24)
+        # Fuente, color y alineación del nombre
+        self._aplicar_nombre_carta(config)
+        # Tamaño y alineación de los símbolos de clan, senda (debajo del
+        # clan), disciplinas y coste (compartidos con librería)
+        for clave, (atributo, por_defecto) in ATRIBUTOS_CONFIG_CRIPTA.items():
+            setattr(self.cripta_card_widget, atributo, obtener_clave(config, clave, por_defecto))
         # Activar halo de disciplina también en cripta
         self.cripta_card_widget.discipline_draw_border = True
         # En cripta las disciplinas se anclan en el tercio inferior y se apilan hacia arriba
         self.cripta_card_widget.discipline_anchor_mode = "inferior"
-        # Tamaño de símbolo de coste (compartido con librería)
-        simbolo_coste_config = config.get("simbolo_coste", {})
-        self.cripta_card_widget.cost_size = simbolo_coste_config.get("tamano", 40)
-        # Tamaño de iconos de disciplina (cripta) compartido con librería
-        simbolo_disciplina_config = config.get("simbolo_disciplina", {})
-        self.cripta_card_widget.discipline_size = simbolo_disciplina_config.get("tamano", 24)
-        # Configuración de texto de habilidades
-        texto_hab_config = config.get("texto_habilidad", {})
-        hab_fuente_archivo = texto_hab_config.get("fuente", "Gill Sans.otf")
-        hab_font_path = os.path.join(get_resource_path("fonts"), hab_fuente_archivo)
-        hab_size = texto_hab_config.get("tamano", 12)
-        hab_color = texto_hab_config.get("color", "#ffffff")
-        hab_opacidad_pct = texto_hab_config.get("opacidad_fondo", 50)
-        try:
-            hab_opacidad_pct = int(hab_opacidad_pct)
-        except Exception:
-            hab_opacidad_pct = 50
-        hab_opacidad_pct = max(0, min(100, hab_opacidad_pct))
-        hab_opacidad = int(hab_opacidad_pct * 2.55)
-
-        hab_font_id = QFontDatabase.addApplicationFont(hab_font_path)
-        if hab_font_id != -1:
-            hab_families = QFontDatabase.applicationFontFamilies(hab_font_id)
-            if hab_families:
-                hab_font = QFont(hab_families[0], hab_size)
-            else:
-                hab_font = QFont(hab_fuente_archivo, hab_size)
-        else:
-            hab_font = QFont(hab_fuente_archivo, hab_size)
-
-        self.cripta_ability_font = hab_font
-        self.cripta_ability_color = hab_color
-        self.cripta_ability_bg_opacity = hab_opacidad
-        self.cripta_card_widget.ability_font = hab_font
-        self.cripta_card_widget.ability_color = hab_color
-        self.cripta_card_widget.ability_bg_opacity = hab_opacidad
-        # Configurar fuente y color para el grupo de cripta (un poco más pequeño
-        # que el texto de habilidades, reutilizando la misma familia/color)
-        group_font = QFont(hab_font)
-        group_font.setPointSize(max(6, hab_size - 2))
-        self.cripta_group_font = group_font
-        self.cripta_group_color = hab_color
-        self.cripta_card_widget.crypt_group_font = group_font
-        self.cripta_card_widget.crypt_group_color = hab_color
+        # Configuración de texto de habilidades (y del grupo de cripta)
+        self._aplicar_texto_habilidad(config)
+        # Los cambios de configuración llegan clave a clave
+        almacen_configuracion().cambiado.connect(self._config_cambiada)
         # Activar el modo de maquetación de habilidades específico de cripta
         self.cripta_card_widget.ability_layout_mode = "cripta"
         # Campo de nombre editable
@@ -1269,17 +645,13 @@ class CriptaWidget(QWidget):
         col1_layout.addWidget(QLabel("Coste (capacidad):"))
         self.cripta_cost_combo = QComboBox()
         self.cripta_cost_combo.addItem("Ninguno")
-        # Detectar valores disponibles a partir de la carpeta resources/costes
-        base_costes = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resources", "costes")
-        try:
-            for fname in sorted(os.listdir(base_costes)):
-                if fname.lower().startswith("cap") and fname.lower().endswith(".gif"):
-                    stem = os.path.splitext(fname)[0]
-                    num = stem[3:]
-                    if num.isdigit():
-                        self.cripta_cost_combo.addItem(num)
-        except FileNotFoundError:
-            pass
+        # Detectar valores disponibles a partir de los archivos de resources/costes
+        for fname in indice_recursos_global.archivos("costes"):
+            if fname.lower().startswith("cap") and fname.lower().endswith(".gif"):
+                stem = os.path.splitext(fname)[0]
+                num = stem[3:]
+                if num.isdigit():
+                    self.cripta_cost_combo.addItem(num)
         self.cripta_cost_combo.setCurrentText("Ninguno")
         self.cripta_cost_combo.currentTextChanged.connect(self.set_cripta_cost_from_combo)
         col1_layout.addWidget(self.cripta_cost_combo)
@@ -1323,20 +695,78 @@ class CriptaWidget(QWidget):
         btn_guardar_cripta.setMinimumWidth(100)
         btn_guardar_cripta.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
         btn_guardar_cripta.clicked.connect(self.guardar_carta_cripta)
-        btn_guardar_online_cripta = QPushButton('Guardar para Online')
-        btn_guardar_online_cripta.setMinimumWidth(100)
-        btn_guardar_online_cripta.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-        btn_guardar_online_cripta.clicked.connect(self.guardar_carta_cripta_online)
         botones_layout.addWidget(btn_importar_cripta, stretch=1)
         botones_layout.addWidget(btn_guardar_cripta, stretch=1)
-        botones_layout.addWidget(btn_guardar_online_cripta, stretch=1)
         self.cripta_right_layout.addLayout(botones_layout)
         self.cripta_right_panel.setLayout(self.cripta_right_layout)
         self.layout.addWidget(self.cripta_right_panel, stretch=1)
         self.setLayout(self.layout)
 
+    def _aplicar_nombre_carta(self, config):
+        """Fuente, color y alineación del nombre según la configuración."""
+        nombre_config = config["nombre_carta"]
+        self.cripta_title_font = registro_fuentes_global.fuente(nombre_config["fuente"], nombre_config["tamano"])
+        self.cripta_title_color = nombre_config["color"]
+        self.cripta_card_widget.title_alignment = nombre_config.get("alineacion", "centro")
+        # Reaplicar el título si hay texto
+        if self.cripta_card_widget.title:
+            self.set_title_from_edit(self.cripta_card_widget.title)
+
+    def _aplicar_texto_habilidad(self, config):
+        """Fuente, color y opacidad del texto de habilidades y del grupo de cripta."""
+        texto_hab_config = config.get("texto_habilidad", {})
+        hab_fuente_archivo = texto_hab_config.get("fuente", "Gill Sans.otf")
+        hab_size = texto_hab_config.get("tamano", 12)
+        hab_color = texto_hab_config.get("color", "#ffffff")
+        hab_opacidad_pct = texto_hab_config.get("opacidad_fondo", 50)
+        try:
+            hab_opacidad_pct = int(hab_opacidad_pct)
+        except Exception:
+            hab_opacidad_pct = 50
+        hab_opacidad_pct = max(0, min(100, hab_opacidad_pct))
+        hab_opacidad = int(hab_opacidad_pct * 2.55)
+
+        hab_font = registro_fuentes_global.fuente(hab_fuente_archivo, hab_size)
+
+        self.cripta_ability_font = hab_font
+        self.cripta_ability_color = hab_color
+        self.cripta_ability_bg_opacity = hab_opacidad
+        self.cripta_card_widget.ability_font = hab_font
+        self.cripta_card_widget.ability_color = hab_color
+        self.cripta_card_widget.ability_bg_opacity = hab_opacidad
+        # Configurar fuente y color para el grupo de cripta (un poco más pequeño
+        # que el texto de habilidades, reutilizando la misma familia/color)
+        group_font = QFont(hab_font)
+        group_font.setPointSize(max(6, hab_size - 2))
+        self.cripta_group_font = group_font
+        self.cripta_group_color = hab_color
+        self.cripta_card_widget.crypt_group_font = group_font
+        self.cripta_card_widget.crypt_group_color = hab_color
+        self.cripta_card_widget.update()
+
+    def _config_cambiada(self, clave, valor):
+        """Actualiza sólo la propiedad de la carta afectada por `clave`.
+
+        La carta marca sucia únicamente la capa que depende de ese atributo.
+        """
+        if clave in ATRIBUTOS_CONFIG_CRIPTA:
+            atributo, por_defecto = ATRIBUTOS_CONFIG_CRIPTA[clave]
+            # None: la clave ha desaparecido al recargar la configuración
+            setattr(self.cripta_card_widget, atributo, por_defecto if valor is None else valor)
+            self.cripta_card_widget.update()
+        elif clave.startswith("nombre_carta."):
+            self._aplicar_nombre_carta(cargar_config(CONFIG_POR_DEFECTO))
+        elif clave.startswith("texto_habilidad."):
+            self._aplicar_texto_habilidad(cargar_config(CONFIG_POR_DEFECTO))
+
     def guardar_carta_cripta(self):
-        """Guarda la carta de cripta actual (PNG o JPG, 63x88mm a 300 DPI)."""
+        """Guarda la carta de cripta actual (PNG o JPG) en todos los tamaños configurados.
+
+        El archivo elegido es el de 63x88mm a 300 DPI; las variantes
+        (online, miniatura, 600 DPI) se escriben a su lado con sufijo.
+        """
+        from logicas.exportador.variantes import variantes_configuradas
+
         if hasattr(self, 'cripta_name_edit'):
             nombre_base = self.cripta_name_edit.text().strip()
         else:
@@ -1358,36 +788,19 @@ class CriptaWidget(QWidget):
         )
         if not filename:
             return
-        self.cripta_card_widget.export_png(filename)
-
-    def guardar_carta_cripta_online(self):
-        """Guarda la carta de cripta en formato optimizado para juego online (358x500px)."""
-        from logicas.recorte.constantes import VTES_CARD_WIDTH_ONLINE, VTES_CARD_HEIGHT_ONLINE
-        
-        if hasattr(self, 'cripta_name_edit'):
-            nombre_base = self.cripta_name_edit.text().strip()
-        else:
-            nombre_base = ""
-        if not nombre_base:
-            nombre_base = "carta_cripta_online"
-        safe_name = "".join(c for c in nombre_base if c.isalnum() or c in (" ", "-", "_")).strip()
-        if not safe_name:
-            safe_name = "carta_cripta_online"
-        default_path = os.path.join(os.getcwd(), safe_name.replace(" ", "_") + "_online.png")
-
-        filename, _ = QFileDialog.getSaveFileName(
-            self,
-            "Guardar carta de cripta para online",
-            default_path,
-            "Imagen PNG/JPEG (*.png *.jpg *.jpeg)",
-        )
-        if not filename:
-            return
-        self.cripta_card_widget.export_png(
-            filename,
-            width=VTES_CARD_WIDTH_ONLINE,
-            height=VTES_CARD_HEIGHT_ONLINE
-        )
+        self.cripta_card_widget.exportar_en_segundo_plano(filename, variantes_configuradas(cargar_config(CONFIG_POR_DEFECTO)))
+
+    def cargar_carta(self, carta):
+        """Rellena los controles con una carta de cripta (formato de `main.py render`)."""
+        self.cripta_name_edit.setText(carta.get("nombre", ""))
+        seleccionar_en_combo(self.cripta_clan_combo, carta.get("clan"))
+        seleccionar_en_combo(self.cripta_senda_combo, carta.get("senda"))
+        seleccionar_en_combo(self.cripta_group_combo, carta.get("grupo"))
+        seleccionar_en_combo(self.cripta_cost_combo, carta.get("capacidad"))
+        seleccionar_en_lista(self.cripta_disciplines_list, carta.get("disciplinas", []))
+        self.set_disciplines_from_list()
+        self.cripta_ability_edit.setPlainText(carta.get("habilidad", ""))
+        self.cripta_illustrator_edit.setText(carta.get("ilustrador", ""))
 
     def set_title_from_edit(self, text):
         self.cripta_card_widget.set_title(
@@ -3,14 +3,17 @@ import json
 import sys
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSizePolicy, QListWidget, QAbstractItemView, QPlainTextEdit, QLineEdit, QFileDialog
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPixmap, QFont, QFontDatabase, QPainter, QColor
+from PyQt5.QtGui import QPixmap, QFont, QPainter, QColor
 from functools import partial
 
 # Importar CartaImageWidget desde cripta_widget
-from ventana.cripta_widget import CartaImageWidget
+from ventana.cripta_widget import CartaImageWidget, obtener_archivo_senda, seleccionar_en_combo, seleccionar_en_lista
+from logicas.render.fuentes import registro_fuentes_global
+from logicas.render.indice_recursos import indice_recursos_global
+from logicas.render.renderizador import obtener_archivo_disciplina_texto
 
 from resources.listas.libreria_types_list import LIBRERIA_SVG_MAP
-from resources.listas.sendas_list import SENDAS, SENDA_SVG_MAP
+from resources.listas.sendas_list import SENDAS
 from resources.listas.costs_list import BLOOD, POOL, BLOOD_SVG_MAP, POOL_SVG_MAP
 from resources.listas.disciplines_list import DISCIPLINAS_INFERIORES
 from resources.listas.clans_list import CLANES, CLAN_SVG_MAP
@@ -24,74 +27,12 @@ def obtener_archivo_disciplina(nombre_disciplina):
         - superior: "<nombre>sup.svg" (por ejemplo, "oblivionsup.svg")
 
     El nombre en la UI puede ser "Oblivion", "Oblivion Superior" o
-    "Superior Oblivion"; todos se normalizan al mismo patrón.
+    "Superior Oblivion"; todos se normalizan al mismo patrón (ver
+    `obtener_archivo_disciplina_texto`).
     """
     if not nombre_disciplina or nombre_disciplina == "Ninguno":
         return None
-
-    base_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resources", "disciplines")
-    if not os.path.isdir(base_dir):
-        return None
-
-    nombre_raw = nombre_disciplina.strip()
-    if not nombre_raw:
-        return None
-
-    lower = nombre_raw.lower()
-    es_superior = False
-
-    # Aceptar tanto "Oblivion Superior" como "Superior Oblivion"
-    if lower.startswith("superior "):
-        es_superior = True
-        base = nombre_raw[len("Superior "):].strip()
-    elif lower.endswith(" superior"):
-        es_superior = True
-        base = nombre_raw[:-len(" superior")].strip()
-    else:
-        base = nombre_raw
-
-    # Nombre de archivo: todo en minúsculas, sin espacios
-    stem = base.replace(" ", "").lower()
-    if not stem:
-        return None
-
-    if es_superior:
-        fname = f"{stem}sup.svg"
-    else:
-        fname = f"{stem}.svg"
-
-    ruta_directa = os.path.join(base_dir, fname)
-    if os.path.exists(ruta_directa):
-        return ruta_directa
-
-    # Fallback heurístico: buscar por coincidencia de prefijo sobre cualquier
-    # archivo *.svg (o imagen) existente en la carpeta.
-    try:
-        archivos = os.listdir(base_dir)
-    except OSError:
-        return None
-
-    candidatos = []
-    for archivo in archivos:
-        ruta = os.path.join(base_dir, archivo)
-        if not os.path.isfile(ruta):
-            continue
-        nombre_sin_ext, ext = os.path.splitext(archivo)
-        ext = ext.lower()
-        if ext not in (".svg", ".png", ".gif", ".jpg", ".jpeg", ".webp"):
-            continue
-        stem_norm = nombre_sin_ext.lower().replace("_", "").replace("-", "")
-        candidatos.append((stem_norm, ruta))
-
-    nombre_norm = stem
-    mejor_match = None
-    for stem_norm, ruta in candidatos:
-        if stem_norm == nombre_norm:
-            return ruta
-        if stem_norm.startswith(nombre_norm) and mejor_match is None:
-            mejor_match = ruta
-
-    return mejor_match
+    return obtener_archivo_disciplina_texto(nombre_disciplina)
 
 
 def obtener_archivo_clan(nombre_clan):
@@ -101,13 +42,7 @@ def obtener_archivo_clan(nombre_clan):
 
     nombre_normalizado = nombre_clan.strip()
     archivo = CLAN_SVG_MAP.get(nombre_normalizado)
-
-    if archivo:
-        base_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resources", "clans")
-        ruta_completa = os.path.join(base_dir, archivo)
-        if os.path.exists(ruta_completa):
-            return ruta_completa
-    return None
+    return indice_recursos_global.ruta("clanes", archivo)
 
 
 def obtener_archivo_tipo_libreria(nombre_tipo):
@@ -117,12 +52,32 @@ def obtener_archivo_tipo_libreria(nombre_tipo):
 
     nombre_normalizado = nombre_tipo.strip()
     archivo = LIBRERIA_SVG_MAP.get(nombre_normalizado)
+    return indice_recursos_global.ruta("libreria", archivo)
 
-    if archivo:
-        base_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resources", "libreria")
-        ruta_completa = os.path.join(base_dir, archivo)
-        if os.path.exists(ruta_completa):
-            return ruta_completa
+def obtener_archivo_coste_libreria(tipo, valor):
+    """Resuelve el icono de coste de librería ('blood' o 'pool') para un valor.
+
+    Sigue el patrón bloodcost{valor}.svg/png o poolcost{valor}.svg/png,
+    dando prioridad a SVG, y usa los mapas de costs_list como respaldo.
+    """
+    if not tipo or str(tipo).lower() not in ("blood", "pool") or valor is None:
+        return None
+    carpeta = str(tipo).lower()
+    stem = f"{carpeta}cost{str(valor).lower()}"
+    ruta = indice_recursos_global.primera(carpeta, stem + ".svg", stem + ".png")
+    if ruta:
+        return ruta
+
+    mapa = BLOOD_SVG_MAP if carpeta == "blood" else POOL_SVG_MAP
+    return indice_recursos_global.ruta(carpeta, mapa.get(str(valor).upper()))
+
+
+def _primer_archivo_coste(tipo):
+    """Icono del primer coste de la lista del tipo ('Blood' o 'Pool'), o None."""
+    if tipo == "Blood" and len(BLOOD) > 1:
+        return indice_recursos_global.ruta("blood", BLOOD_SVG_MAP.get(BLOOD[1]))
+    if tipo == "Pool" and len(POOL) > 1:
+        return indice_recursos_global.ruta("pool", POOL_SVG_MAP.get(POOL[1]))
     return None
 
 def get_resource_path(relative_path):
@@ -133,44 +88,42 @@ def get_resource_path(relative_path):
         base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     return os.path.join(base_path, relative_path)
 
-# Cargar config desde config/textos/config_data.json
-from configuracion import load_config_data
-
-def _deep_merge_dicts(defaults: dict, overrides: dict) -> dict:
-    merged = dict(defaults)
-    for key, value in (overrides or {}).items():
-        if isinstance(value, dict) and isinstance(merged.get(key), dict):
-            merged[key] = _deep_merge_dicts(merged[key], value)
-        else:
-            merged[key] = value
-    return merged
-
-def cargar_config():
-    defaults = {
-        "nombre_carta": {
-            "fuente": "fonts/MatrixExtraBold.otf",
-            "tamano": 18,
-            "color": "#ffffff",
-            "alineacion": "centro"
-        },
-        "simbolo_libreria": {
-            "tamano": 35,
-            "alineacion": "izquierda"
-        },
-        "simbolo_senda": {
-            "tamano": 50,
-            "alineacion": "izquierda"
-        }
+# Config de config_data.json (cargada una vez en el almacén compartido)
+from configuracion import almacen_configuracion, cargar_config, obtener_clave
+
+# Valores que se usan si faltan en config_data.json
+CONFIG_POR_DEFECTO = {
+    "nombre_carta": {
+        "fuente": "fonts/MatrixExtraBold.otf",
+        "tamano": 18,
+        "color": "#ffffff",
+        "alineacion": "centro"
+    },
+    "simbolo_libreria": {
+        "tamano": 35,
+        "alineacion": "izquierda"
+    },
+    "simbolo_senda": {
+        "tamano": 50,
+        "alineacion": "izquierda"
     }
-
-    data = load_config_data({})
-    return _deep_merge_dicts(defaults, data)
+}
+
+# Claves de configuración que se copian tal cual a un atributo de la carta
+# de librería: (atributo, valor por defecto)
+ATRIBUTOS_CONFIG_LIBRERIA = {
+    "simbolo_libreria.tamano": ("clan_size", 40),
+    "simbolo_libreria.alineacion": ("clan_alignment", "izquierda"),
+    "simbolo_senda.tamano": ("senda_size", 24),
+    "simbolo_senda.alineacion": ("senda_alignment", "izquierda"),
+    "simbolo_disciplina.tamano": ("discipline_size", 24),
+    "simbolo_coste.tamano": ("cost_size", 80),
+}
 
 class LibreriaWidget(QWidget):
     def __init__(self, importar_imagen_callback):
         super().__init__()
         self.layout = QHBoxLayout()
-        config = cargar_config()
         # Campo de nombre editable
         from PyQt5.QtWidgets import QLineEdit, QLabel
         self.libreria_name_edit = QLineEdit()
@@ -189,68 +142,14 @@ class LibreriaWidget(QWidget):
         self.layout.addWidget(self.libreria_card_widget, stretch=2)
         # Para compatibilidad con el resto de la app
         self.libreria_label = self.libreria_card_widget
-        # Cargar fuente desde archivo
-        nombre_config = config["nombre_carta"]
-        font_path = nombre_config["fuente"]
-        # Convertir ruta relativa a absoluta si es necesario
-        if not os.path.isabs(font_path):
-            font_path = get_resource_path(font_path)
-        font_id = QFontDatabase.addApplicationFont(font_path)
-        if font_id != -1:
-            font_families = QFontDatabase.applicationFontFamilies(font_id)
-            if font_families:
-                font = QFont(font_families[0], nombre_config["tamano"])
-            else:
-                font = QFont(font_path, nombre_config["tamano"])
-        else:
-            font = QFont(font_path, nombre_config["tamano"])
-        self.libreria_title_font = font
-        self.libreria_title_color = nombre_config["color"]
-        # Configurar alineación
-        self.libreria_card_widget.title_alignment = nombre_config.get("alineacion", "centro")
-        # Configurar tamaño y alineación del símbolo de tipo de librería
-        simbolo_config = config.get("simbolo_libreria", {})
-        self.libreria_card_widget.clan_size = simbolo_config.get("tamano", 40)
-        self.libreria_card_widget.clan_alignment = simbolo_config.get("alineacion", "izquierda")
-        # Tamaño de iconos de disciplina (librería)
-        simbolo_disciplina_config = config.get("simbolo_disciplina", {})
-        self.libreria_card_widget.discipline_size = simbolo_disciplina_config.get("tamano", 24)
+        # Fuente, color y alineación del nombre, tamaño y alineación de los
+        # símbolos de tipo, senda, disciplinas y coste (blood/pool) y texto
+        # de habilidades
+        self.actualizar_configuracion()
         # Activar halo/borde blanco semitransparente alrededor de los iconos de disciplina
         self.libreria_card_widget.discipline_draw_border = True
-        # Tamaño del símbolo de coste (blood/pool)
-        simbolo_coste_config = config.get("simbolo_coste", {})
-        self.libreria_card_widget.cost_size = simbolo_coste_config.get("tamano", 80)
-        # Configuración de texto de habilidades
-        texto_hab_config = config.get("texto_habilidad", {})
-        hab_font_path = texto_hab_config.get("fuente", "fonts/Gill Sans.otf")
-        if not os.path.isabs(hab_font_path):
-            hab_font_path = get_resource_path(hab_font_path)
-        hab_size = texto_hab_config.get("tamano", 12)
-        hab_color = texto_hab_config.get("color", "#ffffff")
-        hab_opacidad_pct = texto_hab_config.get("opacidad_fondo", 50)
-        try:
-            hab_opacidad_pct = int(hab_opacidad_pct)
-        except Exception:
-            hab_opacidad_pct = 50
-        hab_opacidad_pct = max(0, min(100, hab_opacidad_pct))
-        hab_opacidad = int(hab_opacidad_pct * 2.55)
-
-        hab_font_id = QFontDatabase.addApplicationFont(hab_font_path)
-        if hab_font_id != -1:
-            hab_families = QFontDatabase.applicationFontFamilies(hab_font_id)
-            if hab_families:
-                hab_font = QFont(hab_families[0], hab_size)
-            else:
-                hab_font = QFont(hab_font_path, hab_size)
-        else:
-            hab_font = QFont(hab_font_path, hab_size)
-
-        self.libreria_ability_font = hab_font
-        self.libreria_ability_color = hab_color
-        self.libreria_ability_bg_opacity = hab_opacidad
-        self.libreria_card_widget.ability_font = hab_font
-        self.libreria_card_widget.ability_color = hab_color
-        self.libreria_card_widget.ability_bg_opacity = hab_opacidad
+        # Los cambios de configuración llegan clave a clave
+        almacen_configuracion().cambiado.connect(self._config_cambiada)
         # Para compatibilidad, crear un atributo libreria_title que apunte al widget
         self.libreria_title = self.libreria_card_widget
         # Selector de tipo de carta de librería (primer tipo)
@@ -351,20 +250,21 @@ class LibreriaWidget(QWidget):
         btn_guardar_libreria.setMinimumWidth(100)
         btn_guardar_libreria.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
         btn_guardar_libreria.clicked.connect(self.guardar_carta_libreria)
-        btn_guardar_online_libreria = QPushButton('Guardar para Online')
-        btn_guardar_online_libreria.setMinimumWidth(100)
-        btn_guardar_online_libreria.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-        btn_guardar_online_libreria.clicked.connect(self.guardar_carta_libreria_online)
         botones_layout.addWidget(btn_importar_libreria, stretch=1)
         botones_layout.addWidget(btn_guardar_libreria, stretch=1)
-        botones_layout.addWidget(btn_guardar_online_libreria, stretch=1)
         self.libreria_right_layout.addLayout(botones_layout)
         self.libreria_right_panel.setLayout(self.libreria_right_layout)
         self.layout.addWidget(self.libreria_right_panel, stretch=1)
         self.setLayout(self.layout)
 
     def guardar_carta_libreria(self):
-        """Guarda la carta de librería actual (PNG o JPG, 63x88mm a 300 DPI)."""
+        """Guarda la carta de librería actual (PNG o JPG) en todos los tamaños configurados.
+
+        El archivo elegido es el de 63x88mm a 300 DPI; las variantes
+        (online, miniatura, 600 DPI) se escriben a su lado con sufijo.
+        """
+        from logicas.exportador.variantes import variantes_configuradas
+
         nombre_base = self.libreria_name_edit.text().strip() if hasattr(self, 'libreria_name_edit') else ""
         if not nombre_base:
             nombre_base = "carta_libreria"
@@ -383,33 +283,25 @@ class LibreriaWidget(QWidget):
         )
         if not filename:
             return
-        self.libreria_card_widget.export_png(filename)
-
-    def guardar_carta_libreria_online(self):
-        """Guarda la carta de librería en formato optimizado para juego online (358x500px)."""
-        from logicas.recorte.constantes import VTES_CARD_WIDTH_ONLINE, VTES_CARD_HEIGHT_ONLINE
-        
-        nombre_base = self.libreria_name_edit.text().strip() if hasattr(self, 'libreria_name_edit') else ""
-        if not nombre_base:
-            nombre_base = "carta_libreria_online"
-        safe_name = "".join(c for c in nombre_base if c.isalnum() or c in (" ", "-", "_")).strip()
-        if not safe_name:
-            safe_name = "carta_libreria_online"
-        default_path = os.path.join(os.getcwd(), safe_name.replace(" ", "_") + "_online.png")
-
-        filename, _ = QFileDialog.getSaveFileName(
-            self,
-            "Guardar carta de librería para online",
-            default_path,
-            "Imagen PNG/JPEG (*.png *.jpg *.jpeg)",
-        )
-        if not filename:
-            return
-        self.libreria_card_widget.export_png(
-            filename,
-            width=VTES_CARD_WIDTH_ONLINE,
-            height=VTES_CARD_HEIGHT_ONLINE
-        )
+        self.libreria_card_widget.exportar_en_segundo_plano(filename, variantes_configuradas(cargar_config(CONFIG_POR_DEFECTO)))
+
+    def cargar_carta(self, carta):
+        """Rellena los controles con una carta de librería (formato de `main.py render`)."""
+        self.libreria_name_edit.setText(carta.get("nombre", ""))
+        tipos = [t for t in carta.get("tipos", []) if t and t != "Ninguno"]
+        seleccionar_en_combo(self.libreria_type_combo, tipos[0] if tipos else None)
+        seleccionar_en_combo(self.libreria_type2_combo, tipos[1] if len(tipos) > 1 else None)
+        seleccionar_en_combo(self.libreria_senda_combo, carta.get("senda"))
+        seleccionar_en_combo(self.libreria_clan_combo, carta.get("clan"))
+        # El valor primero: el icono se resuelve con el tipo y el valor actuales
+        coste = carta.get("coste") or {}
+        seleccionar_en_combo(self.libreria_cost_value_combo, coste.get("valor", "1"))
+        seleccionar_en_combo(self.libreria_cost_type_combo, coste.get("tipo"))
+        self.set_cost_type_from_combo(self.libreria_cost_type_combo.currentText())
+        seleccionar_en_lista(self.libreria_disciplines_list, carta.get("disciplinas", []))
+        self.set_disciplines_from_list()
+        self.libreria_ability_edit.setPlainText(carta.get("habilidad", ""))
+        self.libreria_illustrator_edit.setText(carta.get("ilustrador", ""))
 
     def set_title_from_edit(self, text):
         self.libreria_card_widget.set_title(
@@ -456,19 +348,11 @@ class LibreriaWidget(QWidget):
 
         if nombre_senda and nombre_senda != "Ninguno":
             # resolver ruta desde el mapeo, si existe
-            archivo = SENDA_SVG_MAP.get(nombre_senda)
-            svg_path = None
-            if archivo:
-                base_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resources", "sendas")
-                ruta_completa = os.path.join(base_dir, archivo)
-                if os.path.exists(ruta_completa):
-                    svg_path = ruta_completa
+            svg_path = obtener_archivo_senda(nombre_senda)
             # Si no hay archivo mapeado, intentar construir nombre a partir del texto (lower)
             if not svg_path:
                 posible = nombre_senda.replace(' ', '').lower() + '.svg'
-                posible_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'resources', 'sendas', posible)
-                if os.path.exists(posible_path):
-                    svg_path = posible_path
+                svg_path = indice_recursos_global.ruta("sendas", posible)
 
             self.libreria_card_widget.set_senda(
                 nombre_senda,
@@ -512,42 +396,14 @@ class LibreriaWidget(QWidget):
         if hasattr(self, 'libreria_cost_value_combo'):
             current_value = self.libreria_cost_value_combo.currentText()
 
-        base_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'resources')
-        # Intentar resolver por patrón con los nuevos nombres, dando
-        # prioridad a SVG si existe: bloodcost{value}.svg/png o poolcost{value}.svg/png
-        if tipo == 'Blood' and current_value:
-            stem = f"bloodcost{current_value.lower()}"
-            svg_candidate = os.path.join(base_dir, 'blood', stem + ".svg")
-            png_candidate = os.path.join(base_dir, 'blood', stem + ".png")
-            if os.path.exists(svg_candidate):
-                svg_path = svg_candidate
-            elif os.path.exists(png_candidate):
-                svg_path = png_candidate
-        elif tipo == 'Pool' and current_value:
-            stem = f"poolcost{current_value.lower()}"
-            svg_candidate = os.path.join(base_dir, 'pool', stem + ".svg")
-            png_candidate = os.path.join(base_dir, 'pool', stem + ".png")
-            if os.path.exists(svg_candidate):
-                svg_path = svg_candidate
-            elif os.path.exists(png_candidate):
-                svg_path = png_candidate
+        # Resolver por patrón con los nuevos nombres, dando prioridad a SVG
+        # si existe: bloodcost{value}.svg/png o poolcost{value}.svg/png
+        if current_value:
+            svg_path = obtener_archivo_coste_libreria(tipo, current_value)
 
         # Si no hay archivo por patrón, usar el primer icono disponible como fallback
         if not svg_path:
-            if tipo == "Blood":
-                if len(BLOOD) > 1:
-                    archivo = BLOOD_SVG_MAP.get(BLOOD[1])
-                    if archivo:
-                        posible = os.path.join(base_dir, 'blood', archivo)
-                        if os.path.exists(posible):
-                            svg_path = posible
-            elif tipo == "Pool":
-                if len(POOL) > 1:
-                    archivo = POOL_SVG_MAP.get(POOL[1])
-                    if archivo:
-                        posible = os.path.join(base_dir, 'pool', archivo)
-                        if os.path.exists(posible):
-                            svg_path = posible
+            svg_path = _primer_archivo_coste(tipo)
 
         # Aplicar coste con el tamaño configurado
         if tipo == "Ninguno":
@@ -566,56 +422,16 @@ class LibreriaWidget(QWidget):
             return
 
         # Resolver svg_path por patrón tipo+valor con los nuevos nombres
-        # (ej. bloodcost3.png o poolcostX.png)
-        svg_path = None
-        base_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'resources')
-        candidate = None
-        if tipo == 'Blood':
-            stem = f"bloodcost{str(value).lower()}"
-            svg_candidate = os.path.join(base_dir, 'blood', stem + ".svg")
-            png_candidate = os.path.join(base_dir, 'blood', stem + ".png")
-            if os.path.exists(svg_candidate):
-                svg_path = svg_candidate
-            elif os.path.exists(png_candidate):
-                svg_path = png_candidate
-        elif tipo == 'Pool':
-            stem = f"poolcost{str(value).lower()}"
-            svg_candidate = os.path.join(base_dir, 'pool', stem + ".svg")
-            png_candidate = os.path.join(base_dir, 'pool', stem + ".png")
-            if os.path.exists(svg_candidate):
-                svg_path = svg_candidate
-            elif os.path.exists(png_candidate):
-                svg_path = png_candidate
-
-        # Si no se encontró por patrón, intentar 'X' mapeado o el svg ya establecido
-        if not svg_path:
-            if str(value).upper() == 'X':
-                if tipo == 'Blood' and BLOOD_SVG_MAP.get('X'):
-                    posible = os.path.join(base_dir, 'blood', BLOOD_SVG_MAP.get('X'))
-                    if os.path.exists(posible):
-                        svg_path = posible
-                elif tipo == 'Pool' and POOL_SVG_MAP.get('X'):
-                    posible = os.path.join(base_dir, 'pool', POOL_SVG_MAP.get('X'))
-                    if os.path.exists(posible):
-                        svg_path = posible
+        # (ej. bloodcost3.png o poolcostX.png) o, si no, por el mapa de costes
+        svg_path = obtener_archivo_coste_libreria(tipo, value)
 
+        # Si no se encontró, mantener el svg ya establecido
         if not svg_path:
             svg_path = getattr(self.libreria_card_widget, 'cost_svg_path', None)
 
         # Si aún no hay svg, usar el primer disponible según el tipo
         if not svg_path:
-            if tipo == 'Blood' and len(BLOOD) > 1:
-                archivo = BLOOD_SVG_MAP.get(BLOOD[1])
-                if archivo:
-                    posible = os.path.join(base_dir, 'blood', archivo)
-                    if os.path.exists(posible):
-                        svg_path = posible
-            elif tipo == 'Pool' and len(POOL) > 1:
-                archivo = POOL_SVG_MAP.get(POOL[1])
-                if archivo:
-                    posible = os.path.join(base_dir, 'pool', archivo)
-                    if os.path.exists(posible):
-                        svg_path = posible
+            svg_path = _primer_archivo_coste(tipo)
 
         # Aplicar valor y refrescar
         self.libreria_card_widget.set_cost(tipo.lower() if tipo != 'Ninguno' else None, svg_path=svg_path, size=self.libreria_card_widget.cost_size, value=value)
@@ -631,17 +447,9 @@ class LibreriaWidget(QWidget):
 
         svg_path = None
         if tipo == "Blood":
-            archivo = BLOOD_SVG_MAP.get(icon_name)
-            if archivo:
-                posible = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'resources', 'blood', archivo)
-                if os.path.exists(posible):
-                    svg_path = posible
+            svg_path = indice_recursos_global.ruta("blood", BLOOD_SVG_MAP.get(icon_name))
         elif tipo == "Pool":
-            archivo = POOL_SVG_MAP.get(icon_name)
-            if archivo:
-                posible = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'resources', 'pool', archivo)
-                if os.path.exists(posible):
-                    svg_path = posible
+            svg_path = indice_recursos_global.ruta("pool", POOL_SVG_MAP.get(icon_name))
 
         # Aplicar coste con el tamaño configurado
         self.libreria_card_widget.set_cost(tipo.lower() if tipo != "Ninguno" else None, svg_path=svg_path, size=self.libreria_card_widget.cost_size)
@@ -687,42 +495,20 @@ class LibreriaWidget(QWidget):
         self.libreria_card_widget.set_disciplines(disciplinas, size=self.libreria_card_widget.discipline_size)
         self.libreria_card_widget.update()
     
-    def actualizar_configuracion(self):
-        """Actualiza el título con la configuración actual"""
-        config = cargar_config()
+    def _aplicar_nombre_carta(self, config):
+        """Fuente, color y alineación del nombre según la configuración."""
         nombre_config = config["nombre_carta"]
-        
-        # Cargar fuente
-        font_path = nombre_config["fuente"]
-        if not os.path.isabs(font_path):
-            font_path = get_resource_path(font_path)
-        font_id = QFontDatabase.addApplicationFont(font_path)
-        if font_id != -1:
-            font_families = QFontDatabase.applicationFontFamilies(font_id)
-            if font_families:
-                font = QFont(font_families[0], nombre_config["tamano"])
-            else:
-                font = QFont(font_path, nombre_config["tamano"])
-        else:
-            font = QFont(font_path, nombre_config["tamano"])
-        
-        self.libreria_title_font = font
+        self.libreria_title_font = registro_fuentes_global.fuente(nombre_config["fuente"], nombre_config["tamano"])
         self.libreria_title_color = nombre_config["color"]
         self.libreria_card_widget.title_alignment = nombre_config.get("alineacion", "centro")
-        
-        # Actualizar tamaño y alineación del símbolo de tipo de librería
-        simbolo_config = config.get("simbolo_libreria", {})
-        self.libreria_card_widget.clan_size = simbolo_config.get("tamano", 40)
-        self.libreria_card_widget.clan_alignment = simbolo_config.get("alineacion", "izquierda")
-        # Actualizar tamaño y alineación del símbolo de senda
-        simbolo_senda_config = config.get("simbolo_senda", {})
-        self.libreria_card_widget.senda_size = simbolo_senda_config.get("tamano", 24)
-        self.libreria_card_widget.senda_alignment = simbolo_senda_config.get("alineacion", "izquierda")
-        # Actualizar configuración de texto de habilidades
+        # Reaplicar el título si hay texto
+        if self.libreria_card_widget.title:
+            self.set_title_from_edit(self.libreria_card_widget.title)
+
+    def _aplicar_texto_habilidad(self, config):
+        """Fuente, color y opacidad del texto de habilidades."""
         texto_hab_config = config.get("texto_habilidad", {})
-        hab_font_path = texto_hab_config.get("fuente", "fonts/Gill Sans.otf")
-        if not os.path.isabs(hab_font_path):
-            hab_font_path = get_resource_path(hab_font_path)
+        hab_fuente_archivo = texto_hab_config.get("fuente", "fonts/Gill Sans.otf")
         hab_size = texto_hab_config.get("tamano", 12)
         hab_color = texto_hab_config.get("color", "#ffffff")
         hab_opacidad_pct = texto_hab_config.get("opacidad_fondo", 50)
@@ -733,15 +519,7 @@ class LibreriaWidget(QWidget):
         hab_opacidad_pct = max(0, min(100, hab_opacidad_pct))
         hab_opacidad = int(hab_opacidad_pct * 2.55)
 
-        hab_font_id = QFontDatabase.addApplicationFont(hab_font_path)
-        if hab_font_id != -1:
-            hab_families = QFontDatabase.applicationFontFamilies(hab_font_id)
-            if hab_families:
-                hab_font = QFont(hab_families[0], hab_size)
-            else:
-                hab_font = QFont(hab_font_path, hab_size)
-        else:
-            hab_font = QFont(hab_font_path, hab_size)
+        hab_font = registro_fuentes_global.fuente(hab_fuente_archivo, hab_size)
 
         self.libreria_ability_font = hab_font
         self.libreria_ability_color = hab_color
@@ -749,98 +527,30 @@ class LibreriaWidget(QWidget):
         self.libreria_card_widget.ability_font = hab_font
         self.libreria_card_widget.ability_color = hab_color
         self.libreria_card_widget.ability_bg_opacity = hab_opacidad
-        # Actualizar tamaño de los iconos de disciplina
-        simbolo_disciplina_config = config.get("simbolo_disciplina", {})
-        self.libreria_card_widget.discipline_size = simbolo_disciplina_config.get("tamano", 24)
-        # Mantener activado el halo/borde de disciplina tras cambios de configuración
-        self.libreria_card_widget.discipline_draw_border = True
-        # Actualizar tamaño del símbolo de coste
-        simbolo_coste_config = config.get("simbolo_coste", {})
-        self.libreria_card_widget.cost_size = simbolo_coste_config.get("tamano", 80)
-        
-        # Actualizar el título si hay texto
-        texto_actual = self.libreria_card_widget.title
-        if texto_actual:
-            self.libreria_card_widget.set_title(
-                texto_actual, 
-                font=font, 
-                color=nombre_config["color"],
-                alignment=nombre_config.get("alineacion", "centro")
-            )
-        
-        # Actualizar los símbolos de tipo si hay alguno seleccionado
-        if hasattr(self, 'libreria_type_combo'):
-            tipo_actual = self.libreria_type_combo.currentText()
-            if tipo_actual and tipo_actual != "Ninguno":
-                tipo_svg_path = obtener_archivo_tipo_libreria(tipo_actual)
-                if tipo_svg_path:
-                    self.libreria_card_widget.clan = tipo_actual
-                    self.libreria_card_widget.clan_svg_path = tipo_svg_path
-                else:
-                    self.libreria_card_widget.clan = None
-                    self.libreria_card_widget.clan_svg_path = None
-            else:
-                self.libreria_card_widget.clan = None
-                self.libreria_card_widget.clan_svg_path = None
-        
-        if hasattr(self, 'libreria_type2_combo'):
-            tipo2_actual = self.libreria_type2_combo.currentText()
-            if tipo2_actual and tipo2_actual != "Ninguno":
-                tipo2_svg_path = obtener_archivo_tipo_libreria(tipo2_actual)
-                if tipo2_svg_path:
-                    self.libreria_card_widget.clan2 = tipo2_actual
-                    self.libreria_card_widget.clan2_svg_path = tipo2_svg_path
-                else:
-                    self.libreria_card_widget.clan2 = None
-                    self.libreria_card_widget.clan2_svg_path = None
-            else:
-                self.libreria_card_widget.clan2 = None
-                self.libreria_card_widget.clan2_svg_path = None
+        self.libreria_card_widget.update()
 
-        # Actualizar clan de librería o senda, según lo que esté seleccionado
-        clan_lib_actual = None
-        if hasattr(self, 'libreria_clan_combo'):
-            clan_lib_actual = self.libreria_clan_combo.currentText()
+    def _config_cambiada(self, clave, valor):
+        """Actualiza sólo la propiedad de la carta afectada por `clave`.
 
-        if clan_lib_actual and clan_lib_actual != "Ninguno":
-            clan_svg_path = obtener_archivo_clan(clan_lib_actual)
-            self.libreria_card_widget.set_senda(
-                clan_lib_actual,
-                size=self.libreria_card_widget.senda_size,
-                alignment=self.libreria_card_widget.senda_alignment,
-                svg_path=clan_svg_path
-            )
-        elif hasattr(self, 'libreria_senda_combo'):
-            senda_actual = self.libreria_senda_combo.currentText()
-            if senda_actual and senda_actual != "Ninguno":
-                archivo = SENDA_SVG_MAP.get(senda_actual)
-                svg_path = None
-                if archivo:
-                    base_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resources", "sendas")
-                    ruta_completa = os.path.join(base_dir, archivo)
-                    if os.path.exists(ruta_completa):
-                        svg_path = ruta_completa
-                # intentar fallback por nombre simple
-                if not svg_path:
-                    posible = senda_actual.replace(' ', '').lower() + '.svg'
-                    posible_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'resources', 'sendas', posible)
-                    if os.path.exists(posible_path):
-                        svg_path = posible_path
-
-                self.libreria_card_widget.set_senda(
-                    senda_actual,
-                    size=self.libreria_card_widget.senda_size,
-                    alignment=self.libreria_card_widget.senda_alignment,
-                    svg_path=svg_path
-                )
-            else:
-                self.libreria_card_widget.set_senda(None, svg_path=None)
+        La carta marca sucia únicamente la capa que depende de ese atributo.
+        """
+        if clave in ATRIBUTOS_CONFIG_LIBRERIA:
+            atributo, por_defecto = ATRIBUTOS_CONFIG_LIBRERIA[clave]
+            # None: la clave ha desaparecido al recargar la configuración
+            setattr(self.libreria_card_widget, atributo, por_defecto if valor is None else valor)
+            self.libreria_card_widget.update()
+        elif clave.startswith("nombre_carta."):
+            self._aplicar_nombre_carta(cargar_config(CONFIG_POR_DEFECTO))
+        elif clave.startswith("texto_habilidad."):
+            self._aplicar_texto_habilidad(cargar_config(CONFIG_POR_DEFECTO))
 
-        # Actualizar disciplinas según la selección actual
-        if hasattr(self, 'libreria_disciplines_list'):
-            self.set_disciplines_from_list()
-        
-        self.libreria_card_widget.update()
+    def actualizar_configuracion(self):
+        """Aplica toda la configuración actual a la carta (p. ej. tras recargarla)."""
+        config = cargar_config(CONFIG_POR_DEFECTO)
+        self._aplicar_nombre_carta(config)
+        for clave, (atributo, por_defecto) in ATRIBUTOS_CONFIG_LIBRERIA.items():
+            setattr(self.libreria_card_widget, atributo, obtener_clave(config, clave, por_defecto))
+        self._aplicar_texto_habilidad(config)
 
     def set_pixmap(self, pixmap):
         self.libreria_card_widget.set_pixmap(pixmap)